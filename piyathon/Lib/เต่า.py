@@ -46,208 +46,199 @@ Known Limitations:
     - Performance depends on the underlying Tkinter implementation
     - Some complex animations may require manual screen updates
     - Limited to 2D graphics operations
+    - turtle, and with it tkinter, is imported on first access to a name
+      that needs it, so a missing tkinter is reported there, not on import
 """
 
-import turtle
-
-
-# Classes
-class ผ้าใบ(turtle.Canvas):
-    pass
-
-
-class ปากกา(turtle.Pen):
-    pass
-
-
-class ปากกาดิบ(turtle.RawPen):
-    pass
-
-
-class เต่าดิบ(turtle.RawTurtle):
-    pass
-
-
-class ผ้าใบเลื่อนได้(turtle.ScrolledCanvas):
-    pass
-
-
-class รูปร่าง(turtle.Shape):
-    pass
-
-
-class ที_นำทาง(turtle.TNavigator):
-    pass
-
-
-class ที_ปากกา(turtle.TPen):
-    pass
-
-
-class ที_บัฟเฟอร์(turtle.Tbuffer):
-    pass
-
-
-class ตัวยุติ(turtle.Terminator):
-    pass
-
-
-class เต่า(turtle.Turtle):
-    pass
-
-
-class ข้อผิดพลาดกราฟิกเต่า(turtle.TurtleGraphicsError):
-    pass
-
-
-class หน้าจอเต่า(turtle.TurtleScreen):
-    pass
-
-
-class ฐานหน้าจอเต่า(turtle.TurtleScreenBase):
-    pass
-
-
-class เวคเตอร์สองมิติ(turtle.Vec2D):
-    pass
-
-
-# Methods
-
-
-# Functions
-หน้าจอ = turtle.Screen
-เพิ่มรูปร่าง = turtle.addshape
-กลับ = turtle.back
-ถอยหลัง = turtle.backward
-เริ่มเติม = turtle.begin_fill
-เริ่มรูปหลายเหลี่ยม = turtle.begin_poly
-สีพื้นหลัง = turtle.bgcolor
-ภาพพื้นหลัง = turtle.bgpic
-ถอยหลัง = turtle.bk
-ลาก่อน = turtle.bye
-วงกลม = turtle.circle
-ล้าง = turtle.clear
-ล้างหน้าจอ = turtle.clearscreen
-ล้างตราประทับ = turtle.clearstamp
-ล้างตราประทับทั้งหมด = turtle.clearstamps
-โคลน = turtle.clone
-สี = turtle.color
-โหมดสี = turtle.colormode
-พจนานุกรมการกำหนดค่า = turtle.config_dict
-คัดลอกลึก = turtle.deepcopy
-องศา = turtle.degrees
-หน่วงเวลา = turtle.delay
-ระยะทาง = turtle.distance
-เสร็จสิ้น = turtle.done
-จุด = turtle.dot
-ลง = turtle.down
-สิ้นสุดการเติม = turtle.end_fill
-สิ้นสุดรูปหลายเหลี่ยม = turtle.end_poly
-ออกเมื่อคลิก = turtle.exitonclick
-เดินหน้า = turtle.fd
-สีเติม = turtle.fillcolor
-กำลังเติม = turtle.filling
-เดินหน้า = turtle.forward
-รับรูปหลายเหลี่ยม = turtle.get_poly
-รับรูปหลายเหลี่ยมของรูปร่าง = turtle.get_shapepoly
-รับผ้าใบ = turtle.getcanvas
-รับรายการพารามิเตอร์วิธีการ = turtle.getmethparlist
-รับปากกา = turtle.getpen
-รับหน้าจอ = turtle.getscreen
-รับรูปร่าง = turtle.getshapes
-รับเต่า = turtle.getturtle
-ไปที่ = turtle.goto
-ทิศทาง = turtle.heading
-ซ่อนเต่า = turtle.hideturtle
-บ้าน = turtle.home
-ซ่อนเต่า = turtle.ht
-ลงหรือไม่ = turtle.isdown
-เป็นไฟล์หรือไม่ = turtle.isfile
-มองเห็นหรือไม่ = turtle.isvisible
-เข้าร่วม = turtle.join
-ซ้าย = turtle.left
-ฟัง = turtle.listen
-ซ้าย = turtle.lt
-ลูปหลัก = turtle.mainloop
-โหมด = turtle.mode
-ป้อนตัวเลข = turtle.numinput
-เมื่อคลิก = turtle.onclick
-เมื่อลาก = turtle.ondrag
-เมื่อกดปุ่ม = turtle.onkey
-เมื่อกดปุ่ม = turtle.onkeypress
-เมื่อปล่อยปุ่ม = turtle.onkeyrelease
-เมื่อปล่อย = turtle.onrelease
-เมื่อคลิกหน้าจอ = turtle.onscreenclick
-เมื่อถึงเวลา = turtle.ontimer
-ลงปากกา = turtle.pd
-ปากกา = turtle.pen
-สีปากกา = turtle.pencolor
-ลงปากกา = turtle.pendown
-ขนาดปากกา = turtle.pensize
-ยกปากกา = turtle.penup
-ตำแหน่ง = turtle.pos
-ตำแหน่ง = turtle.position
-ยกปากกา = turtle.pu
-เรเดียน = turtle.radians
-อ่านสตริงเอกสาร = turtle.read_docstrings
-อ่านการกำหนดค่า = turtle.readconfig
-ลงทะเบียนรูปร่าง = turtle.register_shape
-รีเซ็ต = turtle.reset
-รีเซ็ตหน้าจอ = turtle.resetscreen
-โหมดปรับขนาด = turtle.resizemode
-ขวา = turtle.right
-ขวา = turtle.rt
-ขนาดหน้าจอ = turtle.screensize
-ตั้งทิศทาง = turtle.seth
-ตั้งทิศทาง = turtle.setheading
-ตั้งตำแหน่ง = turtle.setpos
-ตั้งตำแหน่ง = turtle.setposition
-ตั้งมุมเอียง = turtle.settiltangle
-ตั้งบัฟเฟอร์เลิกทำ = turtle.setundobuffer
-ตั้งค่า = turtle.setup
-ตั้งค่าพิกัดโลก = turtle.setworldcoordinates
-ตั้งค่า_x = turtle.setx
-ตั้งค่า_y = turtle.sety
-รูปร่าง = turtle.shape
-ขนาดรูปร่าง = turtle.shapesize
-แปลงรูปร่าง = turtle.shapetransform
-ปัจจัยเฉือน = turtle.shearfactor
-แสดงเต่า = turtle.showturtle
-ความเร็ว = turtle.speed
-แยก = turtle.split
-แสดงเต่า = turtle.st
-ประทับตรา = turtle.stamp
-เคลื่อนย้าย = turtle.teleport
-ป้อนข้อความ = turtle.textinput
-เอียง = turtle.tilt
-มุมเอียง = turtle.tiltangle
-ชื่อเรื่อง = turtle.title
-ไปทาง = turtle.towards
-ตัวติดตาม = turtle.tracer
-เต่าทั้งหมด = turtle.turtles
-ขนาดเต่า = turtle.turtlesize
-เลิกทำ = turtle.undo
-รายการบัฟเฟอร์เลิกทำ = turtle.undobufferentries
-ขึ้น = turtle.up
-อัปเดต = turtle.update
-ความกว้าง = turtle.width
-ความสูงหน้าต่าง = turtle.window_height
-ความกว้างหน้าต่าง = turtle.window_width
-เขียน = turtle.write
-เขียนพจนานุกรมสตริงเอกสาร = turtle.write_docstringdict
-พิกัด_x = turtle.xcor
-พิกัด_y = turtle.ycor
-
-# Constants
-ทีเค = turtle.TK
-
-
-# Get all public names from the module
-eng_names = [name for name in dir(turtle) if not name.startswith("_")]
-
-# Get all names defined in this file (our Thai translations)
-thai_names = [name for name in locals() if not name.startswith("_")]
-
-# Combine both sets of names, removing duplicates
-__all__ = list(set(eng_names + thai_names))
+# pylint: disable=use-dict-literal,import-outside-toplevel
+# Names are given as keyword arguments so that they are NFKC normalized like
+# the identifiers used to access them.
+
+# Classes, defined as subclasses of the turtle class on first access; ปากกา
+# and รูปร่าง are functions, as the names are also given to turtle.pen and
+# turtle.shape below
+_CLASSES = dict(
+    ผ้าใบ="Canvas",
+    ปากกาดิบ="RawPen",
+    เต่าดิบ="RawTurtle",
+    ผ้าใบเลื่อนได้="ScrolledCanvas",
+    ที_นำทาง="TNavigator",
+    ที_ปากกา="TPen",
+    ที_บัฟเฟอร์="Tbuffer",
+    ตัวยุติ="Terminator",
+    เต่า="Turtle",
+    ข้อผิดพลาดกราฟิกเต่า="TurtleGraphicsError",
+    หน้าจอเต่า="TurtleScreen",
+    ฐานหน้าจอเต่า="TurtleScreenBase",
+    เวคเตอร์สองมิติ="Vec2D",
+)
+
+# Functions and constants, bound to the turtle attribute on first access
+_ALIASES = dict(
+    # Functions
+    หน้าจอ="Screen",
+    เพิ่มรูปร่าง="addshape",
+    กลับ="back",
+    ถอยหลัง="bk",
+    เริ่มเติม="begin_fill",
+    เริ่มรูปหลายเหลี่ยม="begin_poly",
+    สีพื้นหลัง="bgcolor",
+    ภาพพื้นหลัง="bgpic",
+    ลาก่อน="bye",
+    วงกลม="circle",
+    ล้าง="clear",
+    ล้างหน้าจอ="clearscreen",
+    ล้างตราประทับ="clearstamp",
+    ล้างตราประทับทั้งหมด="clearstamps",
+    โคลน="clone",
+    สี="color",
+    โหมดสี="colormode",
+    พจนานุกรมการกำหนดค่า="config_dict",
+    คัดลอกลึก="deepcopy",
+    องศา="degrees",
+    หน่วงเวลา="delay",
+    ระยะทาง="distance",
+    เสร็จสิ้น="done",
+    จุด="dot",
+    ลง="down",
+    สิ้นสุดการเติม="end_fill",
+    สิ้นสุดรูปหลายเหลี่ยม="end_poly",
+    ออกเมื่อคลิก="exitonclick",
+    เดินหน้า="forward",
+    สีเติม="fillcolor",
+    กำลังเติม="filling",
+    รับรูปหลายเหลี่ยม="get_poly",
+    รับรูปหลายเหลี่ยมของรูปร่าง="get_shapepoly",
+    รับผ้าใบ="getcanvas",
+    รับรายการพารามิเตอร์วิธีการ="getmethparlist",
+    รับปากกา="getpen",
+    รับหน้าจอ="getscreen",
+    รับรูปร่าง="getshapes",
+    รับเต่า="getturtle",
+    ไปที่="goto",
+    ทิศทาง="heading",
+    ซ่อนเต่า="ht",
+    บ้าน="home",
+    ลงหรือไม่="isdown",
+    เป็นไฟล์หรือไม่="isfile",
+    มองเห็นหรือไม่="isvisible",
+    เข้าร่วม="join",
+    ซ้าย="lt",
+    ฟัง="listen",
+    ลูปหลัก="mainloop",
+    โหมด="mode",
+    ป้อนตัวเลข="numinput",
+    เมื่อคลิก="onclick",
+    เมื่อลาก="ondrag",
+    เมื่อกดปุ่ม="onkeypress",
+    เมื่อปล่อยปุ่ม="onkeyrelease",
+    เมื่อปล่อย="onrelease",
+    เมื่อคลิกหน้าจอ="onscreenclick",
+    เมื่อถึงเวลา="ontimer",
+    ลงปากกา="pendown",
+    ปากกา="pen",
+    สีปากกา="pencolor",
+    ขนาดปากกา="pensize",
+    ยกปากกา="pu",
+    ตำแหน่ง="position",
+    เรเดียน="radians",
+    อ่านสตริงเอกสาร="read_docstrings",
+    อ่านการกำหนดค่า="readconfig",
+    ลงทะเบียนรูปร่าง="register_shape",
+    รีเซ็ต="reset",
+    รีเซ็ตหน้าจอ="resetscreen",
+    โหมดปรับขนาด="resizemode",
+    ขวา="rt",
+    ขนาดหน้าจอ="screensize",
+    ตั้งทิศทาง="setheading",
+    ตั้งตำแหน่ง="setposition",
+    ตั้งมุมเอียง="settiltangle",
+    ตั้งบัฟเฟอร์เลิกทำ="setundobuffer",
+    ตั้งค่า="setup",
+    ตั้งค่าพิกัดโลก="setworldcoordinates",
+    ตั้งค่า_x="setx",
+    ตั้งค่า_y="sety",
+    รูปร่าง="shape",
+    ขนาดรูปร่าง="shapesize",
+    แปลงรูปร่าง="shapetransform",
+    ปัจจัยเฉือน="shearfactor",
+    แสดงเต่า="st",
+    ความเร็ว="speed",
+    แยก="split",
+    ประทับตรา="stamp",
+    เคลื่อนย้าย="teleport",
+    ป้อนข้อความ="textinput",
+    เอียง="tilt",
+    มุมเอียง="tiltangle",
+    ชื่อเรื่อง="title",
+    ไปทาง="towards",
+    ตัวติดตาม="tracer",
+    เต่าทั้งหมด="turtles",
+    ขนาดเต่า="turtlesize",
+    เลิกทำ="undo",
+    รายการบัฟเฟอร์เลิกทำ="undobufferentries",
+    ขึ้น="up",
+    อัปเดต="update",
+    ความกว้าง="width",
+    ความสูงหน้าต่าง="window_height",
+    ความกว้างหน้าต่าง="window_width",
+    เขียน="write",
+    เขียนพจนานุกรมสตริงเอกสาร="write_docstringdict",
+    พิกัด_x="xcor",
+    พิกัด_y="ycor",
+    # Constants
+    ทีเค="TK",
+)
+
+
+def _public_names():
+    """Return the Thai names of this module and the public turtle names."""
+    import turtle
+
+    eng_names = [name for name in dir(turtle) if not name.startswith("_")]
+    thai_names = [name for name in __dir__() if not name.startswith("_")]
+    return list(set(eng_names + thai_names))
+
+
+def __getattr__(name):
+    """
+    Import turtle on first access to a name that needs it.
+
+    Args:
+        name (str): Name of the attribute
+
+    Returns:
+        object: The Thai class or alias, or the turtle attribute of that name
+
+    Raises:
+        AttributeError: If neither this module nor turtle has that name
+    """
+    if name == "__all__":
+        value = _public_names()
+    elif name in _CLASSES:
+        import turtle
+
+        value = type(name, (getattr(turtle, _CLASSES[name]),), {})
+        value.__module__ = __name__
+    elif name in _ALIASES:
+        import turtle
+
+        value = getattr(turtle, _ALIASES[name])
+    elif not name.startswith("_"):
+        import turtle
+
+        try:
+            value = getattr(turtle, name)
+        except AttributeError:
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            ) from None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the module attributes, including names not yet resolved."""
+    return sorted(set(globals()) | set(_CLASSES) | set(_ALIASES))
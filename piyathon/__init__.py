@@ -4,37 +4,96 @@
 """
 Piyathon Package Initialization Module
 
-This module initializes the Piyathon package and sets up the runtime environment.
-It handles dynamic module loading from the Lib directory and exports package metadata.
+This module initializes the Piyathon package and exports package metadata.
+The wrapper modules in the Lib directory are exposed as package attributes
+and imported only when first accessed.
 
 Core Functionality:
-    - Dynamically imports all modules from the Lib package
     - Exports package version information
-    - Manages package-level exports via __all__
+    - Lazily imports Lib wrapper modules on attribute access (PEP 562)
+    - Lists the wrapper modules in dir(piyathon)
 
 Dependencies:
-    - importlib: For dynamic module importing
-    - pkgutil: For module discovery and iteration
+    - importlib: For importing wrapper modules on demand
+    - unicodedata: For matching attribute names to wrapper file names
+    - os: For locating the Lib directory of the package
 
 Integration Points:
     - Interfaces with the Lib directory for standard library modules
     - Provides version information to the CLI and other components
     - Controls package-level symbol visibility
 
-Side Effects:
-    - Modifies the module namespace with imported symbols
-    - Populates __all__ with all local symbols
+Usage Examples:
+    >>> import piyathon
+    >>> piyathon.สุ่ม.สุ่มจำนวนเต็ม(1, 10)  # Imports piyathon.Lib.สุ่ม here
+
+Known Limitations:
+    - Wrapper modules are found by file name, so only .py wrappers are exposed
 """
 
-import importlib
-import pkgutil
+import os
+
+__version__ = "0.3.12.11"
 
-# Import all modules in the .Lib package dynamically
-package_name = "Lib"
+__all__ = ["__version__"]
 
-for _, module_name, _ in pkgutil.iter_modules([package_name]):
-    importlib.import_module(f".{module_name}", package=package_name)
+LIB_PATH = os.path.join(os.path.dirname(__file__), "Lib")
 
-__all__ = list(locals())
 
-__version__ = "0.3.12.11"
+def lib_modules():
+    """
+    List the wrapper modules in the Lib directory of the package.
+
+    Returns:
+        list: Names of the wrapper modules, sorted
+
+    Example:
+        >>> lib_modules()
+        ['สุ่ม', 'เต่า']
+    """
+    try:
+        names = os.listdir(LIB_PATH)
+    except OSError:
+        return []
+    return sorted(
+        name[:-3] for name in names if name.endswith(".py") and name[:-3].isidentifier()
+    )
+
+
+def __getattr__(name):
+    """
+    Import a Lib wrapper module on first access to it as a package attribute.
+
+    Args:
+        name (str): Name of the attribute
+
+    Returns:
+        module: The wrapper module piyathon.Lib.<name>
+
+    Raises:
+        AttributeError: If no wrapper module has that name
+    """
+    # Imported here so that `import piyathon` stays cheap
+    import importlib  # pylint: disable=import-outside-toplevel
+    import unicodedata  # pylint: disable=import-outside-toplevel
+
+    for module_name in lib_modules():
+        # Attribute names written in code are NFKC normalized, file names not
+        if unicodedata.normalize("NFKC", module_name) == name:
+            module = importlib.import_module(f".Lib.{module_name}", __name__)
+            globals()[name] = module
+            return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """
+    List the package attributes, including wrapper modules not yet imported.
+
+    Returns:
+        list: Names of the package attributes, sorted
+    """
+    import unicodedata  # pylint: disable=import-outside-toplevel
+
+    names = {unicodedata.normalize("NFKC", name) for name in lib_modules()}
+    return sorted(set(globals()) | names)
@@ -0,0 +1,537 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Batch Runner Module
+
+This module runs many Piyathon programs, such as student submissions, in a
+pool of concurrent worker processes with per-run resource limits, and writes
+one JSON result per run.
+
+Core Functionality:
+    - Collects .pi files from directories, single files and manifests
+    - Forks each run from a process with the runtime already loaded
+    - Limits the CPU time, wall time and address space of every run
+    - Captures stdout and stderr, up to a size limit per stream
+    - Feeds each run a stdin fixture, or an empty stdin
+    - Shares translations between identical sources through the
+      translation cache, whose size is learnt before the runs and trimmed
+      after them
+
+Dependencies:
+    - resource: For CPU time and address space limits
+    - selectors: For reading outputs and waiting for exited runs
+    - signal: For child exit notification
+    - json: For the result lines
+    - server: For preloading the runtime and running scripts in children
+
+Data Structures:
+    - A manifest lists one .pi file per line, optionally followed by a tab
+      and the stdin fixture of that file; relative paths are relative to the
+      manifest, and blank lines and lines starting with # are skipped
+    - Each result line holds "file", "status" ("ok", "error",
+      "cpu_time_exceeded", "wall_time_exceeded" or "killed"), "exit_code",
+      "signal", "wall_time" and "cpu_time" in seconds, "max_rss_kb",
+      "stdout", "stderr" and "truncated"
+
+Integration Points:
+    - Started by `piyathon batch`
+    - Scripts are run by piyathon.piyathon.run_file, as by `piyathon file.pi`
+    - Translations go through the shared translation cache, so identical
+      submissions are translated once, also across batches
+
+Usage Examples:
+    $ piyathon batch submissions/ --jobs 8 --wall-time 5 -o results.jsonl
+    $ piyathon batch manifest.txt --stdin input.txt --memory 512
+
+Known Limitations:
+    - Unix only, as it relies on fork() and resource limits
+    - The memory limit applies to the address space, which includes the
+      runtime inherited from the batch runner
+    - Results are written in completion order, not in input order
+"""
+
+import argparse
+import json
+import os
+import resource
+import selectors
+import signal
+import sys
+import time
+from collections import Counter
+from .server import drain, preload, run_and_exit, wakeup_pipe
+from .translation_cache import add_cache_arguments, cache_from_arguments
+
+DEFAULT_WALL_TIME = 10.0
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+# Time a run may take to exit after its CPU time soft limit, before SIGKILL
+CPU_TIME_GRACE = 1
+
+
+def collect_runs(paths, stdin_file=None):
+    """
+    Collect the .pi files to run and their stdin fixtures.
+
+    Args:
+        paths (list): Directories searched recursively for .pi files, .pi
+                      files, and manifests
+        stdin_file (str | None): Fixture for runs not given one by a manifest
+
+    Returns:
+        list: (source_file, stdin_file) pairs, in the order found
+
+    Raises:
+        OSError: If a path or manifest cannot be read
+
+    Example:
+        >>> collect_runs(["submissions"], "input.txt")
+        [('submissions/a/main.pi', 'input.txt'), ('submissions/b/main.pi', 'input.txt')]
+    """
+    runs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                runs.extend(
+                    (os.path.join(root, name), stdin_file)
+                    for name in sorted(files)
+                    if name.endswith(".pi")
+                )
+        elif path.endswith(".pi"):
+            runs.append((path, stdin_file))
+        else:
+            base = os.path.dirname(path)
+            with open(path, encoding="utf-8") as manifest:
+                for line in manifest:
+                    line = line.rstrip("\r\n")
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    source_file, _, fixture = line.partition("\t")
+                    runs.append(
+                        (
+                            os.path.join(base, source_file),
+                            os.path.join(base, fixture) if fixture else stdin_file,
+                        )
+                    )
+    return runs
+
+
+class Run:
+    """
+    A run of one program in a forked child.
+
+    Attributes:
+        source_file (str): Path to the Piyathon source file
+        pid (int): Process id, and process group id, of the child
+        cpu_time (int | None): CPU time limit of the child in seconds
+        started (float): time.monotonic() when the child was started
+        deadline (float | None): time.monotonic() after which it is killed
+        output (dict): Captured bytes, by stream name
+        truncated (bool): Whether output beyond the size limit was dropped
+        timed_out (bool): Whether the child was killed for its wall time
+    """
+
+    def __init__(self, source_file, pid, wall_time, cpu_time):
+        """
+        Record a started run.
+
+        Args:
+            source_file (str): Path to the Piyathon source file
+            pid (int): Process id of the child
+            wall_time (float | None): Wall time limit in seconds
+            cpu_time (int | None): CPU time limit in seconds
+        """
+        self.source_file = source_file
+        self.pid = pid
+        self.cpu_time = cpu_time
+        self.started = time.monotonic()
+        self.deadline = None if wall_time is None else self.started + wall_time
+        self.output = {"stdout": bytearray(), "stderr": bytearray()}
+        self.truncated = False
+        self.timed_out = False
+
+    def result(self, status, rusage):
+        """
+        Build the result of the finished run.
+
+        Args:
+            status (int): Wait status of the child
+            rusage (resource.struct_rusage): Resource usage of the child
+
+        Returns:
+            dict: The result, as written to the result file
+        """
+        code = os.waitstatus_to_exitcode(status)
+        exit_code, signum = (code, None) if code >= 0 else (None, -code)
+        cpu_time = rusage.ru_utime + rusage.ru_stime
+        if self.timed_out:
+            outcome = "wall_time_exceeded"
+        elif signum == signal.SIGXCPU or (
+            signum == signal.SIGKILL
+            and self.cpu_time is not None
+            and cpu_time >= self.cpu_time
+        ):
+            outcome = "cpu_time_exceeded"
+        elif signum is not None:
+            outcome = "killed"
+        else:
+            outcome = "ok" if exit_code == 0 else "error"
+        return {
+            "file": self.source_file,
+            "status": outcome,
+            "exit_code": exit_code,
+            "signal": signum,
+            "wall_time": round(time.monotonic() - self.started, 6),
+            "cpu_time": round(cpu_time, 6),
+            "max_rss_kb": rusage.ru_maxrss,
+            "stdout": self.output["stdout"].decode("utf-8", "replace"),
+            "stderr": self.output["stderr"].decode("utf-8", "replace"),
+            "truncated": self.truncated,
+        }
+
+
+class BatchRunner:
+    """
+    A pool of concurrent runs with resource limits.
+
+    Attributes:
+        jobs (int): Maximum number of concurrent runs
+        cpu_time (int | None): CPU time limit of a run in seconds
+        wall_time (float | None): Wall time limit of a run in seconds
+        memory (int | None): Address space limit of a run in bytes
+        max_output (int): Bytes kept of each output stream of a run
+        cache (TranslationCache | None): Translation cache used by the runs
+
+    Methods:
+        run(runs, write_result): Run programs and report their results
+
+    Example:
+        >>> runner = BatchRunner(jobs=4, wall_time=5)
+        >>> runner.run([("hello.pi", None)], print)
+        {'file': 'hello.pi', 'status': 'ok', ...}
+    """
+
+    def __init__(
+        self,
+        jobs=None,
+        cpu_time=None,
+        wall_time=DEFAULT_WALL_TIME,
+        memory=None,
+        max_output=DEFAULT_MAX_OUTPUT,
+        cache=None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            jobs (int | None): Maximum number of concurrent runs, or None for
+                               the number of CPUs
+            cpu_time (int | None): CPU time limit in seconds, or None
+            wall_time (float | None): Wall time limit in seconds, or None
+            memory (int | None): Address space limit in bytes, or None
+            max_output (int): Bytes kept of each output stream of a run
+            cache (TranslationCache | None): Translation cache, or None to
+                                             disable caching
+        """
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cpu_time = cpu_time
+        self.wall_time = wall_time
+        self.memory = memory
+        self.max_output = max_output
+        self.cache = cache
+        self.running = {}
+        self.selector = None
+        self.wakeup_read = self.wakeup_write = None
+
+    def run(self, runs, write_result):
+        """
+        Run programs and report the result of each as it finishes.
+
+        Args:
+            runs (list): (source_file, stdin_file) pairs to run
+            write_result (callable): Called with the result dict of each run
+
+        Returns:
+            collections.Counter: Number of runs per status
+        """
+        counts = Counter()
+        pending = list(reversed(runs))
+        if self.cache is not None:
+            # Runs inherit the size instead of each scanning the cache
+            self.cache.scan()
+        self.wakeup_read, self.wakeup_write = wakeup_pipe()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.wakeup_read, selectors.EVENT_READ)
+        previous_handler = signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        previous_fd = signal.set_wakeup_fd(self.wakeup_write)
+        try:
+            while pending or self.running:
+                while pending and len(self.running) < self.jobs:
+                    self.start(*pending.pop())
+                for key, _ in self.selector.select(self.timeout()):
+                    if key.fileobj == self.wakeup_read:
+                        drain(self.wakeup_read)
+                    else:
+                        self.read_output(key.fd, *key.data)
+                self.kill_overdue()
+                for result in self.reap():
+                    counts[result["status"]] += 1
+                    write_result(result)
+        finally:
+            for pid in list(self.running):
+                self.kill(pid)
+                os.waitpid(pid, 0)
+            signal.set_wakeup_fd(previous_fd)
+            signal.signal(signal.SIGCHLD, previous_handler)
+            self.selector.close()
+            os.close(self.wakeup_read)
+            os.close(self.wakeup_write)
+        if self.cache is not None and self.cache.scan() > self.cache.max_bytes:
+            self.cache.evict()
+        return counts
+
+    def start(self, source_file, stdin_file):
+        """
+        Fork a child running a program with the resource limits applied.
+
+        Args:
+            source_file (str): Path to the Piyathon source file
+            stdin_file (str | None): Path to the stdin fixture, or None
+        """
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        # Buffered output would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.setpgid(0, 0)
+            for key in list(self.selector.get_map().values()):
+                os.close(key.fd)
+            self.selector.close()
+            for fd in [self.wakeup_write, stdout_read, stderr_read]:
+                os.close(fd)
+
+            def setup():
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                self.limit_resources()
+                stdin = os.open(stdin_file or os.devnull, os.O_RDONLY)
+                for target, fd in enumerate([stdin, stdout_write, stderr_write]):
+                    os.dup2(fd, target)
+                    os.close(fd)
+                sys.stdout.reconfigure(line_buffering=False)
+
+            run_and_exit(source_file, self.cache, setup)
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+        os.close(stdout_write)
+        os.close(stderr_write)
+        run = Run(source_file, pid, self.wall_time, self.cpu_time)
+        self.running[pid] = run
+        for fd, stream in [(stdout_read, "stdout"), (stderr_read, "stderr")]:
+            os.set_blocking(fd, False)
+            self.selector.register(fd, selectors.EVENT_READ, (run, stream))
+
+    def limit_resources(self):
+        """Apply the CPU time and memory limits to the current process."""
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if self.cpu_time is not None:
+            resource.setrlimit(
+                resource.RLIMIT_CPU, (self.cpu_time, self.cpu_time + CPU_TIME_GRACE)
+            )
+        if self.memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (self.memory, self.memory))
+
+    def read_output(self, fd, run, stream):
+        """
+        Read available output of a run, closing the stream at its end.
+
+        Args:
+            fd (int): Read end of the pipe of the stream
+            run (Run): The run
+            stream (str): "stdout" or "stderr"
+
+        Returns:
+            bool: False if the stream was closed or has no data available
+        """
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return False
+        if not data:
+            self.selector.unregister(fd)
+            os.close(fd)
+            return False
+        output = run.output[stream]
+        room = self.max_output - len(output)
+        if len(data) > room:
+            run.truncated = True
+        output += data[: max(room, 0)]
+        return True
+
+    def timeout(self):
+        """
+        Return how long to wait for events before the next deadline.
+
+        Returns:
+            float | None: Seconds until the earliest deadline, or None
+        """
+        deadlines = [run.deadline for run in self.running.values() if run.deadline]
+        if not deadlines:
+            return None
+        return max(min(deadlines) - time.monotonic(), 0)
+
+    def kill_overdue(self):
+        """Kill the runs that exceeded their wall time."""
+        now = time.monotonic()
+        for pid, run in self.running.items():
+            if run.deadline is not None and now >= run.deadline and not run.timed_out:
+                run.timed_out = True
+                self.kill(pid)
+
+    @staticmethod
+    def kill(pid):
+        """
+        Kill the process group of a run, including processes it started.
+
+        Args:
+            pid (int): Process id of the child
+        """
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        """
+        Collect the results of runs that exited.
+
+        Returns:
+            list: The result dicts of the exited runs
+        """
+        results = []
+        for pid in list(self.running):
+            pid, status, rusage = os.wait4(pid, os.WNOHANG)
+            if pid == 0:
+                continue
+            run = self.running.pop(pid)
+            # Leftover processes of the run would keep its pipes open
+            self.kill(pid)
+            for key in list(self.selector.get_map().values()):
+                if key.data is not None and key.data[0] is run:
+                    while self.read_output(key.fd, *key.data):
+                        pass
+                    if key.fd in self.selector.get_map():
+                        self.selector.unregister(key.fd)
+                        os.close(key.fd)
+            results.append(run.result(status, rusage))
+        return results
+
+
+def parse_arguments(argv):
+    """
+    Parse command-line arguments of `piyathon batch`.
+
+    Args:
+        argv (list): Command-line arguments after "batch"
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="piyathon batch",
+        description="Run many Piyathon programs concurrently with resource limits",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Directories of .pi files, .pi files, or manifests listing .pi files",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of concurrent runs (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--cpu-time", type=int, help="CPU time limit of a run in seconds"
+    )
+    parser.add_argument(
+        "--wall-time",
+        type=float,
+        default=DEFAULT_WALL_TIME,
+        help=f"Wall time limit of a run in seconds (default: {DEFAULT_WALL_TIME:g})",
+    )
+    parser.add_argument(
+        "--memory", type=int, help="Address space limit of a run in MiB"
+    )
+    parser.add_argument(
+        "--max-output",
+        type=int,
+        default=DEFAULT_MAX_OUTPUT,
+        help="Bytes kept of the stdout and stderr of a run "
+        f"(default: {DEFAULT_MAX_OUTPUT})",
+    )
+    parser.add_argument("--stdin", help="stdin fixture of runs without their own")
+    parser.add_argument(
+        "-o", "--output", default="-", help="JSON lines result file (default: stdout)"
+    )
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    """
+    Run `piyathon batch`.
+
+    Args:
+        argv (list): Command-line arguments after "batch"
+
+    Returns:
+        int: 0 once every program has run, whatever its outcome, or 1 if
+             the programs could not be collected
+
+    Example:
+        $ piyathon batch submissions/ -j 8 -o results.jsonl
+    """
+    args = parse_arguments(argv)
+    cache = cache_from_arguments(args)
+    try:
+        runs = collect_runs(args.paths, args.stdin)
+    except OSError as error:
+        print(f"Error: {error}")
+        return 1
+
+    preload()
+    runner = BatchRunner(
+        jobs=args.jobs,
+        cpu_time=args.cpu_time,
+        wall_time=args.wall_time,
+        memory=None if args.memory is None else args.memory * 1024 * 1024,
+        max_output=args.max_output,
+        cache=cache,
+    )
+    # pylint: disable=consider-using-with
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    started = time.monotonic()
+    try:
+        counts = runner.run(
+            runs,
+            lambda result: output.write(json.dumps(result, ensure_ascii=False) + "\n"),
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(
+        f"{len(runs)} runs in {time.monotonic() - started:.2f} s: {summary or 'none'}",
+        file=sys.stderr,
+    )
+    return 0
@@ -0,0 +1,216 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Execution Client Module
+
+This module hands Piyathon scripts to a running execution server started by
+`piyathon serve`. It is kept separate from the server and imports as little
+as possible, since a client run is meant to take only a few milliseconds
+beyond interpreter startup.
+
+Core Functionality:
+    - Locates the server socket
+    - Checks that the server is run by the same user before handing it the
+      client's environment and standard streams
+    - Sends a script with the client's standard streams, working directory
+      and environment, and waits for its exit code
+    - Forwards SIGINT, SIGTERM and SIGHUP to the script
+
+Dependencies:
+    - socket: For the Unix socket and passing file descriptors
+    - marshal: For encoding requests without loading json
+
+Data Structures:
+    - A request is a 4-byte big-endian length, sent together with the
+      client's stdin, stdout and stderr file descriptors (SCM_RIGHTS),
+      followed by a marshalled dict with "source_file", "cwd" and "env"
+    - While the script runs, the client may send 4-byte signal numbers to be
+      delivered to the script
+    - The server answers with the 4-byte signed exit code of the script,
+      which is negative when it was killed by a signal
+
+Integration Points:
+    - Used by `piyathon --client file.pi`
+    - Protocol constants and helpers are shared with piyathon.server
+    - The socket path is set by --socket, PIYATHON_SOCKET or
+      XDG_RUNTIME_DIR, in that order of precedence, and otherwise lies in a
+      private piyathon-<uid> directory in /tmp created by the server
+
+Known Limitations:
+    - Unix only, as it relies on file descriptor passing
+    - Without SO_PEERCRED, the server is checked by the owner of the socket
+      file rather than by the credentials of the listening process
+"""
+
+import marshal
+import os
+import signal
+import socket
+import struct
+import sys
+
+SOCKET_ENV = "PIYATHON_SOCKET"
+# Request length, signal number or exit code
+MESSAGE = struct.Struct("!i")
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+# struct ucred: pid, uid and gid of the peer
+PEERCRED = struct.Struct("3i")
+
+
+def private_directory():
+    """
+    Return the directory of the socket when no runtime directory is set.
+
+    Returns:
+        str: The piyathon-<uid> directory in /tmp, which the server creates
+             with mode 0700
+    """
+    return f"/tmp/piyathon-{os.getuid()}"
+
+
+def default_socket_path():
+    """
+    Return the socket path to use when none is given explicitly.
+
+    Returns:
+        str: $PIYATHON_SOCKET, or $XDG_RUNTIME_DIR/piyathon.sock, or
+             piyathon.sock in the private directory in /tmp
+
+    Example:
+        >>> default_socket_path()
+        '/run/user/1000/piyathon.sock'
+    """
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "piyathon.sock")
+    return os.path.join(private_directory(), "piyathon.sock")
+
+
+def peer_uid(sock, socket_path):
+    """
+    Return the user id of the server at the other end of a socket.
+
+    Args:
+        sock (socket.socket): A socket connected to the server
+        socket_path (str): Path of the socket, used without SO_PEERCRED
+
+    Returns:
+        int: The uid of the server process, or of the owner of the socket
+             file where SO_PEERCRED is not available
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = sock.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, PEERCRED.size
+        )
+        return PEERCRED.unpack(credentials)[1]
+    return os.stat(socket_path).st_uid
+
+
+def receive_exactly(sock, size, data=b""):
+    """
+    Receive exactly size bytes from a stream socket.
+
+    Args:
+        sock (socket.socket): The socket to read from
+        size (int): Number of bytes to return
+        data (bytes): Bytes already received
+
+    Returns:
+        bytes: The bytes received, shorter than size if the peer closed the
+               connection first
+    """
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def run_client(source_file, socket_path=None):
+    """
+    Run a script through a running server.
+
+    The script uses the standard streams, working directory and environment
+    of the client, and SIGINT, SIGTERM and SIGHUP are forwarded to it.
+
+    Args:
+        source_file (str): Path to the Piyathon source file
+        socket_path (str | None): Path of the socket, or None for the default
+
+    Returns:
+        int: Exit code of the script, 128 + n if it was killed by signal n
+
+    Example:
+        >>> run_client("hello.pi")
+        สวัสดี
+        0
+    """
+    socket_path = socket_path or default_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        print(f"Error: No piyathon server is listening on '{socket_path}'.")
+        return 1
+    with sock:
+        if peer_uid(sock, socket_path) != os.getuid():
+            print(f"Error: The server on '{socket_path}' is run by another user.")
+            return 1
+        request = marshal.dumps(
+            {
+                "source_file": source_file,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+            }
+        )
+        socket.send_fds(sock, [MESSAGE.pack(len(request))], [0, 1, 2])
+        sock.sendall(request)
+
+        def forward(signum, _):
+            sock.sendall(MESSAGE.pack(signum))
+
+        for signum in FORWARDED_SIGNALS:
+            signal.signal(signum, forward)
+        data = receive_exactly(sock, MESSAGE.size)
+    if len(data) < MESSAGE.size:
+        print("Error: The piyathon server closed the connection.")
+        return 1
+    (code,) = MESSAGE.unpack(data)
+    return 128 - code if code < 0 else code
+
+
+def client_main(argv):
+    """
+    Run `piyathon --client [--socket PATH] file.pi` without loading argparse.
+
+    Args:
+        argv (list): Command-line arguments, without the program name
+
+    Returns:
+        int: Exit code of the script, or 2 on a usage error
+    """
+    socket_path = None
+    source_file = None
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument == "--client":
+            continue
+        if argument == "--socket":
+            socket_path = next(arguments, None)
+        elif argument.startswith("--socket="):
+            socket_path = argument.partition("=")[2]
+        elif source_file is None and not argument.startswith("-"):
+            source_file = argument
+        else:
+            source_file = None
+            break
+    if source_file is None or not source_file.endswith(".pi"):
+        print(
+            "usage: piyathon --client [--socket SOCKET] source_file.pi",
+            file=sys.stderr,
+        )
+        return 2
+    return run_client(source_file, socket_path)
@@ -0,0 +1,165 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Code Object Cache Module
+
+This module caches the compiled code objects of Piyathon source files next to
+them, in the same __pycache__ directories Python uses for .pyc files, so that
+running an unchanged .pi file skips both translation and compilation.
+
+Core Functionality:
+    - Locates the cache file of a .pi source file
+    - Loads a cached code object if it is still valid for the source
+    - Stores compiled code objects atomically
+
+Dependencies:
+    - marshal: For serializing code objects
+    - importlib.util: For the bytecode magic number of the running Python
+    - _imp: For setting the file name of cached code, as importlib does
+    - hashlib: For fingerprinting the keyword table and Piyathon version
+
+Data Structures:
+    - Cache files start with a header holding the bytecode magic number, a
+      fingerprint of the Piyathon version and keyword table, and the
+      modification time and size of the source, followed by the marshalled
+      code object
+
+Integration Points:
+    - Used by piyathon.piyathon to run .pi files, and by piyathon.hook to
+      import them; the file name of cached code is set to the path it is
+      loaded from
+    - Deliberately imports neither the translator nor tokenize, so a cache
+      hit does not load them
+
+Known Limitations:
+    - Sources are validated by modification time and size only, so an edit
+      keeping both within the timestamp resolution goes unnoticed
+    - Cache files are not written when sys.dont_write_bytecode is set or the
+      source directory is read-only
+"""
+
+import _imp
+import hashlib
+import marshal
+import os
+import struct
+import sys
+from importlib.util import MAGIC_NUMBER
+from . import __version__
+from .keywords import PI_TO_PY
+from .translation_cache import table_fingerprint, write_atomic
+
+# Magic number, translator fingerprint, source mtime in nanoseconds, source size
+HEADER = struct.Struct("<4s32sqq")
+
+
+def translator_fingerprint(translation_dict=PI_TO_PY):
+    """
+    Compute a fingerprint of everything besides the source that shapes the code.
+
+    Args:
+        translation_dict (dict): Dictionary mapping source to target keywords
+
+    Returns:
+        bytes: SHA-256 digest of the Piyathon version and the keyword table
+    """
+    digest = hashlib.sha256(f"{__version__}\0".encode("utf-8"))
+    digest.update(table_fingerprint(translation_dict).encode("ascii"))
+    return digest.digest()
+
+
+def cache_path(source_file):
+    """
+    Return the path of the cached code object of a source file.
+
+    Args:
+        source_file (str): Path to the .pi source file
+
+    Returns:
+        str | None: Path of the cache file, or None if the running Python has
+                    no bytecode cache tag
+
+    Example:
+        >>> cache_path("examples/hello.pi")
+        'examples/__pycache__/hello.cpython-312.pi.pyc'
+    """
+    if sys.implementation.cache_tag is None:
+        return None
+    head, tail = os.path.split(source_file)
+    stem = os.path.splitext(tail)[0]
+    return os.path.join(
+        head, "__pycache__", f"{stem}.{sys.implementation.cache_tag}.pi.pyc"
+    )
+
+
+def source_header(source_stat, fingerprint):
+    """
+    Build the cache file header expected for a source file.
+
+    Args:
+        source_stat (os.stat_result): Status of the source file
+        fingerprint (bytes): Result of translator_fingerprint()
+
+    Returns:
+        bytes: The header
+    """
+    return HEADER.pack(
+        MAGIC_NUMBER, fingerprint, source_stat.st_mtime_ns, source_stat.st_size
+    )
+
+
+def load_code(source_file, source_stat, fingerprint):
+    """
+    Load the cached code object of a source file if it is still valid.
+
+    Args:
+        source_file (str): Path to the .pi source file
+        source_stat (os.stat_result): Current status of the source file
+        fingerprint (bytes): Result of translator_fingerprint()
+
+    Returns:
+        types.CodeType | None: The cached code object, with its file name set
+                               to source_file as importlib does, or None on a
+                               miss
+    """
+    path = cache_path(source_file)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if data[: HEADER.size] != source_header(source_stat, fingerprint):
+        return None
+    try:
+        code = marshal.loads(memoryview(data)[HEADER.size :])
+    except (EOFError, ValueError, TypeError):
+        return None
+    # The cache file is shared by runs that name the source differently
+    _imp._fix_co_filename(code, source_file)  # pylint: disable=protected-access
+    return code
+
+
+def store_code(source_file, source_stat, fingerprint, code):
+    """
+    Store the compiled code object of a source file atomically.
+
+    Failures to write are ignored, since the cache is only an optimization.
+
+    Args:
+        source_file (str): Path to the .pi source file
+        source_stat (os.stat_result): Status of the source file that was compiled
+        fingerprint (bytes): Result of translator_fingerprint()
+        code (types.CodeType): The compiled code object
+    """
+    path = cache_path(source_file)
+    if path is None or sys.dont_write_bytecode:
+        return
+    try:
+        write_atomic(
+            path, source_header(source_stat, fingerprint) + marshal.dumps(code)
+        )
+    except OSError:
+        return
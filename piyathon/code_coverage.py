@@ -0,0 +1,774 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Code Coverage Module
+
+This module measures the line and branch coverage of .pi code for
+`piyathon --coverage` and reports it with `piyathon coverage`. It is built on
+sys.monitoring (PEP 669) with its own coverage tool, so it can run together
+with the profilers: line events are only enabled for the code objects
+compiled from .pi files, and each line event is disabled once the line has
+run, so covered code soon runs at full speed. Branches are measured on
+request, as they cost an event each time a branch goes the way it always
+went.
+
+Core Functionality:
+    - Records the lines of .pi code that ran, and optionally the branches
+      taken between lines
+    - Finds the statements and branches of each file from its code objects,
+      including functions that never ran
+    - Merges the data of many runs and processes into one data file, so a
+      test suite running many .pi programs builds up one report
+    - Reports a summary with the missing lines and branches, an annotated
+      listing of each file, and fails below a minimum coverage
+
+Dependencies:
+    - sys.monitoring: For line and branch events
+    - dis: For the branches of the code objects
+    - json: For the data file
+    - fcntl: For locking the data file while merging, where available
+    - translation_cache: For writing the data file atomically
+
+Data Structures:
+    - The data file is a JSON object holding a "files" object, keyed by
+      absolute path, with for each file its "fingerprint" (modification time
+      and size), its "statements" and "executed" lines, the "branches" each
+      line can take and the ones "taken", as lists of destination lines keyed
+      by line
+    - A branch is an arc from a line to another line, such as from the
+      condition of an if statement to its body or to the line after it
+
+Integration Points:
+    - Used as an instrument by piyathon.piyathon.run_file: started right
+      before the user code and stopped right after it
+    - The data are merged into the data file when the interpreter exits
+    - PIYATHON_COVERAGE enables coverage in every run, and
+      PIYATHON_COVERAGE_BRANCH branch coverage, including in child
+      processes, which `piyathon --coverage` sets them for
+    - Line numbers are those of the .pi files, as translation keeps them
+
+Usage Examples:
+    $ piyathon --coverage tests/test_grades.pi
+    $ piyathon --coverage --coverage-branch tests/test_grades.pi
+    $ PIYATHON_COVERAGE=.piyathon-coverage pytest
+    $ piyathon coverage --annotate --fail-under=90
+
+Known Limitations:
+    - Only files that run at least once are reported
+    - Measuring branches slows down loops and conditions that always go
+      the same way several times
+    - A lambda or generator expression that never runs is not reported
+      as missing, as its line runs when it is defined
+    - Branches are arcs between lines, so conditions within a line, as in
+      a comprehension, and branches leaving their function or module, as
+      at the end of its last loop, are not measured
+    - Data of a file changed since a run is replaced by that of the next run
+    - Runs of `piyathon batch` and multiprocessing workers are not measured
+"""
+
+import argparse
+import dis
+import json
+import os
+import sys
+import types
+from .translation_cache import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows, where runs merge without locking
+    fcntl = None
+
+TOOL_ID = sys.monitoring.COVERAGE_ID
+COVERAGE_ENV = "PIYATHON_COVERAGE"
+BRANCH_ENV = "PIYATHON_COVERAGE_BRANCH"
+DEFAULT_DATA_FILE = ".piyathon-coverage"
+# Conditional jumps, the instructions raising branch events
+BRANCH_OPCODES = {
+    dis.opmap[name]
+    for name in (
+        "POP_JUMP_IF_FALSE",
+        "POP_JUMP_IF_TRUE",
+        "POP_JUMP_IF_NONE",
+        "POP_JUMP_IF_NOT_NONE",
+        "FOR_ITER",
+    )
+    if name in dis.opmap
+}
+JUMP_OPCODES = set(dis.hasjrel) | set(dis.hasjabs)
+EXIT_OPNAMES = {"RETURN_VALUE", "RETURN_CONST", "RAISE_VARARGS", "RERAISE"}
+UNCONDITIONAL_JUMP_OPNAMES = {
+    "JUMP_FORWARD",
+    "JUMP_BACKWARD",
+    "JUMP_BACKWARD_NO_INTERRUPT",
+}
+
+
+def data_file(option=None):
+    """
+    Select the data file from the command-line option or the environment.
+
+    Args:
+        option (str | None): Value of --coverage, None if not given
+
+    Returns:
+        str | None: Path of the data file, or None if coverage is disabled
+
+    Example:
+        >>> os.environ["PIYATHON_COVERAGE"] = ".piyathon-coverage"
+        >>> data_file()
+        '.piyathon-coverage'
+    """
+    if option:
+        return option
+    return os.environ.get(COVERAGE_ENV) or None
+
+
+def branch_coverage(option=False):
+    """
+    Select whether branches are measured, from the option or the environment.
+
+    Args:
+        option (bool): Whether --coverage-branch was given
+
+    Returns:
+        bool: True if --coverage-branch was given or PIYATHON_COVERAGE_BRANCH
+              is set to anything but "" and "0"
+    """
+    return option or os.environ.get(BRANCH_ENV, "") not in ("", "0")
+
+
+def walk_codes(code):
+    """
+    Yield a code object and the code objects nested in it.
+
+    Args:
+        code (types.CodeType): The outermost code object
+
+    Yields:
+        types.CodeType: The code object, then the nested ones depth first
+    """
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from walk_codes(const)
+
+
+class CodeBranches:
+    """
+    The branches of a code object between lines.
+
+    Attributes:
+        instructions (list): Instructions of the code object
+        indexes (dict): Index of each instruction by offset
+    """
+
+    def __init__(self, code):
+        """
+        Disassemble a code object.
+
+        Args:
+            code (types.CodeType): The code object
+        """
+        self.instructions = list(dis.get_instructions(code))
+        self.indexes = {
+            instruction.offset: index
+            for index, instruction in enumerate(self.instructions)
+        }
+
+    def destination(self, offset, line):
+        """
+        Find the line a branch goes to.
+
+        Instructions of the branch's own line are followed until the line
+        changes, as in a for loop storing its target before its body, and so
+        are unconditional jumps, as from the end of a loop body back to the
+        loop.
+
+        Args:
+            offset (int): Offset the branch goes to
+            line (int): Line of the branch
+
+        Returns:
+            int | None: The destination line, None if the branch stays on its
+                        own line
+        """
+        index = self.indexes.get(offset)
+        seen = set()
+        while index is not None and index < len(self.instructions):
+            if index in seen:
+                return None
+            seen.add(index)
+            instruction = self.instructions[index]
+            index += 1
+            if instruction.opname == "END_FOR":
+                continue
+            destination = instruction.positions.lineno
+            if destination is not None and destination != line:
+                return destination
+            if instruction.opname in UNCONDITIONAL_JUMP_OPNAMES:
+                index = self.indexes.get(instruction.argval)
+            elif (
+                instruction.opcode in JUMP_OPCODES or instruction.opname in EXIT_OPNAMES
+            ):
+                return None
+        return None
+
+    def branches(self):
+        """
+        Find the branches of the code object.
+
+        Returns:
+            dict: Line and set of destination lines of each branch, by
+                  offset
+        """
+        branches = {}
+        for index, instruction in enumerate(self.instructions):
+            if instruction.opcode not in BRANCH_OPCODES:
+                continue
+            line = instruction.positions.lineno
+            destinations = {
+                self.destination(self.instructions[index + 1].offset, line),
+                self.destination(instruction.argval, line),
+            }
+            destinations.discard(None)
+            branches[instruction.offset] = (line, destinations)
+        return branches
+
+
+def code_data(codes, executed, taken):
+    """
+    Collect the coverage data of each file from the code objects that ran.
+
+    Args:
+        codes (list): Code objects of .pi files that ran
+        executed (set): (file name, line) of each line that ran
+        taken (dict | None): Set of destination offsets of each
+                             (code, offset) branch that ran, None if
+                             branches were not measured
+
+    Returns:
+        dict: Coverage data of each file by absolute path, as in the data
+              file, without branches if they were not measured
+    """
+    files = {}
+    seen = set()
+    for outer in codes:
+        for code in walk_codes(outer):
+            if code in seen:
+                continue
+            seen.add(code)
+            data = files.get(code.co_filename)
+            if data is None:
+                data = files[code.co_filename] = {
+                    "statements": set(),
+                    "executed": set(),
+                    "branches": {},
+                    "taken": {},
+                }
+            data["statements"].update(line for _, _, line in code.co_lines() if line)
+            if taken is None:
+                continue
+            code_branches = CodeBranches(code)
+            for offset, (line, destinations) in code_branches.branches().items():
+                data["branches"].setdefault(line, set()).update(destinations)
+                for destination in taken.get((code, offset), ()):
+                    destination = code_branches.destination(destination, line)
+                    if destination is not None:
+                        data["taken"].setdefault(line, set()).add(destination)
+    for filename, line in executed:
+        if filename in files:
+            files[filename]["executed"].add(line)
+
+    result = {}
+    for filename, data in files.items():
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        branches = {
+            line: destinations
+            for line, destinations in data["branches"].items()
+            if len(destinations) > 1
+        }
+        result[path] = {
+            "fingerprint": [stat.st_mtime_ns, stat.st_size],
+            "statements": sorted(data["statements"]),
+            "executed": sorted(data["executed"]),
+            "branches": {
+                str(line): sorted(destinations)
+                for line, destinations in sorted(branches.items())
+            },
+            "taken": {
+                str(line): sorted(destinations & branches[line])
+                for line, destinations in sorted(data["taken"].items())
+                if line in branches
+            },
+        }
+    return result
+
+
+def merge(data, files):
+    """
+    Merge the coverage data of a run into the data of earlier runs.
+
+    Args:
+        data (dict): Contents of the data file, updated in place
+        files (dict): Coverage data of each file of the run
+
+    Returns:
+        dict: The updated data
+    """
+    merged = data.setdefault("files", {})
+    for path, new in files.items():
+        old = merged.get(path)
+        if old is None or old["fingerprint"] != new["fingerprint"]:
+            merged[path] = new
+            continue
+        for key in ("statements", "executed"):
+            old[key] = sorted(set(old[key]) | set(new[key]))
+        for key in ("branches", "taken"):
+            for line, destinations in new[key].items():
+                old[key][line] = sorted(set(old[key].get(line, ())) | set(destinations))
+    return data
+
+
+def load(path):
+    """
+    Read a data file.
+
+    Args:
+        path (str): Path of the data file
+
+    Returns:
+        dict: Its contents, with no files if it does not exist
+
+    Raises:
+        ValueError: If the file is not a coverage data file
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {"files": {}}
+    if not isinstance(data, dict) or not isinstance(data.get("files"), dict):
+        raise ValueError(f"'{path}' is not a Piyathon coverage data file")
+    return data
+
+
+def save(path, files):
+    """
+    Merge the coverage data of a run into a data file.
+
+    The data file is locked through a .lock file next to it while it is
+    merged, so that concurrent runs do not lose each other's data.
+
+    Args:
+        path (str): Path of the data file
+        files (dict): Coverage data of each file of the run
+
+    Returns:
+        dict: The merged contents of the data file
+    """
+    path = os.path.abspath(path)
+    with open(f"{path}.lock", "a", encoding="utf-8") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        data = merge(load(path), files)
+        write_atomic(path, json.dumps(data).encode("utf-8"))
+    return data
+
+
+def file_summary(data):
+    """
+    Count the statements and branches of a file.
+
+    Args:
+        data (dict): Coverage data of the file
+
+    Returns:
+        tuple: Statements, missed statements, branches, missed branches,
+               partial branch lines and the coverage in percent
+    """
+    statements = len(data["statements"])
+    missed = len(set(data["statements"]) - set(data["executed"]))
+    branches = sum(len(destinations) for destinations in data["branches"].values())
+    taken = sum(len(destinations) for destinations in data["taken"].values())
+    partial = sum(
+        1
+        for line, destinations in data["taken"].items()
+        if len(destinations) < len(data["branches"][line])
+    )
+    return (
+        statements,
+        missed,
+        branches,
+        branches - taken,
+        partial,
+        coverage_percent(statements, missed, branches, branches - taken),
+    )
+
+
+def coverage_percent(statements, missed, branches, missed_branches):
+    """
+    Compute a coverage percentage, counting statements and branches alike.
+
+    Args:
+        statements (int): Number of statements
+        missed (int): Number of statements that never ran
+        branches (int): Number of branches
+        missed_branches (int): Number of branches never taken
+
+    Returns:
+        float: The coverage in percent, 100 without statements
+    """
+    total = statements + branches
+    if not total:
+        return 100.0
+    return 100.0 * (total - missed - missed_branches) / total
+
+
+def total_summary(data):
+    """
+    Count the statements and branches of all files.
+
+    Args:
+        data (dict): Contents of the data file
+
+    Returns:
+        tuple: The totals of file_summary() over all files, with the
+               coverage of all files in percent
+    """
+    totals = [0, 0, 0, 0, 0]
+    for file_data in data["files"].values():
+        summary = file_summary(file_data)
+        totals = [total + value for total, value in zip(totals, summary)]
+    return tuple(totals) + (coverage_percent(*totals[:4]),)
+
+
+def missing(data):
+    """
+    Describe the missing lines and branches of a file.
+
+    Args:
+        data (dict): Coverage data of the file
+
+    Returns:
+        str: Ranges of consecutive missed statements, then the branches
+             not taken from lines that ran, such as "3-5, 9, 12->15"
+    """
+    executed = set(data["executed"])
+    ranges = []
+    start = end = None
+    for line in data["statements"]:
+        if line in executed:
+            if start is not None:
+                ranges.append(f"{start}" if start == end else f"{start}-{end}")
+                start = None
+        else:
+            if start is None:
+                start = line
+            end = line
+    if start is not None:
+        ranges.append(f"{start}" if start == end else f"{start}-{end}")
+    for line, destinations in data["branches"].items():
+        if int(line) not in executed:
+            continue
+        not_taken = set(destinations) - set(data["taken"].get(line, ()))
+        ranges.extend(f"{line}->{destination}" for destination in sorted(not_taken))
+    return ", ".join(ranges)
+
+
+def display_path(path):
+    """
+    Shorten a path to be relative to the working directory, if it is in it.
+
+    Args:
+        path (str): Absolute path
+
+    Returns:
+        str: The relative path, or the absolute one outside the directory
+    """
+    relative = os.path.relpath(path)
+    return path if relative.startswith("..") else relative
+
+
+def format_summary(data):
+    """
+    Format the coverage of each file and in total.
+
+    Args:
+        data (dict): Contents of the data file
+
+    Returns:
+        str: A table of statements, misses, branches, partial branches,
+             coverage and missing lines per file, then the total
+    """
+    rows = [
+        (display_path(path),)
+        + file_summary(data["files"][path])
+        + (missing(data["files"][path]),)
+        for path in sorted(data["files"])
+    ]
+    rows.append(("TOTAL",) + total_summary(data) + ("",))
+
+    width = max(len("Name"), *(len(row[0]) for row in rows))
+    header = (
+        f"{'Name':<{width}} {'Stmts':>6} {'Miss':>6} {'Branch':>6} "
+        f"{'BrMiss':>6} {'BrPart':>6} {'Cover':>7}   Missing"
+    )
+    rule = "-" * len(header)
+    lines = [header, rule]
+    for index, row in enumerate(rows):
+        if index == len(rows) - 1:
+            lines.append(rule)
+        name, statements, missed, branches, missed_branches, partial, percent, text = (
+            row
+        )
+        lines.append(
+            f"{name:<{width}} {statements:>6} {missed:>6} {branches:>6} "
+            f"{missed_branches:>6} {partial:>6} {percent:>6.1f}%   {text}".rstrip()
+        )
+    return "\n".join(lines)
+
+
+def format_annotated(path, data):
+    """
+    Format the listing of a file with the coverage of each line.
+
+    Lines are marked with ">" if they ran, "!" if they did not, and "~" if
+    they ran without taking all of their branches, followed by the lines
+    they never went to.
+
+    Args:
+        path (str): Path of the file
+        data (dict): Coverage data of the file
+
+    Returns:
+        str: The annotated listing, or a note if the file cannot be read
+    """
+    try:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            source = file.read().splitlines()
+    except OSError:
+        return f"File: {display_path(path)} (cannot be read)"
+    statements = set(data["statements"])
+    executed = set(data["executed"])
+    lines = [f"File: {display_path(path)}"]
+    for line, text in enumerate(source, 1):
+        marker = " "
+        note = ""
+        if line in executed:
+            marker = ">"
+            not_taken = set(data["branches"].get(str(line), ())) - set(
+                data["taken"].get(str(line), ())
+            )
+            if not_taken:
+                marker = "~"
+                targets = ", ".join(str(target) for target in sorted(not_taken))
+                note = f"  # never went to line {targets}"
+        elif line in statements:
+            marker = "!"
+        lines.append(f"{line:>6} {marker} {text}{note}")
+    return "\n".join(lines)
+
+
+class CoverageRecorder:
+    """
+    An instrument recording the lines and branches of .pi code that run.
+
+    Line events are disabled once a line has run, so each line costs one
+    event per run. Branch events are disabled once both ways of a branch
+    were taken, so branches that always go the same way keep costing events.
+
+    Attributes:
+        output (str): Absolute path of the data file
+        report_summary (bool): Whether report() prints the summary
+        codes (list): Code objects whose events are enabled
+        executed (set): (file name, line) of each line that ran
+        taken (dict | None): Set of destination offsets of each
+                             (code, offset) branch that ran, None if
+                             branches are not measured
+        files (dict): Coverage data of each file, once stopped
+
+    Methods:
+        start(): Start recording
+        stop(): Stop recording and collect the data
+        report(file): Merge the data into the data file and print a summary
+
+    Example:
+        >>> recorder = CoverageRecorder(".piyathon-coverage")
+        >>> recorder.start()
+        >>> exec(compile(source, "hello.pi", "exec"), {})
+        >>> recorder.stop()
+        >>> recorder.report()
+    """
+
+    def __init__(self, output, branch=False, report_summary=True):
+        """
+        Create a recorder.
+
+        Args:
+            output (str): Path of the data file
+            branch (bool): Whether branches are measured
+            report_summary (bool): Whether report() prints the summary of
+                                   the data file
+        """
+        self.output = os.path.abspath(output)
+        self.report_summary = report_summary
+        self.codes = []
+        self.executed = set()
+        self.taken = {} if branch else None
+        self.files = {}
+
+    def start(self):
+        """
+        Start recording.
+
+        Raises:
+            ValueError: If another tool uses the coverage tool id
+        """
+        monitoring = sys.monitoring
+        monitoring.use_tool_id(TOOL_ID, "piyathon coverage")
+        for event, callback in self.callbacks().items():
+            monitoring.register_callback(TOOL_ID, event, callback)
+        monitoring.set_events(TOOL_ID, monitoring.events.PY_START)
+
+    def callbacks(self):
+        """
+        Create the event callbacks.
+
+        Starting a code object of a .pi file enables its line events, and
+        branch events if branches are measured; the start event is then
+        disabled for every code object.
+
+        Returns:
+            dict: Callback of each monitored event
+        """
+        monitoring = sys.monitoring
+        events = monitoring.events
+        local_events = events.LINE
+        if self.taken is not None:
+            local_events |= events.BRANCH
+        set_local_events = monitoring.set_local_events
+        disable = monitoring.DISABLE
+        codes = self.codes
+        executed = self.executed
+        taken = self.taken
+
+        def start(code, _offset):
+            if code.co_filename.endswith(".pi"):
+                set_local_events(TOOL_ID, code, local_events)
+                codes.append(code)
+            return disable
+
+        def line(code, line_number):
+            executed.add((code.co_filename, line_number))
+            return disable
+
+        def branch(code, offset, destination):
+            key = (code, offset)
+            destinations = taken.get(key)
+            if destinations is None:
+                taken[key] = {destination}
+                return None
+            destinations.add(destination)
+            return disable if len(destinations) > 1 else None
+
+        return {events.PY_START: start, events.LINE: line, events.BRANCH: branch}
+
+    def stop(self):
+        """Stop recording and collect the coverage data of each file."""
+        monitoring = sys.monitoring
+        monitoring.set_events(TOOL_ID, 0)
+        for code in self.codes:
+            monitoring.set_local_events(TOOL_ID, code, 0)
+        for event in self.callbacks():
+            monitoring.register_callback(TOOL_ID, event, None)
+        monitoring.free_tool_id(TOOL_ID)
+        self.files = code_data(self.codes, self.executed, self.taken)
+
+    def report(self, file=None):
+        """
+        Merge the data into the data file and print its summary, as
+        registered with atexit. Nothing is done if no .pi code ran.
+
+        Args:
+            file (file | None): Where to print, None for sys.stderr
+        """
+        if not self.files:
+            return
+        data = save(self.output, self.files)
+        if self.report_summary:
+            print(format_summary(data), file=file or sys.stderr, flush=True)
+
+
+def parse_arguments(argv):
+    """
+    Parse command-line arguments of `piyathon coverage`.
+
+    Args:
+        argv (list): Command-line arguments after "coverage"
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="piyathon coverage",
+        description="Report the coverage data of 'piyathon --coverage' runs",
+    )
+    parser.add_argument(
+        "--data-file",
+        default=data_file() or DEFAULT_DATA_FILE,
+        help=f"Coverage data file (default: ${COVERAGE_ENV} or {DEFAULT_DATA_FILE})",
+    )
+    parser.add_argument(
+        "--annotate",
+        action="store_true",
+        help="Print each file with the coverage of its lines after the summary",
+    )
+    parser.add_argument(
+        "--fail-under",
+        type=float,
+        metavar="PERCENT",
+        help="Exit with status 2 if the total coverage is below PERCENT",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    """
+    Run `piyathon coverage`.
+
+    Args:
+        argv (list): Command-line arguments after "coverage"
+
+    Returns:
+        int: 0 on success, 1 if the data file cannot be read, or 2 if the
+             coverage is below --fail-under
+
+    Example:
+        $ piyathon coverage --annotate --fail-under=90
+    """
+    args = parse_arguments(argv)
+    try:
+        data = load(args.data_file)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+        return 1
+    if not data["files"]:
+        print(f"No coverage data in '{args.data_file}'")
+        return 1
+    print(format_summary(data))
+    if args.annotate:
+        for path in sorted(data["files"]):
+            print()
+            print(format_annotated(path, data["files"][path]))
+    if args.fail_under is not None:
+        percent = total_summary(data)[-1]
+        if percent < args.fail_under:
+            print(f"Coverage {percent:.1f}% is below {args.fail_under:g}%")
+            return 2
+    return 0
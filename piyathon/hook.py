@@ -0,0 +1,174 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Import Hook Module
+
+This module lets Python import Piyathon (.pi) modules and packages found on
+sys.path, translating them on first import and caching their bytecode like
+regular .py modules. Importing this module installs the hook.
+
+Core Functionality:
+    - Finds .pi modules and packages with an __init__.pi on sys.path
+    - Translates and compiles them with PiyathonTranslator
+    - Caches the compiled code in __pycache__, invalidated by source
+      modification time and size, Piyathon version and keyword table
+
+Dependencies:
+    - importlib.machinery: For directory scanning and module loading, with
+      a path hook taking over from the regular directory finder
+    - code_cache: For the bytecode cache shared with the piyathon runner
+    - piyathon_translator: For translation, imported only when a module has
+      to be translated
+
+Integration Points:
+    - Installed automatically by the piyathon runner
+    - Available to plain Python through `import piyathon.hook`
+
+Usage Examples:
+    >>> import piyathon.hook
+    >>> import my_piyathon_module  # my_piyathon_module.pi on sys.path
+
+Known Limitations:
+    - .pi modules are not found in zip files
+    - Bytecode is cached per Python version, not per optimization level
+"""
+
+import os
+import sys
+from importlib.machinery import (
+    BYTECODE_SUFFIXES,
+    EXTENSION_SUFFIXES,
+    SOURCE_SUFFIXES,
+    ExtensionFileLoader,
+    FileFinder,
+    SourceFileLoader,
+    SourcelessFileLoader,
+)
+from .code_cache import cache_path, load_code, store_code, translator_fingerprint
+from .keywords import PI_TO_PY
+
+PIYATHON_SUFFIXES = [".pi"]
+
+
+class PiyathonLoader(SourceFileLoader):
+    """
+    A loader that translates Piyathon modules and caches their bytecode.
+
+    Source, package detection and resource access are inherited from
+    SourceFileLoader; only code creation differs.
+
+    Methods:
+        get_code(fullname): Return cached or freshly compiled module code
+        source_to_code(data, path): Translate and compile Piyathon source
+    """
+
+    # Computed on first use, shared by all loaders of the process
+    fingerprint = None
+
+    def get_code(self, fullname):
+        """
+        Return the code object of a module, using the bytecode cache.
+
+        Args:
+            fullname (str): Fully qualified module name
+
+        Returns:
+            types.CodeType: The module code
+        """
+        path = self.get_filename(fullname)
+        if PiyathonLoader.fingerprint is None:
+            PiyathonLoader.fingerprint = translator_fingerprint()
+        source_stat = os.stat(path)
+        code = load_code(path, source_stat, PiyathonLoader.fingerprint)
+        if code is None:
+            code = self.source_to_code(self.get_data(path), path)
+            store_code(path, source_stat, PiyathonLoader.fingerprint, code)
+        return code
+
+    def source_to_code(self, data, path, *, _optimize=-1):
+        """
+        Translate Piyathon source to Python and compile it.
+
+        Args:
+            data (bytes): The encoded Piyathon source
+            path (str): Path of the source file, used in tracebacks
+
+        Returns:
+            types.CodeType: The compiled module code
+        """
+        # Only needed on a cache miss, so cached imports do not load tokenize
+        from .piyathon_translator import (  # pylint: disable=import-outside-toplevel
+            PiyathonTranslator,
+        )
+
+        python_code = PiyathonTranslator.translate_bytes(data, PI_TO_PY)
+        return compile(python_code, path, "exec", dont_inherit=True, optimize=_optimize)
+
+
+class PiyathonFileFinder(FileFinder):
+    """
+    A directory finder that also knows Piyathon modules and packages.
+
+    It replaces the regular directory finder through its path hook, with the
+    regular suffixes followed by .pi, so a .py module wins over a .pi module
+    in the same directory and packages with an __init__.pi are not taken for
+    namespace packages. Everything else, sys.path order and entries handled
+    by other path hooks such as zip files included, stays with the regular
+    path finder.
+
+    Methods:
+        find_spec(fullname, target): Find the spec of a module
+    """
+
+    def find_spec(self, fullname, target=None):
+        """
+        Find the spec of a module or package in the directory.
+
+        Args:
+            fullname (str): Fully qualified module name
+            target (module | None): Module being reloaded, if any
+
+        Returns:
+            ModuleSpec | None: The spec, with the cache file of a .pi module
+        """
+        spec = super().find_spec(fullname, target)
+        if spec is not None and isinstance(spec.loader, PiyathonLoader):
+            spec.cached = cache_path(spec.origin)
+        return spec
+
+
+path_hook = PiyathonFileFinder.path_hook(
+    (ExtensionFileLoader, EXTENSION_SUFFIXES),
+    (SourceFileLoader, SOURCE_SUFFIXES),
+    (SourcelessFileLoader, BYTECODE_SUFFIXES),
+    (PiyathonLoader, PIYATHON_SUFFIXES),
+)
+
+
+def install():
+    """
+    Install the Piyathon path hook in sys.path_hooks, once.
+
+    The hook is placed before the regular directory hook, and the directory
+    finders it replaces are dropped from sys.path_importer_cache, so that
+    directories already searched are searched again for .pi modules.
+
+    Returns:
+        callable: The installed path hook
+    """
+    if path_hook in sys.path_hooks:
+        return path_hook
+    index = len(sys.path_hooks)
+    for position, hook in enumerate(sys.path_hooks):
+        if getattr(hook, "__name__", "") == "path_hook_for_FileFinder":
+            index = position
+            break
+    sys.path_hooks.insert(index, path_hook)
+    for entry, finder in list(sys.path_importer_cache.items()):
+        if type(finder) is FileFinder:  # pylint: disable=unidiomatic-typecheck
+            del sys.path_importer_cache[entry]
+    return path_hook
+
+
+install()
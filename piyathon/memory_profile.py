@@ -0,0 +1,275 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Memory Profiling Module
+
+This module finds where Piyathon scripts allocate memory, for
+`piyathon --memprofile`. Allocations are traced with tracemalloc and
+attributed to the innermost line of .pi code on their traceback, so memory
+allocated by library code is attributed to the .pi line that called it.
+
+Core Functionality:
+    - Traces the translation of the script and its user code separately
+    - Reports the top allocation sites by .pi line and the peak memory
+    - Reports on exit, and on SIGUSR1 while the script runs
+    - Reports the growth of each site since the previous SIGUSR1 report,
+      to compare two points of a run
+
+Dependencies:
+    - tracemalloc: For tracing memory allocations
+    - signal: For reports on SIGUSR1
+    - linecache: For the source lines of the allocation sites
+
+Data Structures:
+    - Sites are keyed by (file name, line) of .pi code; allocations without
+      .pi code on their traceback are counted as outside .pi code
+
+Integration Points:
+    - Created by piyathon.piyathon.create_instruments before the script is
+      read, so that its translation is traced
+    - Used as an instrument by piyathon.piyathon.run_file: started right
+      before the user code and stopped right after it
+    - Reports are written to stderr
+
+Usage Examples:
+    $ piyathon --memprofile data.pi
+    $ kill -USR1 <pid>  # Report while data.pi runs, then again to compare
+
+Known Limitations:
+    - Tracing slows down allocations and takes memory of its own
+    - Only the innermost frames of a traceback are kept, so an allocation
+      made too deep in library code is counted as outside .pi code
+    - SIGUSR1 reports are only available on Unix
+"""
+
+import linecache
+import signal
+import sys
+import tracemalloc
+
+TRACEBACK_FRAMES = 8
+TOP_SITES = 10
+
+
+def format_size(size):
+    """
+    Format a size in bytes with a binary unit.
+
+    Args:
+        size (int): The size in bytes, possibly negative
+
+    Returns:
+        str: The size, such as "1.5 MiB"
+
+    Example:
+        >>> format_size(1536)
+        '1.5 KiB'
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def site_stats(snapshot):
+    """
+    Group the traced allocations of a snapshot by .pi line.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): The snapshot
+
+    Returns:
+        dict: [size, blocks] of each (file name, line) of .pi code, with the
+              allocations without .pi code under None; allocations made by
+              this module, as for a SIGUSR1 report, are left out
+    """
+    stats = {}
+    # Grouping by traceback first is much faster than going through the
+    # traces, as most allocations share their traceback with others
+    for statistic in snapshot.statistics("traceback"):
+        key = None
+        # Frames are ordered from the oldest to the most recent
+        for frame in reversed(statistic.traceback):
+            if frame.filename == __file__:
+                key = __file__
+                break
+            if frame.filename.endswith(".pi"):
+                key = (frame.filename, frame.lineno)
+                break
+        if key == __file__:
+            continue
+        site = stats.get(key)
+        if site is None:
+            site = stats[key] = [0, 0]
+        site[0] += statistic.size
+        site[1] += statistic.count
+    return stats
+
+
+class MemoryProfiler:
+    """
+    An instrument tracing the memory allocated by the translation and by
+    the user code of a run.
+
+    Tracing starts when the profiler is created, so that the translation of
+    the script is traced; start() marks the beginning of the user code.
+
+    Attributes:
+        translation (tuple | None): Bytes still allocated and allocated at
+                                    peak when the user code started
+        previous (dict | None): Site statistics of the previous SIGUSR1
+                                report
+        peak (int): Bytes allocated at peak by the process since start()
+        user_peak (int): Part of the peak allocated by the user code
+        top (int): Number of sites reported
+
+    Methods:
+        start(): Mark the beginning of the user code
+        stop(): Mark the end of the user code
+        format_report(): Format the allocation sites
+        report(file): Print the report
+
+    Example:
+        >>> profiler = MemoryProfiler()
+        >>> code = compile(translate(source), "data.pi", "exec")
+        >>> profiler.start()
+        >>> exec(code, namespace)
+        >>> profiler.stop()
+        >>> profiler.report()
+    """
+
+    def __init__(self, top=TOP_SITES):
+        """
+        Start tracing.
+
+        Args:
+            top (int): Number of sites reported
+        """
+        self.top = top
+        self.translation = None
+        self.previous = None
+        self.snapshot = None
+        self.peak = 0
+        self.previous_handler = None
+        tracemalloc.start(TRACEBACK_FRAMES)
+
+    def start(self):
+        """Mark the beginning of the user code and report on SIGUSR1."""
+        self.translation = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        if hasattr(signal, "SIGUSR1"):
+            self.previous_handler = signal.signal(signal.SIGUSR1, self.on_signal)
+
+    def stop(self):
+        """Mark the end of the user code and stop tracing."""
+        self.take_snapshot()
+        tracemalloc.stop()
+        if self.previous_handler is not None:
+            signal.signal(signal.SIGUSR1, self.previous_handler)
+            self.previous_handler = None
+
+    def take_snapshot(self):
+        """Take a snapshot of the allocations of the user code so far."""
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+
+    @property
+    def user_peak(self):
+        """Bytes allocated at peak, less those still held from translation."""
+        if self.translation is None:
+            return self.peak
+        return max(self.peak - self.translation[0], 0)
+
+    def on_signal(self, _signum, _frame):
+        """Report while the script runs, keeping the sites to compare with."""
+        self.take_snapshot()
+        stats = site_stats(self.snapshot)
+        self.report(stats=stats)
+        self.previous = stats
+
+    def format_report(self, stats=None):
+        """
+        Format the translation memory, the peak and the top allocation sites.
+
+        Args:
+            stats (dict | None): Result of site_stats() for the last snapshot,
+                                 None to compute it
+
+        Returns:
+            str: The report, followed by the growth of the sites since the
+                 previous SIGUSR1 report if there was one
+        """
+        if stats is None:
+            stats = site_stats(self.snapshot)
+        lines = ["Memory profile"]
+        if self.translation is not None:
+            current, peak = self.translation
+            lines.append(
+                f"Reading and translating: {format_size(peak)} at peak, "
+                f"{format_size(current)} still allocated"
+            )
+        lines.append(f"User code: {format_size(self.user_peak)} at peak")
+        lines.append("Top allocation sites in .pi code:")
+        lines.extend(self.format_sites(stats))
+        outside = stats.get(None, [0, 0])
+        lines.append(
+            f"Outside .pi code: {format_size(outside[0])} in {outside[1]:,} blocks"
+        )
+        if self.previous is not None:
+            growth = {
+                key: [
+                    size - self.previous.get(key, [0, 0])[0],
+                    blocks - self.previous.get(key, [0, 0])[1],
+                ]
+                for key, (size, blocks) in stats.items()
+            }
+            for key, (size, blocks) in self.previous.items():
+                if key not in stats:
+                    growth[key] = [-size, -blocks]
+            lines.append("Growth since the previous report:")
+            lines.extend(self.format_sites(growth, growth=True))
+        return "\n".join(lines)
+
+    def format_sites(self, sites, growth=False):
+        """
+        Format the largest sites of .pi code.
+
+        Args:
+            sites (dict): [size, blocks] of each site
+            growth (bool): Whether the sizes are changes, shown with a sign
+
+        Returns:
+            list: One line per site with its size, blocks and source line
+        """
+        keys = sorted(
+            (key for key, (size, _) in sites.items() if key is not None and size),
+            key=lambda key: abs(sites[key][0]),
+            reverse=True,
+        )
+        sign = "+" if growth else ""
+        lines = []
+        for filename, line in keys[: self.top]:
+            size, blocks = sites[(filename, line)]
+            size_text = format_size(size)
+            if growth and size > 0:
+                size_text = f"+{size_text}"
+            source = linecache.getline(filename, line).strip()
+            lines.append(
+                f"{size_text:>12} {blocks:>{sign}12,} blocks  "
+                f"{filename}:{line}  {source}"
+            )
+        return lines
+
+    def report(self, file=None, stats=None):
+        """
+        Print the report, as registered with atexit.
+
+        Args:
+            file (file | None): Where to print, None for sys.stderr
+            stats (dict | None): Result of site_stats() for the last snapshot
+        """
+        if self.snapshot is None:
+            return
+        print(self.format_report(stats), file=file or sys.stderr, flush=True)
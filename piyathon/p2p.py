@@ -5,20 +5,32 @@
 Piyathon Code Translation Command Line Tool
 
 This module provides a command-line interface for bidirectional translation
-between Python (.py) and Piyathon (.pi) source files. It serves as a standalone
-tool for code conversion without execution.
+between Python (.py) and Piyathon (.pi) source files, one file at a time or a
+whole directory tree at once. It serves as a standalone tool for code
+conversion without execution.
 
 Core Functionality:
     - Converts Python source files to Piyathon format
     - Converts Piyathon source files to Python format
     - Validates file extensions and handles errors
     - Preserves code structure and formatting during translation
+    - Keeps the source encoding declared by a PEP 263 cookie or BOM
+    - Translates large files in parallel with --jobs
+    - Mirrors a directory tree, translating its files in a process pool,
+      optionally copying the other files, filtered by include and exclude
+      globs
 
 Dependencies:
     - sys: For system-level operations and exit handling
     - os: For path manipulation and file operations
     - argparse: For command-line argument parsing
+    - concurrent.futures: For translating the files of a tree in a process
+      pool
+    - fnmatch: For the include and exclude globs
+    - shutil: For copying the other files of a tree
+    - time: For the files per second of a tree translation
     - piyathon_translator: For bidirectional code translation
+    - translation_cache: For reusing translations across invocations
 
 Integration Points:
     - Works with PiyathonTranslator for code conversion
@@ -32,16 +44,41 @@ Usage Examples:
     # Convert Piyathon to Python
     $ python -m piyathon.p2p input.pi output.py
 
+    # Translate without using the translation cache
+    $ python -m piyathon.p2p --no-cache input.py output.pi
+
+    # Translate a large file using 8 processes
+    $ python -m piyathon.p2p --jobs 8 input.py output.pi
+
+    # Mirror a Python project as Piyathon, with its other files
+    $ python -m piyathon.p2p --copy-other --exclude .git project/ project_pi/
+
+    # Translate the .pi files of a tree that holds both kinds of files
+    $ python -m piyathon.p2p --to py --include "src/*" project_pi/ build/
+
 Known Limitations:
-    - Processes one file at a time
-    - No support for directory-wide translation
     - Basic error handling for file operations
+    - Files of a tree are translated again on every run, although the
+      translation cache makes unchanged files cheap
+    - Files removed from a source tree are not removed from its mirror
 """
 
 import sys
 import os
 import argparse
+import fnmatch
+import shutil
+import time
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from .keywords import PY_TO_PI, PI_TO_PY
 from .piyathon_translator import PiyathonTranslator
+from .translation_cache import (
+    add_cache_arguments,
+    cache_from_arguments,
+    cached_translate,
+)
 
 
 def parse_arguments():
@@ -50,8 +87,22 @@ def parse_arguments():
 
     Returns:
         argparse.Namespace: Parsed command-line arguments containing:
-            - source_file (str): Path to the source file (.py or .pi)
+            - source_file (str): Path to the source file (.py or .pi) or
+              directory
             - destination_file (str): Path to the output file (.pi or .py)
+              or directory
+            - jobs (int | None): Number of processes used to translate a
+              large file or a directory, None for the default
+            - to (str | None): Extension the files of a directory are
+              translated to, "pi" or "py", None to infer it
+            - include, exclude (list): Globs selecting the files of a
+              directory
+            - copy_other (bool): Flag for copying the other files of a
+              directory
+            - cache_dir, no_cache, clear_cache: Translation cache options
+
+    The file arguments may only be omitted together with --clear-cache. The
+    directory options may only be given with a source directory.
 
     Example:
         >>> args = parse_arguments()
@@ -62,9 +113,65 @@ def parse_arguments():
         description="Translate between Python and Piyathon files",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    parser.add_argument("source_file", help="Source file (.py or .pi)")
-    parser.add_argument("destination_file", help="Destination file (.py or .pi)")
-    return parser.parse_args()
+    parser.add_argument(
+        "source_file", nargs="?", help="Source file (.py or .pi) or directory"
+    )
+    parser.add_argument(
+        "destination_file",
+        nargs="?",
+        help="Destination file (.py or .pi) or directory",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of processes used to translate a large file (default: 1) "
+        "or the files of a directory (default: number of CPUs)",
+    )
+    directory = parser.add_argument_group("directory translation")
+    directory.add_argument(
+        "--to",
+        choices=("pi", "py"),
+        help="Translate the files of a directory to .pi or .py files "
+        "(default: the opposite of the only kind of source file found)",
+    )
+    directory.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only mirror the files matching GLOB; may be repeated",
+    )
+    directory.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip the files and directories matching GLOB; may be repeated",
+    )
+    directory.add_argument(
+        "--copy-other",
+        action="store_true",
+        help="Copy the files that are not translated to the destination",
+    )
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    if args.destination_file is None and not (
+        args.clear_cache and args.source_file is None
+    ):
+        parser.error(
+            "the following arguments are required: source_file, destination_file"
+        )
+    directory_options = (args.to, args.include, args.exclude, args.copy_other)
+    if (
+        args.source_file is not None
+        and not os.path.isdir(args.source_file)
+        and any(directory_options)
+    ):
+        parser.error(
+            "--to, --include, --exclude and --copy-other require a source directory"
+        )
+    return args
 
 
 def validate_extensions(source_file, destination_file):
@@ -104,23 +211,26 @@ def validate_extensions(source_file, destination_file):
 
 def read_source_file(source_file):
     """
-    Read and return the contents of the source file.
+    Read and return the raw contents of the source file.
+
+    The contents are not decoded here; the translator honors the encoding
+    declared by the file itself.
 
     Args:
         source_file (str): Path to the source file
 
     Returns:
-        str: Contents of the source file
+        bytes: Contents of the source file
 
     Raises:
         SystemExit: If file cannot be read or doesn't exist
 
     Example:
         >>> code = read_source_file("example.py")
-        >>> print(len(code))  # Number of characters read
+        >>> print(len(code))  # Number of bytes read
     """
     try:
-        with open(source_file, "r", encoding="utf-8") as file:
+        with open(source_file, "rb") as file:
             return file.read()
     except FileNotFoundError:
         print(f"Error: Input file '{source_file}' not found.")
@@ -130,18 +240,46 @@ def read_source_file(source_file):
         sys.exit(1)
 
 
-def translate_code(source_code, source_ext, dest_ext):
+def translation_direction(source_ext, dest_ext):
+    """
+    Select the keyword table and description of a translation.
+
+    Args:
+        source_ext (str): Source file extension (".py" or ".pi")
+        dest_ext (str): Destination file extension (".pi" or ".py")
+
+    Returns:
+        tuple: (translation_dict: dict, translation_type: str)
+
+    Side Effects:
+        - Exits with status code 1 if the extensions are not .py and .pi
+
+    Example:
+        >>> translation_direction(".pi", ".py")[1]
+        'Piyathon to Python'
+    """
+    if source_ext == ".py" and dest_ext == ".pi":
+        return PY_TO_PI, "Python to Piyathon"
+    if source_ext == ".pi" and dest_ext == ".py":
+        return PI_TO_PY, "Piyathon to Python"
+    print("Error: Invalid file extension combination")
+    sys.exit(1)
+
+
+def translate_code(source_code, source_ext, dest_ext, cache=None, jobs=1):
     """
     Translate code between Python and Piyathon formats.
 
     Args:
-        source_code (str): The source code to translate
+        source_code (bytes): The encoded source code to translate
         source_ext (str): Source file extension (".py" or ".pi")
         dest_ext (str): Destination file extension (".pi" or ".py")
+        cache (TranslationCache | None): Translation cache, or None to disable
+        jobs (int): Number of processes used to translate a large file
 
     Returns:
-        tuple: (translated_code: str, translation_type: str)
-            - translated_code: The translated source code
+        tuple: (translated_code: bytes, translation_type: str)
+            - translated_code: The translated code in the source encoding
             - translation_type: Description of the translation direction
 
     Side Effects:
@@ -149,20 +287,22 @@ def translate_code(source_code, source_ext, dest_ext):
         - Prints error message to stderr
 
     Example:
-        >>> code, type = translate_code("def main():", ".py", ".pi")
+        >>> code, type = translate_code(b"def main():", ".py", ".pi")
         >>> print(type)
         'Python to Piyathon'
     """
     translator = PiyathonTranslator()
+    translation_dict, translation_type = translation_direction(source_ext, dest_ext)
 
-    if source_ext == ".py" and dest_ext == ".pi":
-        translated_code = translator.python_to_piyathon(source_code)
-        translation_type = "Python to Piyathon"
-    elif source_ext == ".pi" and dest_ext == ".py":
-        translated_code = translator.piyathon_to_python(source_code)
-        translation_type = "Piyathon to Python"
-    else:
-        print("Error: Invalid file extension combination")
+    try:
+        translated_code = cached_translate(
+            translator, source_code, translation_dict, cache, jobs
+        )
+    except UnicodeEncodeError as error:
+        print(
+            "Error: The translated code cannot be represented in the "
+            f"'{error.encoding}' encoding of the input file."
+        )
         sys.exit(1)
 
     if translated_code is None:
@@ -181,7 +321,7 @@ def write_translated_code(destination_file, translated_code, translation_type):
 
     Args:
         destination_file (str): Path to the output file
-        translated_code (str): The translated source code
+        translated_code (bytes): The translated code in the source encoding
         translation_type (str): Description of the translation performed
 
     Side Effects:
@@ -190,12 +330,12 @@ def write_translated_code(destination_file, translated_code, translation_type):
         - Exits with status code 1 if write fails
 
     Example:
-        >>> write_translated_code("output.pi", "คำสั่ง หลัก():", "Python to Piyathon")
+        >>> write_translated_code("output.pi", "นิยาม main():".encode(), "Python to Piyathon")
         Piyathon to Python translation completed.
         Translated code has been written to 'output.pi'.
     """
     try:
-        with open(destination_file, "w", encoding="utf-8") as file:
+        with open(destination_file, "wb") as file:
             file.write(translated_code)
         print(f"{translation_type} translation completed.")
         print(f"Translated code has been written to '{destination_file}'.")
@@ -204,13 +344,250 @@ def write_translated_code(destination_file, translated_code, translation_type):
         sys.exit(1)
 
 
+def matches(path, patterns):
+    """
+    Check whether a path matches any of a list of globs.
+
+    Args:
+        path (str): Path relative to the source directory, with "/" separators
+        patterns (list): Globs matched against the whole path; globs without
+                         "/" are matched against the last name as well
+
+    Returns:
+        bool: True if any glob matches
+
+    Example:
+        >>> matches("docs/build/index.py", ["build"])
+        False
+        >>> matches("docs/build", ["build"])
+        True
+    """
+    name = path.rsplit("/", 1)[-1]
+    return any(
+        fnmatch.fnmatch(path, pattern)
+        or ("/" not in pattern and fnmatch.fnmatch(name, pattern))
+        for pattern in patterns
+    )
+
+
+def collect_tree(source_dir, destination_dir, include=(), exclude=()):
+    """
+    Collect the files of a directory tree to mirror.
+
+    Directories matching an exclude glob are not entered, and neither is the
+    destination directory when it is inside the source directory.
+
+    Args:
+        source_dir (str): Root of the source tree
+        destination_dir (str): Root of the destination tree
+        include (list): Globs of the files to mirror, all files if empty
+        exclude (list): Globs of the files and directories to skip
+
+    Returns:
+        list: Paths of the files relative to source_dir, with "/" separators,
+              in sorted order
+
+    Example:
+        >>> collect_tree("project", "project_pi", exclude=[".git"])
+        ['main.py', 'pkg/__init__.py', 'pkg/util.py']
+    """
+    destination = os.path.abspath(destination_dir)
+    files = []
+    for directory, dirnames, filenames in os.walk(source_dir):
+        prefix = os.path.relpath(directory, source_dir).replace(os.sep, "/")
+        prefix = "" if prefix == "." else f"{prefix}/"
+        dirnames[:] = sorted(
+            name
+            for name in dirnames
+            if not matches(prefix + name, exclude)
+            and os.path.abspath(os.path.join(directory, name)) != destination
+        )
+        for name in sorted(filenames):
+            path = prefix + name
+            if include and not matches(path, include):
+                continue
+            if not matches(path, exclude):
+                files.append(path)
+    return files
+
+
+def translate_tree_file(source_path, destination_path, translation_dict, cache):
+    """
+    Translate one file of a directory tree.
+
+    This is the unit of work of translate_tree() and is run in worker
+    processes, so it only takes picklable arguments.
+
+    Args:
+        source_path (str): Path of the source file
+        destination_path (str): Path of the translated file, whose directory
+                                is created if needed
+        translation_dict (dict): Dictionary mapping source to target keywords
+        cache (TranslationCache | None): Translation cache, or None to disable
+
+    Returns:
+        str | None: Why the file could not be translated, or None on success
+    """
+    try:
+        with open(source_path, "rb") as file:
+            source_code = file.read()
+        translated_code = cached_translate(
+            PiyathonTranslator(), source_code, translation_dict, cache
+        )
+        if translated_code is None:
+            return "the file has errors"
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        with open(destination_path, "wb") as file:
+            file.write(translated_code)
+    except UnicodeEncodeError as error:
+        return (
+            "the translated code cannot be represented in the "
+            f"'{error.encoding}' encoding of the file"
+        )
+    except (OSError, SyntaxError, tokenize.TokenError, UnicodeError) as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def translate_tree(
+    source_dir,
+    destination_dir,
+    to=None,
+    include=(),
+    exclude=(),
+    copy_other=False,
+    cache=None,
+    jobs=None,
+):
+    """
+    Mirror a directory tree, translating its source files.
+
+    Files with the source extension are translated in a pool of worker
+    processes, while the other files are copied by this process if asked
+    to; a file whose copy would overwrite a translated file, such as a.pi
+    next to a.py when translating to Piyathon, is not copied and counts as
+    a failure. Failures are reported as they occur, and a summary is printed
+    at the end.
+
+    Args:
+        source_dir (str): Root of the source tree
+        destination_dir (str): Root of the destination tree, created if needed
+        to (str | None): "pi" or "py", None to infer it from the files found
+        include (list): Globs of the files to mirror, all files if empty
+        exclude (list): Globs of the files and directories to skip
+        copy_other (bool): Whether to copy the files that are not translated
+        cache (TranslationCache | None): Translation cache, or None to disable
+        jobs (int | None): Number of worker processes, None for the number
+                           of CPUs
+
+    Returns:
+        int: Number of files that could not be translated or copied
+
+    Side Effects:
+        - Creates the destination tree and writes its files
+        - Prints failures and the summary to stdout
+        - Exits with status code 1 if the direction cannot be inferred or
+          the destination is not a directory
+
+    Example:
+        >>> translate_tree("project", "project_pi", exclude=[".git"])
+        Python to Piyathon translation completed.
+        Translated 3 files, copied 0 and failed 0 in 0.41 seconds (7 files/sec).
+        Translated code has been written to 'project_pi'.
+        0
+    """
+    if os.path.exists(destination_dir) and not os.path.isdir(destination_dir):
+        print(f"Error: Destination '{destination_dir}' is not a directory.")
+        sys.exit(1)
+    started = time.perf_counter()
+    files = collect_tree(source_dir, destination_dir, include, exclude)
+    extensions = {os.path.splitext(path)[1] for path in files} & {".py", ".pi"}
+    if to is not None:
+        dest_ext = f".{to}"
+        source_ext = ".pi" if dest_ext == ".py" else ".py"
+    elif len(extensions) == 1:
+        source_ext = extensions.pop()
+        dest_ext = ".pi" if source_ext == ".py" else ".py"
+    else:
+        found = "both .py and .pi" if extensions else "no .py or .pi"
+        print(f"Error: Found {found} files in '{source_dir}'; choose with --to.")
+        sys.exit(1)
+    translation_dict, translation_type = translation_direction(source_ext, dest_ext)
+
+    def source_path(path):
+        return os.path.join(source_dir, *path.split("/"))
+
+    def destination_path(path):
+        return os.path.join(destination_dir, *path.split("/"))
+
+    sources = [path for path in files if path.endswith(source_ext)]
+    others = [path for path in files if not path.endswith(source_ext)]
+    destinations = [
+        destination_path(path[: -len(source_ext)] + dest_ext) for path in sources
+    ]
+    jobs = jobs or os.cpu_count() or 1
+    arguments = (
+        [source_path(path) for path in sources],
+        destinations,
+        repeat(translation_dict),
+        repeat(cache),
+    )
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        # Large chunks keep the workers busy with little messaging, while
+        # small trees are still spread over every worker
+        chunksize = max(1, min(64, len(sources) // (4 * jobs)))
+        errors = executor.map(translate_tree_file, *arguments, chunksize=chunksize)
+    else:
+        errors = map(translate_tree_file, *arguments)
+    translated = set(destinations)
+    copied = copy_failed = translate_failed = 0
+    try:
+        # Copied while the workers translate
+        for path in others if copy_other else ():
+            if destination_path(path) in translated:
+                print(
+                    f"Error: Not copying '{source_path(path)}', which would "
+                    "overwrite a translated file."
+                )
+                copy_failed += 1
+                continue
+            try:
+                os.makedirs(os.path.dirname(destination_path(path)), exist_ok=True)
+                shutil.copy2(source_path(path), destination_path(path))
+                copied += 1
+            except OSError as error:
+                print(f"Error: Unable to copy '{source_path(path)}': {error}")
+                copy_failed += 1
+        for path, error in zip(sources, errors):
+            if error is not None:
+                print(f"Error: Unable to translate '{source_path(path)}': {error}")
+                translate_failed += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - started
+    failed = copy_failed + translate_failed
+    print(f"{translation_type} translation completed.")
+    print(
+        f"Translated {len(sources) - translate_failed:,} files, copied {copied:,} "
+        f"and failed {failed:,} in {elapsed:.2f} seconds "
+        f"({len(sources) / elapsed:,.0f} files/sec)."
+    )
+    print(f"Translated code has been written to '{destination_dir}'.")
+    return failed
+
+
 def main():
     """
     Main entry point for the translation tool.
 
     This function orchestrates the entire translation process:
-    1. Parses command-line arguments
-    2. Validates file extensions
+    1. Parses command-line arguments and sets up the translation cache
+    2. Mirrors the tree with translate_tree() if the source is a directory,
+       exiting with status code 1 if any file failed, or else validates
+       file extensions
     3. Reads the source file
     4. Performs the translation
     5. Writes the result to the destination file
@@ -222,14 +599,32 @@ def main():
 
     Example:
         $ python -m piyathon.p2p input.py output.pi
+        $ python -m piyathon.p2p --jobs 8 project/ project_pi/
     """
     args = parse_arguments()
+    cache = cache_from_arguments(args)
+    if args.source_file is None:
+        return
+    if os.path.isdir(args.source_file):
+        failed = translate_tree(
+            args.source_file,
+            args.destination_file,
+            args.to,
+            args.include,
+            args.exclude,
+            args.copy_other,
+            cache,
+            args.jobs,
+        )
+        if failed:
+            sys.exit(1)
+        return
     validate_extensions(args.source_file, args.destination_file)
     source_code = read_source_file(args.source_file)
     source_ext = os.path.splitext(args.source_file)[1]
     dest_ext = os.path.splitext(args.destination_file)[1]
     translated_code, translation_type = translate_code(
-        source_code, source_ext, dest_ext
+        source_code, source_ext, dest_ext, cache, args.jobs or 1
     )
     write_translated_code(args.destination_file, translated_code, translation_type)
 
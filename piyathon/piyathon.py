@@ -10,16 +10,40 @@ for Piyathon (.pi) source files.
 
 Core Functionality:
     - Parses command line arguments for Piyathon source files
-    - Reads and validates Piyathon source code
+    - Reads and validates Piyathon source code in its declared encoding
     - Translates Piyathon code to Python using PiyathonTranslator
+    - Caches compiled code objects so unchanged files skip translation
     - Sets up runtime environment with custom library path
-    - Executes translated Python code in an isolated namespace
+    - Lets scripts import other .pi modules through the Piyathon import hook
+    - Executes translated Python code as the __main__ module, so that
+      objects it defines can be pickled, as by multiprocessing
+    - Starts a preloaded execution server and runs scripts through it
+    - Runs many scripts concurrently with resource limits
+    - Reports how long each runtime phase and import took with --timings
+    - Profiles the user code with cProfile with --profile
+    - Profiles the lines of the user code with --line-profile
+    - Samples the stacks of long-running scripts with --sample
+    - Finds the lines allocating memory with --memprofile
+    - Measures the coverage of .pi code with --coverage
 
 Dependencies:
     - sys: For system-level operations and exit handling
     - os: For path manipulation and file operations
-    - argparse: For command-line argument parsing
+    - argparse: For command-line argument parsing, imported only when the
+      command line is not a --client run
     - piyathon_translator: For Piyathon to Python code translation
+    - translation_cache: For reusing translations across runs
+    - code_cache: For reusing compiled code objects across runs
+    - hook: For importing .pi modules, installed when this module is imported
+    - server, client: For `piyathon serve` and `piyathon --client`
+    - batch: For `piyathon batch`
+    - code_coverage: For --coverage and `piyathon coverage`, imported only
+      when measuring or reporting coverage
+    - run_timing: For timing the runtime phases
+    - profiling: For --profile, imported only when profiling
+    - line_profile: For --line-profile, imported only when profiling
+    - sampling: For --sample, imported only when sampling
+    - memory_profile: For --memprofile, imported only when profiling
 
 Integration Points:
     - Integrates with PiyathonTranslator for code translation
@@ -27,17 +51,42 @@ Integration Points:
     - Works with the command line for file input and execution
 
 Known Limitations:
-    - Only processes single .pi files (no module imports yet)
-    - Executes in an isolated namespace with limited global scope
+    - The spawn and forkserver start methods of multiprocessing cannot
+      re-run the script in their workers, so only fork can run functions
+      defined in the script
     - Error handling is basic with general exception catching
 """
 
+import time
+
+# Taken before the other imports, so that --timings includes them
+STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import atexit
 import sys
 import os
-import argparse
-from .piyathon_translator import PiyathonTranslator
+from importlib.util import module_from_spec, spec_from_loader
+from . import hook
+from .code_cache import cache_path, load_code, store_code, translator_fingerprint
+from .keywords import PI_TO_PY
+from .run_timing import REPORT_FORMATS, RunTimings, report_format
+from .translation_cache import (
+    add_cache_arguments,
+    cache_from_arguments,
+    cached_translate,
+)
 from . import __version__
 
+# Options whose value is optional. Their value must be given as --option=value,
+# so that in `piyathon --profile hello.pi` the source file is not taken as it.
+OPTIONAL_VALUE_OPTIONS = {
+    "--timings": "table",
+    "--profile": "",
+    "--sample": "100",
+    "--coverage": ".piyathon-coverage",
+}
+
 
 def parse_arguments():
     """
@@ -45,43 +94,152 @@ def parse_arguments():
 
     Returns:
         argparse.Namespace: Parsed command-line arguments containing:
-            - source_file (str): Path to the Piyathon source file (.pi)
+            - source_file (str): Path to the Piyathon source file (.pi), or
+              "serve" to start an execution server
             - version (bool): Flag for version information display
+            - client (bool): Flag for running the file through a server
+            - socket (str | None): Path of the server socket
+            - timings (str | None): Report format of --timings
+            - profile (str | None): Statistics file of --profile, "" to only
+              print the summary, None if not profiling
+            - line_profile (bool): Flag for profiling lines
+            - sample (float | None): Samples per second of --sample
+            - sample_output (str | None): Collapsed stacks file of --sample
+            - memprofile (bool): Flag for tracing memory allocations
+            - coverage (str | None): Data file of --coverage
+            - coverage_branch (bool): Flag for measuring branches as well
+            - cache_dir, no_cache, clear_cache: Translation cache options
+
+    The source file may only be omitted together with --clear-cache. Options
+    in OPTIONAL_VALUE_OPTIONS given without a value get their default value.
 
     Example:
         >>> args = parse_arguments()
         >>> print(args.source_file)
         'example.pi'
     """
+    # Imported here, as a --client run takes less time than importing it
+    import argparse  # pylint: disable=import-outside-toplevel
+
     parser = argparse.ArgumentParser(
         description=f"Piyathon {__version__}\n"
         "Copyright (c) 2024, Piyawish Piyawat\n"
         "Licensed under the MIT License",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    parser.add_argument("source_file", help="Piyathon source file (.pi)")
+    parser.add_argument(
+        "source_file",
+        nargs="?",
+        help="Piyathon source file (.pi), 'serve' to start an execution server, "
+        "'batch' to run many files (see 'piyathon batch --help'), or "
+        "'coverage' to report coverage data (see 'piyathon coverage --help')",
+    )
     parser.add_argument(
         "-v", "--version", action="version", version=f"Piyathon {__version__}"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Run the source file through a running 'piyathon serve'",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Socket of the execution server "
+        "(default: $PIYATHON_SOCKET or $XDG_RUNTIME_DIR/piyathon.sock)",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="table",
+        choices=REPORT_FORMATS,
+        help="Report the time taken by each runtime phase and import on exit, "
+        "as a table (default) or as JSON (default: $PIYATHON_TIMINGS)",
+    )
+    # Both profilers use the profiler tool of sys.monitoring
+    profilers = parser.add_mutually_exclusive_group()
+    profilers.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="OUTPUT",
+        help="Profile the script with cProfile, print the hottest functions "
+        "on exit and save the statistics if given as --profile=out.pstats",
+    )
+    profilers.add_argument(
+        "--line-profile",
+        action="store_true",
+        help="Count the hits and time of each line of .pi code and print an "
+        "annotated listing on exit",
+    )
+    parser.add_argument(
+        "--sample",
+        nargs="?",
+        const=100.0,
+        type=float,
+        metavar="HZ",
+        help="Sample the stacks of the script HZ times per second (default: "
+        "100, given as --sample=HZ) and write them as collapsed stacks for "
+        "flame graph tools on exit",
+    )
+    parser.add_argument(
+        "--sample-output",
+        metavar="PATH",
+        help="File for the collapsed stacks of --sample "
+        "(default: <source file name>.collapsed)",
+    )
+    parser.add_argument(
+        "--memprofile",
+        action="store_true",
+        help="Trace memory allocations with tracemalloc and print the top "
+        "allocation sites by .pi line on exit and on SIGUSR1",
+    )
+    parser.add_argument(
+        "--coverage",
+        nargs="?",
+        const=".piyathon-coverage",
+        metavar="DATA_FILE",
+        help="Measure the line and branch coverage of .pi code, merge it into "
+        "DATA_FILE (default: .piyathon-coverage, given as --coverage=PATH) and "
+        "print a summary on exit; child processes are measured as well "
+        "(default: $PIYATHON_COVERAGE, without the summary)",
+    )
+    parser.add_argument(
+        "--coverage-branch",
+        action="store_true",
+        help="Measure branches as well with --coverage, which slows down "
+        "loops and conditions that always go the same way "
+        "(default: $PIYATHON_COVERAGE_BRANCH)",
+    )
+    add_cache_arguments(parser)
+    argv = [
+        f"{arg}={OPTIONAL_VALUE_OPTIONS[arg]}" if arg in OPTIONAL_VALUE_OPTIONS else arg
+        for arg in sys.argv[1:]
+    ]
+    args = parser.parse_args(argv)
+    if args.source_file is None and not args.clear_cache:
+        parser.error("the following arguments are required: source_file")
+    if args.sample is not None and not args.sample > 0:
+        parser.error("argument --sample: the rate must be positive")
+    if (
+        args.coverage_branch
+        and args.coverage is None
+        and not os.environ.get("PIYATHON_COVERAGE")
+    ):
+        parser.error("argument --coverage-branch: requires --coverage")
+    return args
 
 
 def main():
     """
     Main entry point for the Piyathon interpreter.
 
-    This function orchestrates the entire Piyathon execution process:
-    1. Parses command-line arguments
-    2. Validates the source file extension
-    3. Reads and processes the source file
-    4. Translates Piyathon code to Python
-    5. Sets up the runtime environment
-    6. Executes the translated code
-
-    Side Effects:
-        - Modifies sys.path to include Piyathon standard library
-        - Creates and populates a new execution namespace
-        - Writes to stdout/stderr for error reporting
+    Parses command-line arguments and sets up the translation cache, then
+    runs the source file, starts an execution server for `serve`, or hands
+    the source file to a server with --client. `piyathon batch` and
+    `piyathon coverage` have their own arguments, parsed by piyathon.batch
+    and piyathon.code_coverage. With --timings or PIYATHON_TIMINGS,
+    the duration of each runtime phase is written to stderr on exit, as are
+    the reports of the profilers selected by the arguments.
 
     Exit Codes:
         - 0: Successful execution
@@ -90,16 +248,148 @@ def main():
     Example:
         $ python -m piyathon example.pi
     """
+    # pylint: disable=import-outside-toplevel
+    if "--client" in sys.argv[1:]:
+        from .client import client_main
+
+        sys.exit(client_main(sys.argv[1:]))
+    if sys.argv[1:2] == ["batch"]:
+        from .batch import main as batch_main
+
+        sys.exit(batch_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["coverage"]:
+        from .code_coverage import main as coverage_main
+
+        sys.exit(coverage_main(sys.argv[2:]))
+
+    timings = RunTimings(STARTED)
+    timings.mark("imports")
     args = parse_arguments()
-    source_file = args.source_file
+    cache = cache_from_arguments(args)
+    timings.mark("arguments")
+    if args.source_file == "serve":
+        from .server import serve
+
+        serve(args.socket, cache)
+        return
+    if args.source_file is not None:
+        timings_format = report_format(args.timings)
+        if timings_format is not None:
+            timings.enable()
+            atexit.register(timings.report, timings_format)
+        instruments = create_instruments(args)
+        for instrument in instruments:
+            atexit.register(instrument.report)
+        run_file(args.source_file, cache, timings, instruments)
 
+
+def create_instruments(args):
+    """
+    Create the profilers selected by the command-line arguments.
+
+    Args:
+        args (argparse.Namespace): Result of parse_arguments()
+
+    Returns:
+        list: The profilers, each with start(), stop() and report() methods,
+              in the order they are started, and stopped in reverse
+    """
+    # pylint: disable=import-outside-toplevel
+    instruments = []
+    ignored_files = []
+    # First, so that it is stopped after the profilers
+    if args.sample is not None:
+        from . import sampling
+
+        stem = os.path.splitext(os.path.basename(args.source_file))[0]
+        output = args.sample_output or f"{stem}.collapsed"
+        instruments.append(sampling.StackSampler(args.sample, output))
+        # Its thread samples while profiling
+        ignored_files.append(sampling.__file__)
+    if args.profile is not None:
+        from .profiling import FunctionProfiler
+
+        instruments.append(
+            FunctionProfiler(args.profile or None, ignored_files=ignored_files)
+        )
+    if args.line_profile:
+        from .line_profile import LineProfiler
+
+        instruments.append(LineProfiler())
+    if args.memprofile:
+        from .memory_profile import MemoryProfiler
+
+        # Traces from here on, so that reading and translating are traced
+        instruments.append(MemoryProfiler())
+    # Checked here, so that runs without coverage do not import it
+    if args.coverage is not None or os.environ.get("PIYATHON_COVERAGE"):
+        from .code_coverage import (
+            BRANCH_ENV,
+            COVERAGE_ENV,
+            CoverageRecorder,
+            branch_coverage,
+            data_file,
+        )
+
+        branch = branch_coverage(args.coverage_branch)
+        recorder = CoverageRecorder(
+            data_file(args.coverage),
+            branch=branch,
+            report_summary=args.coverage is not None,
+        )
+        # Child processes running .pi code merge into the same data file
+        os.environ[COVERAGE_ENV] = recorder.output
+        if branch:
+            os.environ[BRANCH_ENV] = "1"
+        instruments.append(recorder)
+    return instruments
+
+
+def run_file(source_file, cache, timings=None, instruments=()):
+    """
+    Run a Piyathon source file.
+
+    This function orchestrates the entire Piyathon execution process:
+    1. Validates the source file extension
+    2. Loads the cached code object, or reads the source file
+    3. Translates Piyathon code to Python and compiles it on a cache miss
+    4. Sets up the runtime environment
+    5. Executes the compiled code
+
+    Args:
+        source_file (str): Path to the Piyathon source file (.pi)
+        cache (TranslationCache | None): Translation cache, or None to disable
+                                         both translation and code caching
+        timings (RunTimings | None): Timings the phases of the run are marked
+                                     in, or None to time them separately
+        instruments (iterable): Profilers and other instruments, each started
+                                with start() right before the user code and
+                                stopped with stop() right after it
+
+    Side Effects:
+        - Modifies sys.path to include Piyathon standard library
+        - Runs the script as a new module registered as __main__
+        - Writes to stdout/stderr for error reporting
+        - Exits with status code 1 on errors
+    """
     if not source_file.endswith(".pi"):
         print("Error: The source file must have a .pi extension")
         sys.exit(1)
 
+    # Read raw bytes so that the encoding declared by the file is honored,
+    # both by the translator and by compile()
+    fingerprint = translator_fingerprint()
+    # Code names its file by absolute path, as cached code is shared by runs
+    # from any working directory
+    code_path = os.path.abspath(source_file)
+    code = None
     try:
-        with open(source_file, "r", encoding="utf-8") as file:
-            piyathon_code = file.read()
+        with open(source_file, "rb") as file:
+            source_stat = os.fstat(file.fileno())
+            if cache is not None:
+                code = load_code(code_path, source_stat, fingerprint)
+            if code is None:
+                piyathon_code = file.read()
     except FileNotFoundError:
         print(f"Error: Input file '{source_file}' not found.")
         sys.exit(1)
@@ -107,27 +397,81 @@ def main():
         print(f"Error: Unable to read input file '{source_file}'.")
         sys.exit(1)
 
-    translator = PiyathonTranslator()
-    python_code = translator.piyathon_to_python(piyathon_code)
+    if timings is None:
+        timings = RunTimings()
+    timings.mark("read")
+    if code is None:
+        # Only needed on a cache miss, so a hit does not load tokenize
+        from .piyathon_translator import (  # pylint: disable=import-outside-toplevel
+            PiyathonTranslator,
+        )
 
-    if python_code is None:
-        print("Execution aborted due to errors in the Piyathon input file.")
-        sys.exit(1)
+        translator = PiyathonTranslator()
+        python_code = cached_translate(translator, piyathon_code, PI_TO_PY, cache)
+        timings.mark("translate")
+
+        if python_code is None:
+            print("Execution aborted due to errors in the Piyathon input file.")
+            sys.exit(1)
+
+        try:
+            code = compile(python_code, code_path, "exec")
+        except SyntaxError as e:
+            print(f"Error during execution: {e}")
+            sys.exit(1)
+        if cache is not None:
+            store_code(code_path, source_stat, fingerprint, code)
+        timings.mark("compile")
 
     # Get the absolute path to the current file's directory and append 'Lib'
     lib_path = os.path.join(os.path.dirname(__file__), "Lib")
 
-    # Inject the absolute path into sys.path
+    # Inject the absolute path into sys.path, after the script directory so
+    # that .pi modules next to the script can be imported
     sys.path.insert(0, lib_path)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(source_file)))
 
-    # Create a new namespace for execution
-    namespace = {"__name__": "__main__"}
+    # Run as the real __main__ module, so that objects defined by the script
+    # can be pickled by reference, as multiprocessing does
+    module = create_main_module(source_file)
+    sys.modules["__main__"] = module
+    timings.mark("setup")
 
+    for instrument in instruments:
+        instrument.start()
     try:
-        exec(python_code, namespace)  # pylint: disable=exec-used
+        exec(code, module.__dict__)  # pylint: disable=exec-used
     except Exception as e:  # pylint: disable=broad-except
         print(f"Error during execution: {e}")
         sys.exit(1)
+    finally:
+        for instrument in reversed(instruments):
+            instrument.stop()
+        timings.mark("run")
+
+
+def create_main_module(source_file):
+    """
+    Create the __main__ module of a Piyathon script, as runpy does for Python.
+
+    Args:
+        source_file (str): Path to the Piyathon source file (.pi)
+
+    Returns:
+        types.ModuleType: An empty module named __main__, with __file__,
+                          __spec__, __loader__ and __cached__ set for the
+                          script
+
+    Example:
+        >>> create_main_module("hello.pi").__file__
+        '/home/user/hello.pi'
+    """
+    path = os.path.abspath(source_file)
+    spec = spec_from_loader("__main__", hook.PiyathonLoader("__main__", path))
+    spec.origin = path
+    spec.has_location = True
+    spec.cached = cache_path(path)
+    return module_from_spec(spec)
 
 
 if __name__ == "__main__":
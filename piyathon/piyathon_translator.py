@@ -13,15 +13,29 @@ Core Functionality:
     - Token-based code processing and generation
     - Special handling for adjacent string literals
     - Whitespace preservation and cleanup
+    - Streaming translation of large sources with bounded memory
+    - Keyword pre-scan that skips tokenizing code with nothing to translate
+    - Optional thread-safe LRU memoization of translations
+    - Batch translation of many sources across a process pool
+    - Bytes-in/bytes-out translation honoring PEP 263 encoding declarations
+    - Single-pass translation statistics with per-identifier histograms
+    - Optional per-phase timing hooks
+    - Chunk-parallel translation of single large sources
 
 Dependencies:
     - tokenize: For Python code tokenization and untokenization
-    - io.StringIO: For string-based token generation
+    - io.StringIO, io.BytesIO: For string and bytes based token generation
+    - re: For the precompiled keyword pre-scan pattern
+    - threading: For guarding the in-process translation memo
+    - concurrent.futures: For batch translation in a process pool
+    - collections.Counter: For identifier histograms in translation statistics
+    - time: For measuring phase durations when a timing hook is set
     - keywords: For Piyathon-Python keyword mappings
 
 Data Structures:
     - Token objects from the tokenize module representing code elements
     - Translation dictionaries (PY_TO_PI, PI_TO_PY) for keyword mapping
+    - TranslationStats: Token counts, identifier histograms and sizes
 
 Known Limitations:
     - Handles only direct keyword translations
@@ -29,9 +43,385 @@ Known Limitations:
     - Limited to Python's tokenization capabilities
 """
 
+import codecs
+import contextlib
+import functools
+import itertools
+import os
+import re
+import sys
+import threading
+import time
 import tokenize
-from io import StringIO
-from .keywords import PY_TO_PI, PI_TO_PY
+from collections import Counter, OrderedDict, deque, namedtuple
+from io import BytesIO, StringIO
+from .keywords import (
+    PY_TO_PI,
+    PI_TO_PY,
+    PYTHON_KEYWORDS,
+    PYTHON_BUILTIN_FUNCTIONS,
+    PYTHON_SPECIAL_BUILTIN_VARIABLES,
+)
+from .translation_timing import TranslationTiming
+
+# Smallest amount of source worth sending to a separate process
+PARALLEL_MIN_CHUNK = 256 * 1024
+
+# A line break followed by a line starting with an identifier or decorator at
+# column 0, which is a top-level logical line unless it is inside a bracket or
+# multi-line string
+TOP_LEVEL_LINE_PATTERN = re.compile(r"\n(?=[^\W\d]|@)")
+
+# Characters that may continue an identifier. \w alone misses the Thai vowel
+# and tone marks, which are combining characters used throughout the keywords.
+IDENTIFIER_CHAR = r"[\w\u0E31\u0E34-\u0E3A\u0E47-\u0E4E]"
+
+# Identifier characters other than digits
+NON_DIGIT_IDENTIFIER_CHAR = r"(?:[^\W\d]|[\u0E31\u0E34-\u0E3A\u0E47-\u0E4E])"
+
+
+@functools.lru_cache(maxsize=8)
+def compile_keyword_pattern(keywords):
+    """
+    Compile a regular expression that finds the last of the given keywords.
+
+    The keywords are merged into a trie so that the alternation shares common
+    prefixes, and matches are anchored on identifier boundaries. A greedy
+    prefix makes the search backtrack from the end of the code, so the last
+    match is found without visiting the earlier ones. The pattern never misses
+    a NAME token that is a keyword, but may also match inside strings and
+    comments.
+
+    Args:
+        keywords (frozenset): Identifiers to search for
+
+    Returns:
+        re.Pattern | None: Pattern to use with match() whose group 1 is the
+                           last keyword, or None if there are no keywords
+
+    Example:
+        >>> pattern = compile_keyword_pattern(frozenset(["in", "if", "int"]))
+        >>> pattern.match("if x in y: pass").group(1)
+        'in'
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def to_regex(node):
+        branches = [
+            re.escape(char) + to_regex(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        alternation = "(?:" + "|".join(branches) + ")"
+        return alternation + "?" if "" in node else alternation
+
+    if not trie:
+        return None
+    # A digit may end a number right before a keyword, as in 1หรือ 2, so only
+    # the characters that can not end a number rule a match out
+    return re.compile(
+        f"(?s:.*)(?<!{NON_DIGIT_IDENTIFIER_CHAR})"
+        f"({to_regex(trie)})(?!{IDENTIFIER_CHAR})"
+    )
+
+
+MemoInfo = namedtuple(
+    "MemoInfo",
+    ["hits", "misses", "evictions", "maxsize", "maxbytes", "currsize", "currbytes"],
+)
+
+
+TranslationResult = namedtuple(
+    "TranslationResult", ["translated_code", "total_tokens", "name_tokens", "error"]
+)
+
+# Category of every mapped name, in both its Python and Piyathon spelling
+NAME_CATEGORIES = {
+    name: category
+    for category, mapping in (
+        ("keyword", PYTHON_KEYWORDS),
+        ("builtin", PYTHON_BUILTIN_FUNCTIONS),
+        ("dunder", PYTHON_SPECIAL_BUILTIN_VARIABLES),
+    )
+    for python_name, piyathon_name in mapping.items()
+    for name in (python_name, piyathon_name)
+}
+
+
+def phase_mark(phases):
+    """
+    Return a timestamp that does not advance while tokens are being read.
+
+    Args:
+        phases (dict): Phase durations in seconds, by name, with the time
+                       spent reading tokens so far under "tokenize"
+
+    Returns:
+        float: time.perf_counter() less the time spent reading tokens
+    """
+    return time.perf_counter() - phases.get("tokenize", 0.0)
+
+
+def end_phase(phases, name, start):
+    """
+    Record the duration of a phase, less the time spent reading tokens in it.
+
+    Args:
+        phases (dict): Phase durations in seconds, by name
+        name (str): Name of the phase that ended
+        start (float): phase_mark() when the phase started
+
+    Returns:
+        float: phase_mark() when the phase ended, to start the next one
+    """
+    mark = phase_mark(phases)
+    phases[name] = mark - start
+    return mark
+
+
+class TranslationStats:
+    """
+    Statistics gathered while translating code.
+
+    Instances can be added together to aggregate the statistics of many
+    translations.
+
+    Attributes:
+        total_tokens (int): Number of tokens, excluding line breaks and markers
+        name_tokens (int): Number of NAME tokens
+        translated_names (Counter): Occurrences of each translated name, keyed
+                                    by its spelling in the source code
+        unmapped_names (Counter): Occurrences of each NAME left unchanged
+        bytes_in (int): Size of the source code encoded as UTF-8
+        bytes_out (int): Size of the translated code encoded as UTF-8
+
+    Example:
+        >>> _, stats = PiyathonTranslator().translate_with_stats(
+        ...     "print(len(x))", PY_TO_PI
+        ... )
+        >>> stats.builtins
+        Counter({'print': 1, 'len': 1})
+        >>> stats.unmapped_names
+        Counter({'x': 1})
+    """
+
+    # A plain class, as dataclasses would import inspect with the translator
+    __slots__ = (
+        "total_tokens",
+        "name_tokens",
+        "translated_names",
+        "unmapped_names",
+        "bytes_in",
+        "bytes_out",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        total_tokens=0,
+        name_tokens=0,
+        translated_names=None,
+        unmapped_names=None,
+        bytes_in=0,
+        bytes_out=0,
+    ):
+        """
+        Initialize the statistics, empty by default.
+
+        Args:
+            total_tokens (int): Number of tokens
+            name_tokens (int): Number of NAME tokens
+            translated_names (Counter | None): Occurrences of translated names
+            unmapped_names (Counter | None): Occurrences of unchanged names
+            bytes_in (int): Size of the source code
+            bytes_out (int): Size of the translated code
+        """
+        self.total_tokens = total_tokens
+        self.name_tokens = name_tokens
+        self.translated_names = (
+            Counter() if translated_names is None else translated_names
+        )
+        self.unmapped_names = Counter() if unmapped_names is None else unmapped_names
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+
+    def _values(self):
+        """Return the attributes as a tuple, in the order of __init__."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        """Compare the statistics of two translations."""
+        if not isinstance(other, TranslationStats):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Show every attribute, as TranslationStats(total_tokens=..., ...)."""
+        attributes = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+        )
+        return f"TranslationStats({attributes})"
+
+    def names_in_category(self, category):
+        """
+        Return the translated names of one category from keywords.py.
+
+        Args:
+            category (str): "keyword", "builtin" or "dunder"
+
+        Returns:
+            Counter: Occurrences of each translated name of the category
+        """
+        return Counter(
+            {
+                name: count
+                for name, count in self.translated_names.items()
+                if NAME_CATEGORIES.get(name) == category
+            }
+        )
+
+    @property
+    def keywords(self):
+        """Occurrences of each translated keyword."""
+        return self.names_in_category("keyword")
+
+    @property
+    def builtins(self):
+        """Occurrences of each translated builtin function."""
+        return self.names_in_category("builtin")
+
+    @property
+    def dunders(self):
+        """Occurrences of each translated special name."""
+        return self.names_in_category("dunder")
+
+    def __add__(self, other):
+        """Combine the statistics of two translations."""
+        if not isinstance(other, TranslationStats):
+            return NotImplemented
+        return TranslationStats(
+            self.total_tokens + other.total_tokens,
+            self.name_tokens + other.name_tokens,
+            self.translated_names + other.translated_names,
+            self.unmapped_names + other.unmapped_names,
+            self.bytes_in + other.bytes_in,
+            self.bytes_out + other.bytes_out,
+        )
+
+
+class TranslationMemo:
+    """
+    A bounded, thread-safe LRU memo of translation results.
+
+    Entries are evicted in least recently used order once either the number
+    of entries or their total size in bytes exceeds its limit.
+
+    Attributes:
+        maxsize (int): Maximum number of entries
+        maxbytes (int | None): Maximum total size of entries, None for no limit
+
+    Methods:
+        get(key): Look up a result and mark it as recently used
+        put(key, result, size, owner): Store a result and evict old entries
+        info(): Return hit, miss and eviction counters
+        clear(): Remove all entries and reset the counters
+    """
+
+    def __init__(self, maxsize, maxbytes=None):
+        """
+        Initialize an empty memo.
+
+        Args:
+            maxsize (int): Maximum number of entries
+            maxbytes (int | None): Maximum total size of entries in bytes
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.currbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Look up a result and mark it as recently used.
+
+        Args:
+            key (tuple): Memo key
+
+        Returns:
+            object | None: The memoized result, or None on a miss
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result, size, owner):
+        """
+        Store a result and evict least recently used entries over the limits.
+
+        Args:
+            key (tuple): Memo key
+            result (object): Result to store
+            size (int): Size of the entry in bytes
+            owner (object): Object kept alive with the entry, so that an id()
+                            used in the key cannot be reused while it exists
+        """
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.currbytes -= previous[1]
+            self.entries[key] = (result, size, owner)
+            self.currbytes += size
+            while self.entries and (
+                len(self.entries) > self.maxsize
+                or (self.maxbytes is not None and self.currbytes > self.maxbytes)
+            ):
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.currbytes -= evicted_size
+                self.evictions += 1
+
+    def info(self):
+        """
+        Return the memo counters.
+
+        Returns:
+            MemoInfo: Hits, misses, evictions, limits and current usage
+        """
+        with self.lock:
+            return MemoInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.maxsize,
+                self.maxbytes,
+                len(self.entries),
+                self.currbytes,
+            )
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.currbytes = 0
+            self.hits = self.misses = self.evictions = 0
 
 
 class PiyathonTranslator:
@@ -42,15 +432,112 @@ class PiyathonTranslator:
     code using Python's tokenize module. It handles special cases like adjacent string
     literals and maintains proper code formatting.
 
+    Attributes:
+        engine (str): Output engine, "untokenize" to rebuild the code from tokens
+                      or "splice" to splice translated names into the source
+        memo (TranslationMemo | None): LRU memo of translations, None if disabled
+        timing_hook (callable | None): Called with a TranslationTiming after
+                                       each translation, None if disabled
+
     Methods:
         is_string_like(token): Check if a token is a string-like token
         custom_untokenize(tokens): Untokenize with special handling for adjacent strings
         clean_whitespaces(code): Clean and normalize code whitespace
+        last_candidate_row(code, translation_dict): Pre-scan for keywords
+        line_offset(code, row): Find where a physical line starts
+        untokenize_names(...): Output engine based on tokenize.untokenize
+        splice_names(...): Output engine splicing names into the source
+        count_tokens(tokens, translation_dict, stats): Gather statistics lazily
         translate(code, translation_dict): Perform the actual translation
+        split_top_level(code, parts): Find top-level split points
+        translate_with_stats(code, translation_dict): Translate with statistics
+        cache_info(): Report memo hits, misses and evictions
+        cache_clear(): Empty the memo
+        timing(hook): Context manager setting the timing hook
         python_to_piyathon(code): Convert Python code to Piyathon
         piyathon_to_python(code): Convert Piyathon code to Python
+        iter_translate(source, translation_dict): Lazily translate line by line
+        translate_stream(source, out_file, translation_dict): Translate file to file
+        translate_many(items, translation_dict): Translate many sources in parallel
+        translate_bytes(source, translation_dict): Translate encoded source code
     """
 
+    ENGINES = ("untokenize", "splice")
+
+    def __init__(
+        self, engine="untokenize", cache_size=0, cache_bytes=None, timing_hook=None
+    ):
+        """
+        Initialize the translator.
+
+        Args:
+            engine (str): Output engine, either "untokenize" (default) or "splice"
+            cache_size (int): Maximum number of memoized translations, 0 to
+                              disable memoization (default)
+            cache_bytes (int | None): Maximum total size in bytes of the
+                                      memoized sources and results
+            timing_hook (callable | None): Called with a TranslationTiming
+                                           after each translation
+
+        Raises:
+            ValueError: If the engine is not one of ENGINES
+
+        Example:
+            >>> translator = PiyathonTranslator(cache_size=1024, cache_bytes=2**24)
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown output engine: {engine!r}")
+        self.engine = engine
+        self.memo = TranslationMemo(cache_size, cache_bytes) if cache_size else None
+        self.timing_hook = timing_hook
+
+    def cache_info(self):
+        """
+        Report the usage of the translation memo.
+
+        Returns:
+            MemoInfo | None: Hits, misses, evictions, limits and current usage,
+                             or None if memoization is disabled
+
+        Example:
+            >>> translator = PiyathonTranslator(cache_size=16)
+            >>> translator.python_to_piyathon("print(1)")
+            'พิมพ์(1)'
+            >>> translator.cache_info().misses
+            1
+        """
+        return self.memo.info() if self.memo is not None else None
+
+    def cache_clear(self):
+        """Remove all memoized translations and reset the memo counters."""
+        if self.memo is not None:
+            self.memo.clear()
+
+    @contextlib.contextmanager
+    def timing(self, hook):
+        """
+        Set the timing hook for the duration of a with block.
+
+        Args:
+            hook (callable): Called with a TranslationTiming after each
+                             translation, such as a TimingAggregator
+
+        Yields:
+            callable: The hook
+
+        Example:
+            >>> aggregator = TimingAggregator()
+            >>> with translator.timing(aggregator):
+            ...     translator.python_to_piyathon(code)
+            >>> print(aggregator.format_report())
+        """
+        previous_hook = self.timing_hook
+        self.timing_hook = hook
+        try:
+            yield hook
+        finally:
+            self.timing_hook = previous_hook
+
     @staticmethod
     def is_string_like(token):
         """
@@ -134,14 +621,194 @@ class PiyathonTranslator:
         tokens = list(tokenize.generate_tokens(StringIO(code).readline))
         return cls.custom_untokenize(tokens)
 
-    def translate(self, code, translation_dict, collect_stats=False):
+    @staticmethod
+    def last_candidate_row(code, translation_dict):
+        """
+        Find the last line that may contain an identifier to translate.
+
+        This is a pre-scan with a precompiled keyword pattern that is much
+        cheaper than tokenizing. It never misses a translatable NAME token,
+        but may report keywords that appear inside strings or comments.
+
+        Args:
+            code (str): The source code to scan
+            translation_dict (dict): Dictionary mapping source to target keywords
+
+        Returns:
+            int: The 1-based row of the last candidate, or 0 if there is none
+
+        Example:
+            >>> PiyathonTranslator.last_candidate_row("x = 1\nprint(x)", PY_TO_PI)
+            2
+            >>> PiyathonTranslator.last_candidate_row("x = 1", PY_TO_PI)
+            0
+        """
+        pattern = compile_keyword_pattern(frozenset(translation_dict))
+        match = pattern.match(code) if pattern is not None else None
+        if match is None:
+            return 0
+        return code.count("\n", 0, match.start(1)) + 1
+
+    @staticmethod
+    def line_offset(code, row):
+        """
+        Return the offset at which a physical line starts.
+
+        Args:
+            code (str): The source code
+            row (int): The 1-based line number
+
+        Returns:
+            int: Offset of the first character of the line, or len(code) if
+                 the code has fewer lines
+
+        Example:
+            >>> PiyathonTranslator.line_offset("a\nb\n", 2)
+            2
+        """
+        offset = 0
+        for _ in range(row - 1):
+            offset = code.find("\n", offset) + 1
+            if not offset:
+                return len(code)
+        return offset
+
+    def untokenize_names(self, code, tokens, translation_dict, last_row, phases=None):
+        """
+        Build translated code by untokenizing tokens with translated names.
+
+        Tokens are consumed up to the end of the logical line containing
+        last_row, and the rest of the code is appended unchanged.
+
+        Args:
+            code (str): The source code the tokens were read from
+            tokens (iterable): TokenInfo objects of the code
+            translation_dict (dict): Dictionary mapping source to target keywords
+            last_row (int): The last row that may contain a name to translate
+            phases (dict | None): Phase durations to add "remap" and
+                                  "untokenize" to, less the "tokenize" time
+                                  spent pulling tokens, or None
+
+        Returns:
+            str: The translated code
+
+        Example:
+            >>> code = "def main(): pass\n"
+            >>> tokens = tokenize.generate_tokens(StringIO(code).readline)
+            >>> PiyathonTranslator().untokenize_names(code, tokens, PY_TO_PI, 1)
+            'นิยาม main(): ผ่าน\n'
+        """
+        start = phase_mark(phases) if phases is not None else 0.0
+        result = []
+        rest_offset = len(code)
+        for tok in tokens:
+            if tok.type == tokenize.NAME:
+                tok = tok._replace(string=translation_dict.get(tok.string, tok.string))
+            result.append(tok)
+            if tok.type == tokenize.NEWLINE and tok.start[0] >= last_row:
+                rest_offset = self.line_offset(code, tok.end[0] + 1)
+                break
+
+        if phases is not None:
+            start = end_phase(phases, "remap", start)
+        translated_code = self.custom_untokenize(result) + code[rest_offset:]
+        if phases is not None:
+            end_phase(phases, "untokenize", start)
+        return translated_code
+
+    @staticmethod
+    def splice_names(code, tokens, translation_dict, last_row, phases=None):
+        """
+        Build translated code by splicing translated names into the source.
+
+        Only NAME tokens that actually change are recorded as
+        (start offset, end offset, replacement) spans, and the result is a
+        single join of the replacements and the untouched slices of the
+        original code. Everything other than the translated names is kept
+        exactly as written, so no untokenize workarounds are needed.
+
+        Args:
+            code (str): The source code the tokens were read from
+            tokens (iterable): TokenInfo objects of the code
+            translation_dict (dict): Dictionary mapping source to target keywords
+            last_row (int): The last row that may contain a name to translate
+            phases (dict | None): Phase durations to add "remap" and "splice"
+                                  to, less the "tokenize" time spent pulling
+                                  tokens, or None
+
+        Returns:
+            str: The translated code
+
+        Example:
+            >>> code = "def  main():  pass\n"
+            >>> tokens = tokenize.generate_tokens(StringIO(code).readline)
+            >>> PiyathonTranslator.splice_names(code, tokens, PY_TO_PI, 1)
+            'นิยาม  main():  ผ่าน\n'
+        """
+        start = phase_mark(phases) if phases is not None else 0.0
+        spans = []
+        row = 1
+        row_offset = 0
+        for tok in tokens:
+            start_row, start_col = tok.start
+            if start_row > last_row:
+                break
+            if tok.type != tokenize.NAME or tok.string not in translation_dict:
+                continue
+            while row < start_row:
+                row_offset = code.index("\n", row_offset) + 1
+                row += 1
+            offset = row_offset + start_col
+            spans.append(
+                (offset, offset + len(tok.string), translation_dict[tok.string])
+            )
+
+        if phases is not None:
+            start = end_phase(phases, "remap", start)
+        pieces = []
+        prev_end = 0
+        for offset, end, replacement in spans:
+            pieces.append(code[prev_end:offset])
+            pieces.append(replacement)
+            prev_end = end
+        pieces.append(code[prev_end:])
+        translated_code = "".join(pieces)
+        if phases is not None:
+            end_phase(phases, "splice", start)
+        return translated_code
+
+    def translate(self, code, translation_dict, collect_stats=False, parallel=None):
         """
         Translate code using the provided translation dictionary.
 
+        Code is only tokenized up to the end of the logical line holding the
+        last identifier that may need translating, and the remainder is copied
+        unchanged. Code without any such identifier is returned as is without
+        being tokenized at all, unless statistics are requested. As a result,
+        tokenize errors, such as an unclosed bracket, are only raised for
+        the tokenized part; broken code after it is returned unchanged and
+        left for compile() to reject. The output is built by the engine
+        chosen when the translator was created: the "splice" engine keeps
+        every character that is not a translated name, including form feeds,
+        which the "untokenize" engine turns into spaces at the start of a
+        line.
+
+        When memoization is enabled, results are memoized by the identity of
+        translation_dict, the code and collect_stats, so translation tables
+        must not be modified in place while the translator is in use.
+
+        With parallel set, large code is split at top-level logical lines and
+        the pieces are translated in a pool of worker processes. The result is
+        identical to a serial translation; code that cannot be split, and
+        translations collecting statistics, are translated serially. Parallel
+        translations are neither memoized nor timed.
+
         Args:
             code (str): The source code to translate
             translation_dict (dict): Dictionary mapping source to target keywords
             collect_stats (bool): Whether to collect token statistics during translation
+            parallel (int | None): Number of worker processes for large code,
+                                   None or 1 to translate in this process
 
         Returns:
             str | tuple: The translated code, or tuple of
@@ -155,39 +822,262 @@ class PiyathonTranslator:
             >>> translator.translate("def main():", PY_TO_PI, collect_stats=True)
             ('คำสั่ง หลัก():', 4, 1)
         """
-        tokens = list(tokenize.generate_tokens(StringIO(code).readline))
+        if parallel is not None and parallel > 1 and not collect_stats:
+            bounds = self.split_top_level(code, parallel)
+            if len(bounds) > 2:
+                return self._translate_parallel(code, translation_dict, bounds)
 
-        # Count tokens if statistics collection is requested
-        total_tokens = 0
-        name_tokens = 0
+        if self.memo is None:
+            return self._translate(code, translation_dict, collect_stats)
+
+        key = (id(translation_dict), code, collect_stats)
+        result = self.memo.get(key)
+        if result is None:
+            result = self._translate(code, translation_dict, collect_stats)
+            translated_code = result[0] if collect_stats else result
+            size = sys.getsizeof(code) + sys.getsizeof(translated_code)
+            self.memo.put(key, result, size, translation_dict)
+        return result
 
+    def _translate(self, code, translation_dict, collect_stats):
+        """Translate code without consulting the memo; see translate()."""
+        stats = TranslationStats() if collect_stats else None
+        translated_code = self._translate_counted(code, translation_dict, stats)
         if collect_stats:
-            for tok in tokens:
-                if tok.type not in (
-                    tokenize.ENDMARKER,
-                    tokenize.ENCODING,
-                    tokenize.NEWLINE,
-                    tokenize.NL,
-                ):
-                    total_tokens += 1
-                    if tok.type == tokenize.NAME:
-                        name_tokens += 1
-
-        result = [
-            (
-                tok._replace(string=translation_dict.get(tok.string, tok.string))
-                if tok.type == tokenize.NAME
-                else tok
-            )
-            for tok in tokens
-        ]
+            return translated_code, stats.total_tokens, stats.name_tokens
+        return translated_code
 
-        translated_code = self.custom_untokenize(result)
+    def _translate_counted(self, code, translation_dict, stats):
+        """
+        Translate code, adding its tokens to stats and timing it if hooked.
 
-        if collect_stats:
-            return translated_code, total_tokens, name_tokens
+        With a timing hook, phase durations are gathered in a dict passed
+        down to the output engine, and reading tokens is timed separately
+        from the engine pulling them, so the same tokens are read as without
+        the hook. Memo hits are not reported.
+
+        Args:
+            code (str): The source code to translate
+            translation_dict (dict): Dictionary mapping source to target keywords
+            stats (TranslationStats | None): Statistics to add every token of
+                                             the code to, or None
+
+        Returns:
+            str: The translated code
+        """
+        phases = None if self.timing_hook is None else {}
+        token_count = [0]
+        start = phase_mark(phases) if phases is not None else 0.0
+        last_row = self.last_candidate_row(code, translation_dict)
+        if phases is not None:
+            end_phase(phases, "scan", start)
+
+        translated_code = code
+        if last_row or stats is not None:
+            tokens = tokenize.generate_tokens(StringIO(code).readline)
+            if phases is not None:
+                phases["tokenize"] = 0.0
+                tokens = self._timed_tokens(tokens, phases, token_count)
+            if stats is not None:
+                tokens = self.count_tokens(tokens, translation_dict, stats)
+            if last_row:
+                translated_code = self.rewrite_names(
+                    code, tokens, translation_dict, last_row, phases
+                )
+            if stats is not None:
+                # Count the tokens the output engine did not need
+                deque(tokens, maxlen=0)
+
+        if phases is not None:
+            self.timing_hook(
+                TranslationTiming(
+                    phases,
+                    token_count[0],
+                    len(code.encode("utf-8")),
+                    len(translated_code.encode("utf-8")),
+                )
+            )
         return translated_code
 
+    @staticmethod
+    def _timed_tokens(tokens, phases, count):
+        """Yield tokens, adding the time spent reading them to phases."""
+        tokens = iter(tokens)
+        while True:
+            start = time.perf_counter()
+            tok = next(tokens, None)
+            phases["tokenize"] += time.perf_counter() - start
+            if tok is None:
+                return
+            count[0] += 1
+            yield tok
+
+    @staticmethod
+    def split_top_level(code, parts):
+        """
+        Find offsets at which code may be split for parallel translation.
+
+        Split points are chosen near equally spaced offsets, at the start of
+        the next line beginning with an identifier or decorator at column 0.
+        Such a line is only a safe split point if it is not inside a bracket
+        or multi-line string, which is checked when the pieces are tokenized.
+        Pieces are at least PARALLEL_MIN_CHUNK characters long on average.
+
+        Args:
+            code (str): The source code to split
+            parts (int): Maximum number of pieces
+
+        Returns:
+            list: Increasing offsets starting with 0 and ending with len(code)
+
+        Example:
+            >>> PiyathonTranslator.split_top_level("x = 1\n", 4)
+            [0, 6]
+        """
+        parts = min(parts, len(code) // PARALLEL_MIN_CHUNK)
+        bounds = [0]
+        for part in range(1, parts):
+            match = TOP_LEVEL_LINE_PATTERN.search(
+                code, max(len(code) * part // parts, bounds[-1])
+            )
+            if match is None:
+                break
+            if bounds[-1] < match.end() < len(code):
+                bounds.append(match.end())
+        bounds.append(len(code))
+        return bounds
+
+    def _translate_parallel(self, code, translation_dict, bounds):
+        """
+        Translate code split at the given offsets in a process pool.
+
+        Pieces before the one holding the last candidate identifier are fully
+        tokenized, so a piece that does not end at a top-level logical line
+        raises an error; the whole code is then translated serially. Pieces
+        after it are copied unchanged, as in a serial translation.
+        """
+        pattern = compile_keyword_pattern(frozenset(translation_dict))
+        match = pattern.match(code) if pattern is not None else None
+        if match is None:
+            return code
+        last_candidate = match.start(1)
+
+        # Imported here, as it roughly doubles the import time of the module
+        from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+            ProcessPoolExecutor,
+        )
+
+        pieces = []
+        with ProcessPoolExecutor(max_workers=len(bounds) - 1) as executor:
+            for start, end in itertools.pairwise(bounds):
+                if start > last_candidate:
+                    pieces.append(code[start:end])
+                    continue
+                pieces.append(
+                    executor.submit(
+                        translate_piece,
+                        self.engine,
+                        code[start:end],
+                        translation_dict,
+                        end <= last_candidate,
+                    )
+                )
+            try:
+                return "".join(
+                    piece if isinstance(piece, str) else piece.result()
+                    for piece in pieces
+                )
+            except (tokenize.TokenError, SyntaxError):
+                # A split point was inside a bracket or multi-line string
+                executor.shutdown(cancel_futures=True)
+        return self._translate(code, translation_dict, False)
+
+    def rewrite_names(self, code, tokens, translation_dict, last_row, phases=None):
+        """
+        Build translated code with the output engine of the translator.
+
+        Args:
+            code (str): The source code the tokens were read from
+            tokens (iterable): TokenInfo objects of the code
+            translation_dict (dict): Dictionary mapping source to target keywords
+            last_row (int): The last row that may contain a name to translate
+            phases (dict | None): Phase durations to add the engine's phases
+                                  to, or None
+
+        Returns:
+            str: The translated code
+        """
+        if self.engine == "splice":
+            return self.splice_names(code, tokens, translation_dict, last_row, phases)
+        return self.untokenize_names(code, tokens, translation_dict, last_row, phases)
+
+    @staticmethod
+    def count_tokens(tokens, translation_dict, stats):
+        """
+        Pass tokens through while adding them to translation statistics.
+
+        The counts are stored in stats once the tokens are exhausted.
+
+        Args:
+            tokens (iterable): TokenInfo objects of the code
+            translation_dict (dict): Dictionary mapping source to target keywords
+            stats (TranslationStats): Statistics to update
+
+        Yields:
+            TokenInfo: Each token unchanged
+        """
+        skipped_types = (
+            tokenize.ENDMARKER,
+            tokenize.ENCODING,
+            tokenize.NEWLINE,
+            tokenize.NL,
+        )
+        translated_names = stats.translated_names
+        unmapped_names = stats.unmapped_names
+        total_tokens = 0
+        name_tokens = 0
+        for tok in tokens:
+            if tok.type not in skipped_types:
+                total_tokens += 1
+                if tok.type == tokenize.NAME:
+                    name_tokens += 1
+                    if tok.string in translation_dict:
+                        translated_names[tok.string] += 1
+                    else:
+                        unmapped_names[tok.string] += 1
+            yield tok
+        stats.total_tokens += total_tokens
+        stats.name_tokens += name_tokens
+
+    def translate_with_stats(self, code, translation_dict):
+        """
+        Translate code and gather statistics in the same pass over its tokens.
+
+        Tokens after the last line that needs translating are still read to
+        complete the counts, but are not passed to the output engine. Results
+        are never memoized.
+
+        Args:
+            code (str): The source code to translate
+            translation_dict (dict): Dictionary mapping source to target keywords
+
+        Returns:
+            tuple: (translated_code, stats) where stats is a TranslationStats
+
+        Example:
+            >>> translator = PiyathonTranslator()
+            >>> code, stats = translator.translate_with_stats("def f(): pass", PY_TO_PI)
+            >>> stats.keywords
+            Counter({'def': 1, 'pass': 1})
+            >>> stats.total_tokens, stats.name_tokens
+            (6, 3)
+        """
+        stats = TranslationStats()
+        translated_code = self._translate_counted(code, translation_dict, stats)
+        stats.bytes_in = len(code.encode("utf-8"))
+        stats.bytes_out = len(translated_code.encode("utf-8"))
+        return translated_code, stats
+
     def python_to_piyathon(self, code, collect_stats=False):
         """
         Convert Python code to Piyathon code.
@@ -231,3 +1121,345 @@ class PiyathonTranslator:
             ('def main():', 4, 1)
         """
         return self.translate(code, PI_TO_PY, collect_stats)
+
+    @staticmethod
+    def translate_bytes(source, translation_dict, parallel=None):
+        """
+        Translate encoded source code, keeping its original encoding.
+
+        The encoding is detected from a byte order mark or a PEP 263 coding
+        declaration, defaulting to UTF-8. Lines are decoded only to be
+        tokenized; the output is spliced from the original bytes and the
+        encoded translated names, so unchanged regions are never re-encoded
+        and a byte order mark is kept.
+
+        With parallel set, the source is decoded as a whole and translated
+        with the splice engine in parallel, as long as encoding the decoded
+        text reproduces the source exactly.
+
+        Args:
+            source (bytes | file): Encoded source code or a binary file object
+            translation_dict (dict): Dictionary mapping source to target keywords
+            parallel (int | None): Number of worker processes for large sources,
+                                   None or 1 to translate in this process
+
+        Returns:
+            bytes: The translated code in the encoding of the source
+
+        Raises:
+            SyntaxError: If the encoding declaration is invalid
+            UnicodeEncodeError: If a translated name cannot be represented in
+                                the source encoding
+
+        Example:
+            >>> source = "# -*- coding: latin-1 -*-\\nprint('é')\\n".encode("latin-1")
+            >>> PiyathonTranslator.translate_bytes(source, {"print": "show"})
+            b"# -*- coding: latin-1 -*-\\nshow('\\xe9')\\n"
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        # The returned lines already have any byte order mark removed
+        encoding, lines = tokenize.detect_encoding(source.readline)
+        bom = b""
+        if encoding == "utf-8-sig":
+            bom = codecs.BOM_UTF8
+            encoding = "utf-8"
+
+        if parallel is not None and parallel > 1:
+            body = b"".join(lines) + source.read()
+            try:
+                code = body.decode(encoding)
+            except UnicodeDecodeError:
+                code = None
+            if code is not None and code.encode(encoding) == body:
+                translator = PiyathonTranslator("splice")
+                translated_code = translator.translate(
+                    code, translation_dict, parallel=parallel
+                )
+                return bom + translated_code.encode(encoding)
+            source = BytesIO(body)
+            lines = []
+
+        consumed = iter(list(lines))
+
+        def readline():
+            line = next(consumed, None)
+            if line is None:
+                line = source.readline()
+                lines.append(line)
+            return line.decode(encoding)
+
+        edits = []
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type == tokenize.NAME and tok.string in translation_dict:
+                row, col = tok.start
+                start = len(lines[row - 1].decode(encoding)[:col].encode(encoding))
+                edits.append(
+                    (
+                        row,
+                        start,
+                        start + len(tok.string.encode(encoding)),
+                        translation_dict[tok.string].encode(encoding),
+                    )
+                )
+
+        pieces = [bom]
+        edits = iter(edits)
+        edit = next(edits, None)
+        for row, line in enumerate(lines, start=1):
+            prev_end = 0
+            while edit is not None and edit[0] == row:
+                _, start, end, replacement = edit
+                pieces.append(line[prev_end:start])
+                pieces.append(replacement)
+                prev_end = end
+                edit = next(edits, None)
+            pieces.append(line[prev_end:] if prev_end else line)
+        return b"".join(pieces)
+
+    def iter_translate(self, source, translation_dict):
+        """
+        Lazily translate code read from a file or readline callable.
+
+        Tokens are pulled from tokenize.generate_tokens on demand and untokenized
+        one logical line at a time, so memory use is bounded by the longest
+        logical line rather than by the size of the whole source.
+
+        Unlike translate(), which cannot know in advance where the last name
+        to translate is, every line is untokenized, including the lines that
+        translate() copies unchanged after the last candidate identifier or
+        in code without any.
+
+        Args:
+            source (file | callable): A text file object or a readline callable
+            translation_dict (dict): Dictionary mapping source to target keywords
+
+        Yields:
+            str: Consecutive chunks of translated code, one per logical line.
+                 Each chunk after the first starts with the line break that
+                 ended the previous logical line; joined together the chunks
+                 are identical to the result of translate() with the
+                 untokenize engine when the last logical line has a name to
+                 translate, and otherwise may differ in the spacing that
+                 untokenizing normalizes after the last translated name
+
+        Example:
+            >>> translator = PiyathonTranslator()
+            >>> chunks = translator.iter_translate(StringIO("x = 1\\n"), PY_TO_PI)
+            >>> "".join(chunks)
+            'x = 1\\n'
+        """
+        readline = getattr(source, "readline", source)
+        untokenizer = tokenize.Untokenizer()
+        chunk = []
+        prev_token = None
+        # Indentation levels that are open at the start of the current chunk
+        indents = []
+
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type == tokenize.NAME:
+                tok = tok._replace(string=translation_dict.get(tok.string, tok.string))
+            elif (
+                self.is_string_like(tok)
+                and prev_token is not None
+                and self.is_string_like(prev_token)
+            ):
+                # Same adjacent string fix as custom_untokenize
+                tok = tok._replace(start=(prev_token.end[0], prev_token.end[1] + 1))
+
+            if tok.type == tokenize.NEWLINE and chunk:
+                yield self._untokenize_chunk(untokenizer, indents, chunk)
+                chunk = []
+
+            chunk.append(tok)
+            prev_token = tok
+
+        if chunk:
+            yield self._untokenize_chunk(untokenizer, indents, chunk)
+
+    @staticmethod
+    def _untokenize_chunk(untokenizer, indents, chunk):
+        """
+        Untokenize one chunk of tokens while keeping state across chunks.
+
+        Untokenizer keeps its position on the instance but its indentation stack
+        and line-start flag are local to each untokenize() call. Chunks start with
+        the NEWLINE token of the previous logical line, which restores the
+        line-start flag, and the open indentation levels are replayed as INDENT
+        tokens, which produce no output of their own.
+
+        Args:
+            untokenizer (tokenize.Untokenizer): Untokenizer shared by all chunks
+            indents (list): Open indentation strings, updated in place
+            chunk (list): TokenInfo objects of the chunk
+
+        Returns:
+            str: The untokenized text of the chunk
+        """
+        replayed = [
+            tokenize.TokenInfo(tokenize.INDENT, indent, (0, 0), (0, 0), "")
+            for indent in indents
+        ]
+        if chunk[0].type == tokenize.NEWLINE:
+            replayed.insert(0, chunk.pop(0))
+
+        for tok in chunk:
+            if tok.type == tokenize.INDENT:
+                indents.append(tok.string)
+            elif tok.type == tokenize.DEDENT:
+                indents.pop()
+
+        untokenizer.tokens = []
+        return untokenizer.untokenize(replayed + chunk)
+
+    def translate_stream(self, source, out_file, translation_dict):
+        """
+        Translate code from a file or readline callable into a writable file.
+
+        Output is written one logical line at a time as it is produced by
+        iter_translate(), so arbitrarily large sources can be translated with
+        bounded memory.
+
+        Args:
+            source (file | callable): A text file object or a readline callable
+            out_file (file): A text file object to write the translated code to
+            translation_dict (dict): Dictionary mapping source to target keywords
+
+        Side Effects:
+            Writes the translated code to out_file
+
+        Example:
+            >>> with open("big.py", encoding="utf-8") as src, \\
+            ...         open("big.pi", "w", encoding="utf-8") as dst:
+            ...     PiyathonTranslator().translate_stream(src, dst, PY_TO_PI)
+        """
+        for chunk in self.iter_translate(source, translation_dict):
+            out_file.write(chunk)
+
+    def translate_many(
+        self, items, translation_dict, workers=None, chunksize=16, collect_stats=True
+    ):
+        """
+        Translate many sources across a pool of worker processes.
+
+        Sources are sent to the workers in chunks, and only a bounded number of
+        chunks is in flight at a time, so results are streamed back in input
+        order without holding the whole batch in memory. An error in one
+        source is reported in its result instead of aborting the batch.
+
+        Args:
+            items (iterable): Source code strings to translate
+            translation_dict (dict): Dictionary mapping source to target keywords
+            workers (int | None): Number of worker processes, os.cpu_count() if
+                                  None; 1 translates in the calling process
+            chunksize (int): Number of sources sent to a worker at a time
+            collect_stats (bool): Whether to collect token statistics
+
+        Yields:
+            TranslationResult: (translated_code, total_tokens, name_tokens, error)
+                               for each source in input order. On failure
+                               translated_code is None and error holds the
+                               exception; token counts are None unless
+                               collect_stats is True
+
+        Example:
+            >>> translator = PiyathonTranslator()
+            >>> for result in translator.translate_many(["print(1)"], PY_TO_PI):
+            ...     print(result)
+            TranslationResult(translated_code='พิมพ์(1)', total_tokens=4, name_tokens=1, error=None)
+        """
+        workers = workers or os.cpu_count() or 1
+        chunks = itertools.batched(items, chunksize)
+
+        if workers == 1:
+            for chunk in chunks:
+                yield from translate_chunk(
+                    self.engine, chunk, translation_dict, collect_stats
+                )
+            return
+
+        from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+            ProcessPoolExecutor,
+        )
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(
+                    executor.submit(
+                        translate_chunk,
+                        self.engine,
+                        chunk,
+                        translation_dict,
+                        collect_stats,
+                    )
+                )
+                # Keep every worker busy while bounding the results held in memory
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def translate_piece(engine, code, translation_dict, whole):
+    """
+    Translate a piece of code starting at a top-level logical line.
+
+    This is the unit of work of a parallel PiyathonTranslator.translate() and
+    is run in worker processes, so it only takes picklable arguments.
+
+    Args:
+        engine (str): Output engine of the translator
+        code (str): The piece of code
+        translation_dict (dict): Dictionary mapping source to target keywords
+        whole (bool): Whether to tokenize the whole piece, which raises an
+                      error if it does not end at a top-level logical line,
+                      instead of stopping after its last candidate identifier
+
+    Returns:
+        str: The translated piece
+    """
+    translator = PiyathonTranslator(engine)
+    if whole:
+        last_row = code.count("\n") + 1
+    else:
+        last_row = translator.last_candidate_row(code, translation_dict)
+    tokens = tokenize.generate_tokens(StringIO(code).readline)
+    return translator.rewrite_names(code, tokens, translation_dict, last_row)
+
+
+def translate_chunk(engine, codes, translation_dict, collect_stats):
+    """
+    Translate a chunk of sources, capturing errors per source.
+
+    This is the unit of work of PiyathonTranslator.translate_many() and is run
+    in worker processes, so it only takes picklable arguments.
+
+    Args:
+        engine (str): Output engine of the translator
+        codes (tuple): Source code strings to translate
+        translation_dict (dict): Dictionary mapping source to target keywords
+        collect_stats (bool): Whether to collect token statistics
+
+    Returns:
+        list: TranslationResult for each source, in order
+    """
+    translator = PiyathonTranslator(engine)
+    results = []
+    for code in codes:
+        try:
+            if collect_stats:
+                results.append(
+                    TranslationResult(
+                        *translator.translate(code, translation_dict, True), None
+                    )
+                )
+            else:
+                translated_code = translator.translate(code, translation_dict)
+                results.append(TranslationResult(translated_code, None, None, None))
+        except Exception as error:  # pylint: disable=broad-except
+            results.append(TranslationResult(None, None, None, error))
+    return results
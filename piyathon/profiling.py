@@ -0,0 +1,249 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Profiling Module
+
+This module profiles Piyathon scripts with cProfile for `piyathon --profile`.
+Code translated from .pi files is compiled with the .pi path as its file
+name, and translation keeps line numbers, so profile entries point at the
+lines of the .pi files themselves.
+
+Core Functionality:
+    - Profiles the user code of a run, leaving out translation and startup
+    - Prints the hottest functions on exit, with their names as written in
+      the .pi source
+    - Saves the statistics to a .pstats file for pstats, snakeviz and others
+
+Dependencies:
+    - cProfile: For deterministic function profiling
+    - pstats: For collecting the profile statistics
+    - unicodedata: For recovering names as written from NFKC normalized ones
+    - re: For finding the names in .pi sources, with the identifier
+      characters of piyathon_translator
+
+Integration Points:
+    - Used as an instrument by piyathon.piyathon.run_file: started right
+      before the user code and stopped right after it
+    - Reports are written to stderr when the interpreter exits
+    - Saved statistics can be read with `python -m pstats out.pstats`
+
+Usage Examples:
+    $ piyathon --profile hello.pi
+    $ piyathon --profile=hello.pstats hello.pi
+
+Known Limitations:
+    - Every thread is profiled on one call stack, so callers and times
+      of calls made by other threads, including the waits of the
+      --sample thread, are mixed with those of the user code
+    - Names in the saved statistics are NFKC normalized, as Python sees them
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import unicodedata
+
+DEFAULT_LIMIT = 25
+
+
+def written_names(source_file):
+    """
+    Map the NFKC normalized names of a .pi file to the names as written.
+
+    Python normalizes identifiers with NFKC, so a name written with sara am
+    (ำ) is known to Python with the decomposed ํา instead.
+
+    Args:
+        source_file (str): Path to the .pi source file
+
+    Returns:
+        dict: Names as written, keyed by their normalized form, for the
+              names that normalization changes; empty if the file cannot be
+              read
+
+    Example:
+        >>> written_names("hello.pi")
+        {'ทํางาน': 'ทำงาน'}
+    """
+    try:
+        with open(source_file, encoding="utf-8", errors="replace") as file:
+            source = file.read()
+    except OSError:
+        return {}
+    # Imported here, so that runs from cached code load the translator only
+    # when a report needs it
+    from .piyathon_translator import (  # pylint: disable=import-outside-toplevel
+        IDENTIFIER_CHAR,
+    )
+
+    names = {}
+    # Thai vowel and tone marks are not \w, but are part of identifiers
+    for name in set(re.findall(f"{IDENTIFIER_CHAR}+", source)):
+        normalized = unicodedata.normalize("NFKC", name)
+        if normalized != name:
+            names[normalized] = name
+    return names
+
+
+class SourceNames:
+    """
+    Names of functions in .pi files as written, read once per file.
+
+    Attributes:
+        files (dict): Result of written_names() for each file read
+
+    Example:
+        >>> SourceNames().display("hello.pi", "ทํางาน")
+        'ทำงาน'
+    """
+
+    def __init__(self):
+        """Initialize without reading any file."""
+        self.files = {}
+
+    def display(self, filename, name):
+        """
+        Return a name defined in a file as written there.
+
+        Args:
+            filename (str): File name of the code object
+            name (str): Name of the code object
+
+        Returns:
+            str: The name as written in a .pi file, otherwise unchanged
+        """
+        if not filename.endswith(".pi"):
+            return name
+        if filename not in self.files:
+            self.files[filename] = written_names(filename)
+        names = self.files[filename]
+        return ".".join(names.get(part, part) for part in name.split("."))
+
+
+class FunctionProfiler:
+    """
+    An instrument profiling the user code of a run with cProfile.
+
+    Attributes:
+        output (str | None): Path the statistics are saved to, if any
+        limit (int): Number of functions printed in the summary
+        profile (cProfile.Profile): The profiler
+        ignored_files (set): Files whose functions are left out of the
+                             statistics
+
+    Methods:
+        start(): Start profiling
+        stop(): Stop profiling
+        statistics(): Collect the statistics of the user code
+        summary(): Format the hottest functions
+        report(file): Print the summary and save the statistics
+
+    Example:
+        >>> profiler = FunctionProfiler("hello.pstats")
+        >>> profiler.start()
+        >>> exec(code, namespace)
+        >>> profiler.stop()
+        >>> profiler.report()
+    """
+
+    def __init__(self, output=None, limit=DEFAULT_LIMIT, ignored_files=()):
+        """
+        Create a profiler.
+
+        Args:
+            output (str | None): Path to save the statistics to, or None
+            limit (int): Number of functions printed in the summary
+            ignored_files (iterable): Files of other instruments running
+                                      while profiling, such as a sampler
+                                      thread
+        """
+        self.output = output
+        self.limit = limit
+        self.profile = cProfile.Profile()
+        self.ignored_files = {__file__, *ignored_files}
+
+    def start(self):
+        """Start profiling."""
+        self.profile.enable()
+
+    def stop(self):
+        """Stop profiling."""
+        self.profile.disable()
+
+    def statistics(self):
+        """
+        Collect the statistics, leaving out the functions of ignored files.
+
+        Returns:
+            pstats.Stats: The statistics of the user code
+        """
+        profile_stats = pstats.Stats(self.profile)
+        stats = profile_stats.stats
+        ignored = {key for key in stats if key[0] in self.ignored_files}
+        for key in ignored:
+            del stats[key]
+        for *_, callers in stats.values():
+            for key in ignored & callers.keys():
+                del callers[key]
+        profile_stats.total_calls = profile_stats.prim_calls = 0
+        profile_stats.total_tt = 0
+        profile_stats.get_top_level_stats()
+        return profile_stats
+
+    def summary(self):
+        """
+        Format the hottest functions by cumulative time.
+
+        Returns:
+            str: A table with the call count, own time and cumulative time of
+                 each function, located by file, line and name as written
+        """
+        profile_stats = self.statistics()
+        names = SourceNames()
+        rows = sorted(
+            (
+                (key, value)
+                for key, value in profile_stats.stats.items()
+                if "_lsprof.Profiler" not in key[2]
+            ),
+            key=lambda item: item[1][3],
+            reverse=True,
+        )
+        lines = [
+            f"{profile_stats.total_calls:,} function calls "
+            f"in {profile_stats.total_tt:.3f} seconds",
+            f"{'ncalls':>12} {'tottime':>9} {'cumtime':>9}  filename:lineno(function)",
+        ]
+        for (filename, line, name), value in rows[: self.limit]:
+            primitive_calls, calls, own_time, cumulative_time, _ = value
+            ncalls = str(calls)
+            if primitive_calls != calls:
+                ncalls = f"{calls}/{primitive_calls}"
+            if filename == "~":
+                location = name
+            else:
+                location = f"{filename}:{line}({names.display(filename, name)})"
+            lines.append(
+                f"{ncalls:>12} {own_time:>9.3f} {cumulative_time:>9.3f}  {location}"
+            )
+        return "\n".join(lines)
+
+    def report(self, file=None):
+        """
+        Print the summary and save the statistics, as registered with atexit.
+
+        Args:
+            file (file | None): Where to print, None for sys.stderr
+        """
+        file = file or sys.stderr
+        print(self.summary(), file=file, flush=True)
+        if self.output:
+            self.statistics().dump_stats(self.output)
+            print(
+                f"Profile saved to '{os.path.abspath(self.output)}'",
+                file=file,
+                flush=True,
+            )
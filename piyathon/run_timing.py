@@ -0,0 +1,323 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Runtime Timing Module
+
+This module records how long each phase of a `piyathon file.pi` run takes,
+from importing the runner to the end of the user code, and how long each
+module imported during the run takes to import, to find out why a script
+starts slowly.
+
+Core Functionality:
+    - Monotonic timestamps for the runtime phases of piyathon.main
+    - Import times of modules imported during the run, in the style of
+      `python -X importtime`
+    - Reports as a human-readable table or as JSON
+
+Dependencies:
+    - time: For monotonic timestamps
+    - sys: For the meta path and standard error
+    - os: For the PIYATHON_TIMINGS environment variable
+    - json: For JSON reports, imported only when one is written
+
+Data Structures:
+    - ImportTiming: Self and cumulative import time of one module
+    - RunTimings: Phase durations of one run
+    - ImportTimer: Meta path finder timing the modules it lets others load
+
+Integration Points:
+    - Enabled by `piyathon --timings[=table|json]` or by setting
+      PIYATHON_TIMINGS to "1", "table" or "json"
+    - Reports are written to stderr when the interpreter exits
+
+Usage Examples:
+    $ piyathon --timings hello.pi
+    $ PIYATHON_TIMINGS=json piyathon hello.pi 2> timings.json
+
+Known Limitations:
+    - Modules are timed from finding to executing them, so the time spent
+      creating the module object is counted too
+    - Imports from several threads at once are attributed to each other
+    - Nothing is reported if the script ends with os._exit()
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+TIMINGS_ENV = "PIYATHON_TIMINGS"
+REPORT_FORMATS = ("table", "json")
+
+ImportTiming = namedtuple("ImportTiming", ["module", "self", "cumulative", "depth"])
+ImportTiming.__doc__ = """
+Import time of one module.
+
+Attributes:
+    module (str): Fully qualified name of the module
+    self (float): Seconds spent importing the module, excluding the modules
+                  it imported
+    cumulative (float): Seconds spent importing the module and the modules
+                        it imported
+    depth (int): Number of imports the module was imported from
+"""
+
+
+def report_format(option=None):
+    """
+    Return the report format requested by --timings or the environment.
+
+    Args:
+        option (str | None): Value of the --timings option, None if not given
+
+    Returns:
+        str | None: "table" or "json", or None if timings are disabled
+
+    Example:
+        >>> os.environ["PIYATHON_TIMINGS"] = "json"
+        >>> report_format()
+        'json'
+    """
+    if option is not None:
+        return option
+    value = os.environ.get(TIMINGS_ENV, "").strip().lower()
+    if value in ("", "0"):
+        return None
+    return "json" if value == "json" else "table"
+
+
+class TimedLoader:
+    """
+    A loader timing the loader it wraps while a module is executed.
+
+    Once the module is executed, the wrapped loader is put back as the loader
+    of the module, so the wrapper is only seen during the import.
+
+    Attributes:
+        loader: The wrapped loader
+        timer (ImportTimer): The timer recording the import
+        started (float): Time at which finding the module started
+    """
+
+    def __init__(self, loader, timer, started):
+        """
+        Wrap a loader.
+
+        Args:
+            loader: The loader found for the module
+            timer (ImportTimer): The timer recording the import
+            started (float): Time at which finding the module started
+        """
+        self.loader = loader
+        self.timer = timer
+        self.started = started
+
+    def __getattr__(self, name):
+        """Delegate everything but module execution to the wrapped loader."""
+        return getattr(self.loader, name)
+
+    def exec_module(self, module):
+        """
+        Execute the module with the wrapped loader and record its import time.
+
+        Args:
+            module (types.ModuleType): The module being imported
+        """
+        stack = self.timer.stack
+        stack.append(0.0)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            children = stack.pop()
+            cumulative = time.perf_counter() - self.started
+            if stack:
+                stack[-1] += cumulative
+            self.timer.imports.append(
+                ImportTiming(
+                    module.__name__, cumulative - children, cumulative, len(stack)
+                )
+            )
+            if module.__spec__ is not None and module.__spec__.loader is self:
+                module.__spec__.loader = self.loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self.loader
+
+
+class ImportTimer:
+    """
+    A meta path finder timing the imports found by the finders after it.
+
+    Attributes:
+        imports (list): ImportTiming of each imported module, in the order
+                        their imports completed
+        stack (list): Import time of the children of each import in progress
+
+    Methods:
+        find_spec(fullname, path, target): Find a module with the other finders
+        install(): Put the timer first on the meta path
+        uninstall(): Remove the timer from the meta path
+
+    Example:
+        >>> timer = ImportTimer()
+        >>> timer.install()
+        >>> import json
+        >>> timer.imports[-1].module
+        'json'
+    """
+
+    def __init__(self):
+        """Initialize a timer that has recorded nothing."""
+        self.imports = []
+        self.stack = []
+
+    def find_spec(self, fullname, path, target=None):
+        """
+        Find a module with the other finders and wrap its loader.
+
+        Args:
+            fullname (str): Fully qualified name of the module
+            path (list | None): Search path of the parent package
+            target (types.ModuleType | None): Module being reloaded
+
+        Returns:
+            ModuleSpec | None: The spec found, with a timed loader
+        """
+        started = time.perf_counter()
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = TimedLoader(spec.loader, self, started)
+        return spec
+
+    def install(self):
+        """Put the timer first on the meta path."""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """Remove the timer from the meta path."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class RunTimings:
+    """
+    Durations of the phases of one run.
+
+    A phase ends when it is marked and starts where the previous phase ended.
+    Phases are cheap to mark, so they are marked on every run, while imports
+    are only timed once the timings are enabled.
+
+    Attributes:
+        started (float): Time at which the first phase started
+        last (float): Time at which the last marked phase ended
+        phases (dict): Seconds spent in each phase, in the order they ended
+        import_timer (ImportTimer | None): Times imports once enabled
+
+    Methods:
+        mark(phase): End a phase
+        enable(): Start timing imports
+        as_dict(): Convert the timings to a JSON-compatible dict
+        format_report(): Format the timings as a table
+        report(report_format, file): Write the timings
+
+    Example:
+        >>> timings = RunTimings()
+        >>> timings.mark("read")
+        >>> list(timings.phases)
+        ['read']
+    """
+
+    def __init__(self, started=None):
+        """
+        Start timing a run.
+
+        Args:
+            started (float | None): time.perf_counter() value at which the run
+                                    started, or None for now
+        """
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.phases = {}
+        self.import_timer = None
+
+    def mark(self, phase):
+        """
+        End a phase, adding to its duration if it was marked before.
+
+        Args:
+            phase (str): Name of the phase
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def enable(self):
+        """Start timing imports."""
+        if self.import_timer is None:
+            self.import_timer = ImportTimer()
+            self.import_timer.install()
+
+    def as_dict(self):
+        """
+        Convert the timings to a JSON-compatible dict.
+
+        Returns:
+            dict: Seconds per phase under "phases", the sum of the phases
+                  under "total", and the import time of each module under
+                  "imports"
+        """
+        imports = self.import_timer.imports if self.import_timer else []
+        return {
+            "phases": dict(self.phases),
+            "total": self.last - self.started,
+            "imports": [timing._asdict() for timing in imports],
+        }
+
+    def format_report(self):
+        """
+        Format the timings as a table.
+
+        Returns:
+            str: One line per phase in milliseconds, followed by one line per
+                 imported module in microseconds, as `python -X importtime`
+                 prints them
+        """
+        lines = [f"{'phase':<14} {'ms':>10}"]
+        for phase, seconds in self.phases.items():
+            lines.append(f"{phase:<14} {seconds * 1000:>10.3f}")
+        lines.append(f"{'total':<14} {(self.last - self.started) * 1000:>10.3f}")
+        if self.import_timer is not None and self.import_timer.imports:
+            lines.append("import time: self [us] | cumulative | imported package")
+            for timing in self.import_timer.imports:
+                lines.append(
+                    f"import time: {timing.self * 1e6:>9.0f} | "
+                    f"{timing.cumulative * 1e6:>10.0f} | "
+                    f"{'  ' * timing.depth}{timing.module}"
+                )
+        return "\n".join(lines)
+
+    def report(self, report_format="table", file=None):
+        """
+        Write the timings, as registered with atexit by piyathon.main.
+
+        Args:
+            report_format (str): "table" or "json"
+            file (file | None): Where to write, None for sys.stderr
+        """
+        if self.import_timer is not None:
+            self.import_timer.uninstall()
+        if report_format == "json":
+            import json  # pylint: disable=import-outside-toplevel
+
+            text = json.dumps(self.as_dict(), ensure_ascii=False)
+        else:
+            text = self.format_report()
+        print(text, file=file or sys.stderr, flush=True)
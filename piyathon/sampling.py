@@ -0,0 +1,223 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Sampling Profiler Module
+
+This module samples the stacks of a running Piyathon program for
+`piyathon --sample`. A background thread captures the stacks of all other
+threads at a fixed rate, and the samples are written as collapsed stacks,
+the input format of flamegraph.pl, inferno, speedscope and other flame
+graph tools. The program itself is not instrumented, so long-running jobs
+can be profiled with little overhead.
+
+Core Functionality:
+    - Samples sys._current_frames() at a fixed rate from a daemon thread
+    - Labels frames with function names as written in the .pi source and
+      with their .pi file and line
+    - Leaves out the frames of the Piyathon runner below the user code
+    - Writes collapsed stacks, one line per distinct stack with its count
+
+Dependencies:
+    - threading: For the sampling thread
+    - sys: For the stacks of the running threads
+    - time: For keeping the sampling rate
+    - profiling: For function names as written in .pi files
+
+Data Structures:
+    - Stacks are tuples of frame labels, outermost first, counted in a
+      collections.Counter
+    - A label is "function (file:line)", as written by py-spy
+
+Integration Points:
+    - Used as an instrument by piyathon.piyathon.run_file: started right
+      before the user code and stopped right after it
+    - The collapsed stacks are written when the interpreter exits
+
+Usage Examples:
+    $ piyathon --sample=250 --sample-output=job.collapsed job.pi
+    $ flamegraph.pl job.collapsed > job.svg
+
+Known Limitations:
+    - Samples are wall-clock samples, so threads waiting on I/O or locks
+      are sampled as well
+    - The sampling thread needs the GIL, so samples are taken at the next
+      switch interval of the running thread, not at exact times
+    - Nothing is written if the process is killed
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from .profiling import SourceNames
+
+
+class StackSampler:
+    """
+    An instrument sampling the stacks of all threads from a daemon thread.
+
+    Attributes:
+        interval (float): Seconds between two samples
+        output (str): Path the collapsed stacks are written to
+        counts (Counter): Number of samples of each stack
+        samples (int): Number of times the threads were sampled
+        labels (dict): Label of each (code, line), built once
+        runner_id (int | None): Id of the thread running the script
+
+    Methods:
+        start(): Start sampling
+        stop(): Stop sampling
+        sample(): Sample the stacks of all threads once
+        collapsed(): Format the stacks for flame graph tools
+        report(file): Write the collapsed stacks and print a summary
+
+    Example:
+        >>> sampler = StackSampler(100, "hello.collapsed")
+        >>> sampler.start()
+        >>> exec(code, namespace)
+        >>> sampler.stop()
+        >>> sampler.report()
+    """
+
+    def __init__(self, rate, output):
+        """
+        Create a sampler.
+
+        Args:
+            rate (float): Samples per second
+            output (str): Path to write the collapsed stacks to
+        """
+        self.interval = 1 / rate
+        self.output = output
+        self.counts = Counter()
+        self.samples = 0
+        self.labels = {}
+        self.names = SourceNames()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.runner_id = None
+
+    def start(self):
+        """Start sampling in a daemon thread."""
+        self.runner_id = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="piyathon-sampler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampling thread."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """Sample at the set rate until stopped, without catching up on delays."""
+        own_id = threading.get_ident()
+        deadline = time.perf_counter()
+        while True:
+            deadline += self.interval
+            timeout = deadline - time.perf_counter()
+            if timeout < 0:
+                deadline -= timeout
+                timeout = 0
+            if self.stopped.wait(timeout):
+                return
+            self.sample(own_id)
+
+    def sample(self, own_id=None):
+        """
+        Sample the stacks of all threads once.
+
+        Args:
+            own_id (int | None): Id of a thread to leave out, such as the
+                                 sampling thread
+        """
+        # pylint: disable-next=protected-access
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != own_id:
+                self.counts[self.stack(frame, thread_id == self.runner_id)] += 1
+        self.samples += 1
+
+    def stack(self, frame, runner=False):
+        """
+        Label the frames of a stack.
+
+        Frames below the outermost frame of .pi code are those of the
+        Piyathon runner, so they are left out.
+
+        Args:
+            frame (types.FrameType): The innermost frame
+            runner (bool): Whether the thread is the one running the script,
+                           whose stacks without .pi code are the runner's
+
+        Returns:
+            tuple: Labels of the frames, outermost first, empty for a stack
+                   of the runner only
+        """
+        labels = []
+        outermost = 0
+        while frame is not None:
+            code = frame.f_code
+            key = (code, frame.f_lineno)
+            label = self.labels.get(key)
+            if label is None:
+                label = self.labels[key] = self.label(code, frame.f_lineno)
+            labels.append(label)
+            if code.co_filename.endswith(".pi"):
+                outermost = len(labels)
+            frame = frame.f_back
+        if outermost:
+            del labels[outermost:]
+        elif runner:
+            return ()
+        labels.reverse()
+        return tuple(labels)
+
+    def label(self, code, line):
+        """
+        Label a frame as "function (file:line)".
+
+        Args:
+            code (types.CodeType): Code object of the frame
+            line (int | None): Line the frame is running
+
+        Returns:
+            str: The label, with the function name as written in .pi files
+                 and without the semicolons separating collapsed frames
+        """
+        name = self.names.display(code.co_filename, code.co_qualname)
+        return f"{name} ({code.co_filename}:{line})".replace(";", ",")
+
+    def collapsed(self):
+        """
+        Format the stacks for flame graph tools.
+
+        Returns:
+            str: One line per stack, frames separated by semicolons,
+                 followed by a space and the number of samples
+        """
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.counts.items())
+            if stack
+        )
+
+    def report(self, file=None):
+        """
+        Write the collapsed stacks and print a summary, as registered with atexit.
+
+        Args:
+            file (file | None): Where to print the summary, None for sys.stderr
+        """
+        with open(self.output, "w", encoding="utf-8") as output:
+            output.write(self.collapsed())
+        print(
+            f"{self.samples:,} samples at {1 / self.interval:g} Hz "
+            f"written to '{self.output}'",
+            file=file or sys.stderr,
+            flush=True,
+        )
@@ -0,0 +1,493 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Execution Server Module
+
+This module provides a daemon that runs Piyathon scripts with the translator,
+the import hook and the Lib wrappers already loaded, for clients such as
+`piyathon --client`. Each request is run in a freshly forked child, so runs
+are isolated from each other and from the server while skipping interpreter
+startup, imports and most translation work.
+
+Core Functionality:
+    - Preloads the translator, tokenize and the Lib wrappers once
+    - Listens on a Unix socket and forks a clean child per request, reading
+      requests as they arrive so that a slow client does not hold up others
+    - Runs the script with the client's standard streams, working directory
+      and environment, so output goes straight to the client's terminal
+    - Reports the exit status of the child back to the client
+    - Forwards SIGINT, SIGTERM and SIGHUP from the client to the child
+
+Dependencies:
+    - socket: For the Unix socket and passing file descriptors
+    - selectors: For waiting on new clients, clients and exited children
+    - signal: For child exit notification and signal forwarding
+    - marshal: For decoding requests
+    - client: For the protocol shared with the client
+
+Data Structures:
+    - The protocol is described in piyathon.client
+
+Integration Points:
+    - Started by `piyathon serve` and used by `piyathon --client file.pi`
+      through piyathon.client
+    - Scripts are run by piyathon.piyathon.run_file, as by `piyathon file.pi`
+    - Other programs, such as a tutoring backend, can speak the protocol
+      directly and pass pipes instead of their own standard streams
+    - The socket path defaults to the one of piyathon.client
+
+Usage Examples:
+    $ piyathon serve &
+    $ piyathon --client hello.pi
+
+Known Limitations:
+    - Unix only, as it relies on fork() and file descriptor passing
+    - Children end with os._exit(), so atexit handlers do not run and
+      non-daemon threads are not waited for
+    - Script arguments are not forwarded, as for `piyathon file.pi`
+"""
+
+import functools
+import gc
+import marshal
+import os
+import selectors
+import signal
+import socket
+import stat
+import sys
+import traceback
+from .client import (
+    FORWARDED_SIGNALS,
+    MESSAGE,
+    default_socket_path,
+    private_directory,
+    receive_exactly,
+)
+
+# Most bytes of a request read at once
+RECEIVE_SIZE = 65536
+
+
+def make_private_directory(directory):
+    """
+    Create a directory accessible only by the current user, if missing.
+
+    Args:
+        directory (str): Path of the directory
+
+    Raises:
+        OSError: If the directory exists but belongs to another user or is
+                 accessible by other users
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    status = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or status.st_mode & 0o077
+    ):
+        raise OSError(f"'{directory}' is not a private directory of the current user")
+
+
+def wakeup_pipe():
+    """
+    Create a non-blocking pipe for signal.set_wakeup_fd().
+
+    Returns:
+        tuple: The read and write file descriptors
+    """
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    return read_fd, write_fd
+
+
+def drain(fd):
+    """
+    Read everything written so far to a non-blocking pipe.
+
+    Args:
+        fd (int): Read end of the pipe
+    """
+    try:
+        while len(os.read(fd, 512)) == 512:
+            pass
+    except BlockingIOError:
+        pass
+
+
+def exit_code(code):
+    """
+    Convert the argument of SystemExit to a process exit code.
+
+    Args:
+        code: The SystemExit code
+
+    Returns:
+        int: The exit code, printing a non-integer code to stderr as Python does
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def request_size(data):
+    """
+    Return the size of a request, as far as it is known from its start.
+
+    Args:
+        data (bytes): The start of the request
+
+    Returns:
+        int: Size of the whole request, including its length prefix, or the
+             size of the prefix while it is incomplete
+
+    Raises:
+        ValueError: If the length prefix is negative
+    """
+    if len(data) < MESSAGE.size:
+        return MESSAGE.size
+    (size,) = MESSAGE.unpack_from(data)
+    if size < 0:
+        raise ValueError("negative request size")
+    return MESSAGE.size + size
+
+
+def run_and_exit(source_file, cache, setup=None):
+    """
+    Run a script in a forked child, then end the child with its exit code.
+
+    Exceptions escaping the script are printed as Python would print them.
+    The child ends with os._exit(), so that nothing inherited from the parent
+    process runs on the way out.
+
+    Args:
+        source_file (str): Path to the Piyathon source file
+        cache (TranslationCache | None): Translation cache used by the run
+        setup (callable | None): Prepares the child, as part of the run
+    """
+    status = 1
+    try:
+        if setup is not None:
+            setup()
+        sys.argv = [source_file]
+
+        from .piyathon import run_file  # pylint: disable=import-outside-toplevel
+
+        run_file(source_file, cache)
+        status = 0
+    except SystemExit as e:
+        status = exit_code(e.code)
+    except KeyboardInterrupt:
+        traceback.print_exc()
+        status = 128 + signal.SIGINT
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:  # pylint: disable=broad-except
+                pass
+        os._exit(status)  # pylint: disable=protected-access
+
+
+def preload():
+    """
+    Import and warm up everything that runs would otherwise load themselves.
+
+    The preloaded objects are then frozen out of garbage collection, so that
+    children do not copy the memory pages holding them.
+    """
+    # pylint: disable=import-outside-toplevel,unused-import
+    import importlib
+    from . import hook, lib_modules
+    from .keywords import PI_TO_PY
+    from .piyathon import run_file
+    from .piyathon_translator import PiyathonTranslator
+
+    PiyathonTranslator().translate("พิมพ์(1)\n", PI_TO_PY)
+    lib_path = os.path.join(os.path.dirname(__file__), "Lib")
+    sys.path.insert(0, lib_path)
+    try:
+        for name in lib_modules():
+            importlib.import_module(name)
+    finally:
+        sys.path.remove(lib_path)
+    gc.collect()
+    gc.freeze()
+
+
+class PiyathonServer:
+    """
+    A daemon running Piyathon scripts in forked children.
+
+    Attributes:
+        socket_path (str): Path of the Unix socket
+        cache (TranslationCache | None): Translation cache used by the runs
+        listener (socket.socket): The listening socket
+        selector (selectors.BaseSelector): Waits for clients and children
+        children (dict): Client connection of each running child, by pid
+        pending (dict): Data and file descriptors received so far, by client
+                        connection, for requests still being received
+
+    Methods:
+        serve_forever(): Accept and run requests until interrupted
+        close(): Stop listening and remove the socket
+
+    Example:
+        >>> server = PiyathonServer("/tmp/piyathon.sock")
+        >>> server.serve_forever()
+    """
+
+    def __init__(self, socket_path=None, cache=None):
+        """
+        Bind the socket, readable and writable only by the current user.
+
+        Args:
+            socket_path (str | None): Path of the socket, or None for the
+                                      default path
+            cache (TranslationCache | None): Translation cache, or None to
+                                             disable caching
+
+        Raises:
+            OSError: If another server is listening on the socket, or the
+                     default directory of the socket is not private
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.cache = cache
+        self.children = {}
+        self.pending = {}
+        if os.path.dirname(self.socket_path) == private_directory():
+            make_private_directory(private_directory())
+        if os.path.exists(self.socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(self.socket_path) == 0:
+                    raise OSError(
+                        f"A piyathon server is already listening on '{self.socket_path}'"
+                    )
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            self.listener.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        self.listener.listen(64)
+        self.wakeup_read, self.wakeup_write = wakeup_pipe()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+        self.selector.register(self.wakeup_read, selectors.EVENT_READ, self.reap)
+
+    def serve_forever(self):
+        """Accept and run requests until interrupted."""
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(self.wakeup_write)
+        while True:
+            for key, _ in self.selector.select():
+                key.data(key.fileobj)
+
+    def accept(self, listener):
+        """
+        Accept a client and wait for its request without blocking.
+
+        Args:
+            listener (socket.socket): The listening socket
+        """
+        conn, _ = listener.accept()
+        conn.setblocking(False)
+        self.pending[conn] = (bytearray(), [])
+        self.selector.register(conn, selectors.EVENT_READ, self.receive)
+
+    def receive(self, conn):
+        """
+        Read what a client has sent so far, and run its request once complete.
+
+        Args:
+            conn (socket.socket): The client connection
+        """
+        data, fds = self.pending[conn]
+        try:
+            size = request_size(data)
+            chunk, received, _, _ = socket.recv_fds(
+                conn, min(size - len(data), RECEIVE_SIZE), 3
+            )
+            fds.extend(received)
+            if not chunk:
+                raise EOFError("the client disconnected")
+            data += chunk
+            size = request_size(data)
+            if len(data) < size:
+                return
+            request = marshal.loads(data[MESSAGE.size :])
+            if len(fds) != 3:
+                raise ValueError("expected the three standard streams")
+        except BlockingIOError:
+            return
+        except (OSError, ValueError, EOFError, TypeError):
+            request = None
+        self.selector.unregister(conn)
+        del self.pending[conn]
+        pid = None
+        if request is not None:
+            conn.setblocking(True)
+            try:
+                pid = os.fork()
+            except OSError:
+                pass
+        if pid is None:
+            conn.close()
+            for fd in fds:
+                os.close(fd)
+            return
+        if pid == 0:
+            self.run_child(conn, request, fds)
+        for fd in fds:
+            os.close(fd)
+        self.children[pid] = conn
+        self.selector.register(
+            conn, selectors.EVENT_READ, functools.partial(self.forward, pid=pid)
+        )
+
+    def forward(self, conn, pid):
+        """
+        Deliver a signal sent by a client to its child.
+
+        A client that disconnects has its child terminated.
+
+        Args:
+            conn (socket.socket): The client connection
+            pid (int): Process id of the child running the client's request
+        """
+        try:
+            data = receive_exactly(conn, MESSAGE.size)
+        except OSError:
+            data = b""
+        if len(data) < MESSAGE.size:
+            self.selector.unregister(conn)
+            signum = signal.SIGTERM
+        else:
+            (signum,) = MESSAGE.unpack(data)
+        if signum in FORWARDED_SIGNALS:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def reap(self, _):
+        """Report the exit codes of exited children to their clients."""
+        drain(self.wakeup_read)
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            conn = self.children.pop(pid)
+            if self.is_registered(conn):
+                self.selector.unregister(conn)
+            try:
+                conn.sendall(MESSAGE.pack(os.waitstatus_to_exitcode(status)))
+            except OSError:
+                pass
+            conn.close()
+
+    def is_registered(self, fileobj):
+        """
+        Tell whether a file object is registered with the selector.
+
+        Args:
+            fileobj: The file object
+
+        Returns:
+            bool: True if it is registered
+        """
+        try:
+            self.selector.get_key(fileobj)
+        except KeyError:
+            return False
+        return True
+
+    def run_child(self, conn, request, fds):
+        """
+        Run a request in the forked child, then exit the child.
+
+        Args:
+            conn (socket.socket): The client connection
+            request (dict): The decoded request
+            fds (list): The client's stdin, stdout and stderr
+        """
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.selector.close()
+        self.listener.close()
+        os.close(self.wakeup_read)
+        os.close(self.wakeup_write)
+        for child_conn in self.children.values():
+            child_conn.close()
+        for pending_conn, (_, pending_fds) in self.pending.items():
+            pending_conn.close()
+            for fd in pending_fds:
+                os.close(fd)
+        conn.close()
+
+        def setup():
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            sys.stdout.reconfigure(line_buffering=sys.stdout.isatty())
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+
+        run_and_exit(request["source_file"], self.cache, setup)
+
+    def close(self):
+        """Stop listening and remove the socket."""
+        signal.set_wakeup_fd(-1)
+        self.selector.close()
+        self.listener.close()
+        os.close(self.wakeup_read)
+        os.close(self.wakeup_write)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(socket_path=None, cache=None):
+    """
+    Preload the runtime and serve requests until interrupted.
+
+    Args:
+        socket_path (str | None): Path of the socket, or None for the default
+        cache (TranslationCache | None): Translation cache used by the runs
+
+    Side Effects:
+        - Exits with status code 1 if another server uses the socket
+    """
+    preload()
+    try:
+        server = PiyathonServer(socket_path, cache)
+    except OSError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        print(f"Piyathon server listening on '{server.socket_path}'", flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
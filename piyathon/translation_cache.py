@@ -0,0 +1,387 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon On-Disk Translation Cache Module
+
+This module provides a content-addressed cache of translated code that is shared
+by the piyathon runner and the p2p translation tool, so that unchanged sources
+are not retranslated on every invocation.
+
+Core Functionality:
+    - Stores translated code keyed by a hash of the source and the translator
+    - Invalidates entries when keyword tables, engine or version change
+    - Writes entries atomically so concurrent processes never see partial files
+    - Evicts least recently used entries once a size limit is exceeded
+
+Dependencies:
+    - hashlib: For content hashing of sources and keyword tables
+    - os: For atomic file replacement, timestamps and environment variables
+    - itertools: For unique temporary file names
+
+Data Structures:
+    - Cache entries are files holding the translated code, UTF-8 encoded
+      unless the source was translated as bytes, named by their SHA-256 key and
+      sharded into subdirectories by the first two hex digits of the key
+    - File modification times record the last use of each entry
+
+Integration Points:
+    - Used by piyathon.piyathon and piyathon.p2p through cached_translate()
+    - The cache directory is set by --cache-dir, PIYATHON_CACHE_DIR or
+      XDG_CACHE_HOME, in that order of precedence
+
+Known Limitations:
+    - The cache directory is scanned once per process to learn its size, and
+      again whenever entries have to be evicted; processes forked after
+      scan() inherit the size, but not the writes of their siblings
+    - Statistics collection bypasses the cache
+"""
+
+import hashlib
+import itertools
+import os
+from . import __version__
+
+CACHE_DIR_ENV = "PIYATHON_CACHE_DIR"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir():
+    """
+    Return the cache directory to use when none is given explicitly.
+
+    Returns:
+        str: $PIYATHON_CACHE_DIR, or $XDG_CACHE_HOME/piyathon, or
+             ~/.cache/piyathon
+
+    Example:
+        >>> default_cache_dir()
+        '/home/user/.cache/piyathon'
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg_cache_home, "piyathon")
+
+
+_temp_counter = itertools.count()
+
+
+def write_atomic(path, data):
+    """
+    Write a file so that other processes never see it partially written.
+
+    The data is written to a new temporary file in the same directory, which
+    then replaces the target. The directory is created if needed.
+
+    Args:
+        path (str): Path of the file to write
+        data (bytes): Contents of the file
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}-{next(_temp_counter)}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def table_fingerprint(translation_dict):
+    """
+    Compute a fingerprint of a keyword translation table.
+
+    Args:
+        translation_dict (dict): Dictionary mapping source to target keywords
+
+    Returns:
+        str: Hex digest that changes whenever any mapping changes
+
+    Example:
+        >>> table_fingerprint({"if": "ถ้า"}) == table_fingerprint({"if": "ถ้า"})
+        True
+    """
+    digest = hashlib.sha256()
+    for source, target in sorted(translation_dict.items()):
+        digest.update(f"{source}\0{target}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TranslationCache:
+    """
+    A content-addressed on-disk cache of translated code.
+
+    Attributes:
+        cache_dir (str): Directory holding the cache entries
+        max_bytes (int): Total entry size above which old entries are evicted
+        total_bytes (int | None): Known total entry size, None until scanned
+
+    Methods:
+        key(code, translation_dict, engine): Compute the key of a translation
+        get(key): Read a cached translation
+        put(key, translated_code): Store a translation atomically
+        scan(): Learn the total entry size
+        entries(): List all cache entries
+        clear(): Remove all cache entries
+        evict(): Remove least recently used entries over the size limit
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str | None): Cache directory, default_cache_dir() if None
+            max_bytes (int): Total entry size above which entries are evicted
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        # Total entry size, scanned on the first write and tracked afterwards
+        self.total_bytes = None
+
+    @staticmethod
+    def key(code, translation_dict, engine):
+        """
+        Compute the cache key of translating code with a keyword table.
+
+        Args:
+            code (str | bytes): The source code to translate
+            translation_dict (dict): Dictionary mapping source to target keywords
+            engine (str): Output engine of the translator, or "bytes" for
+                          encoded sources translated with translate_bytes()
+
+        Returns:
+            str: SHA-256 hex digest identifying the translation
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}\0{engine}\0".encode("utf-8"))
+        digest.update(table_fingerprint(translation_dict).encode("ascii"))
+        digest.update(code if isinstance(code, bytes) else code.encode("utf-8"))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        """
+        Return the file path of a cache entry.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the entry file
+        """
+        return os.path.join(self.cache_dir, "translations", key[:2], key)
+
+    def get(self, key):
+        """
+        Read a cached translation and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bytes | None: The cached translated code, or None on a miss
+        """
+        path = self.entry_path(key)
+        try:
+            with open(path, "rb") as file:
+                translated_code = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return translated_code
+
+    def put(self, key, translated_code):
+        """
+        Store a translation atomically and evict old entries if needed.
+
+        Failures to write are ignored, since the cache is only an optimization.
+
+        Args:
+            key (str): Cache key
+            translated_code (bytes): The translated code to store
+        """
+        try:
+            write_atomic(self.entry_path(key), translated_code)
+        except OSError:
+            return
+
+        if self.total_bytes is None:
+            self.scan()
+        else:
+            self.total_bytes += len(translated_code)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def scan(self):
+        """
+        Learn the total entry size by scanning the cache directory.
+
+        Scanning before forking workers spares each of them the scan on its
+        first write.
+
+        Returns:
+            int: Total size of the entries in bytes
+        """
+        self.total_bytes = sum(size for _, size, _ in self.entries())
+        return self.total_bytes
+
+    def entries(self):
+        """
+        List all cache entries.
+
+        Returns:
+            list: Tuples of (last_used, size, path) for every entry
+        """
+        entries = []
+        root = os.path.join(self.cache_dir, "translations")
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Remove least recently used entries until the size limit is met.
+
+        Returns:
+            int: Number of entries removed
+        """
+        entries = self.entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+        self.total_bytes = total_bytes
+        return removed
+
+    def clear(self):
+        """
+        Remove all cache entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        for _, _, path in self.entries():
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                continue
+        self.total_bytes = None
+        return removed
+
+
+def add_cache_arguments(parser):
+    """
+    Add the translation cache options to a command-line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+
+    Example:
+        >>> parser = argparse.ArgumentParser()
+        >>> add_cache_arguments(parser)
+        >>> parser.parse_args(["--no-cache"]).no_cache
+        True
+    """
+    group = parser.add_argument_group("translation cache")
+    group.add_argument(
+        "--cache-dir",
+        help=f"Translation cache directory (default: ${CACHE_DIR_ENV} "
+        "or $XDG_CACHE_HOME/piyathon)",
+    )
+    group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write cached translations",
+    )
+    group.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove all cached translations before running",
+    )
+
+
+def cache_from_arguments(args):
+    """
+    Create the translation cache selected by parsed command-line arguments.
+
+    Args:
+        args (argparse.Namespace): Arguments parsed with add_cache_arguments()
+
+    Returns:
+        TranslationCache | None: The cache to use, or None if disabled
+
+    Side Effects:
+        - Clears the cache and prints a message if --clear-cache was given
+    """
+    cache = TranslationCache(args.cache_dir)
+    if args.clear_cache:
+        removed = cache.clear()
+        print(f"Removed {removed} cached translations from '{cache.cache_dir}'.")
+    if args.no_cache:
+        return None
+    return cache
+
+
+def cached_translate(translator, code, translation_dict, cache=None, parallel=None):
+    """
+    Translate code, reusing a cached translation when one exists.
+
+    Encoded sources are translated with translate_bytes() and keep their
+    encoding; text sources are translated with translate().
+
+    Args:
+        translator (PiyathonTranslator): Translator to use on a cache miss
+        code (str | bytes): The source code to translate
+        translation_dict (dict): Dictionary mapping source to target keywords
+        cache (TranslationCache | None): Cache to use, or None to always translate
+        parallel (int | None): Number of worker processes for large sources
+
+    Returns:
+        str | bytes: The translated code, of the same type as code
+
+    Example:
+        >>> cache = TranslationCache()
+        >>> cached_translate(PiyathonTranslator(), "print(1)", PY_TO_PI, cache)
+        'พิมพ์(1)'
+    """
+    binary = isinstance(code, bytes)
+
+    def translate():
+        if binary:
+            return translator.translate_bytes(code, translation_dict, parallel)
+        return translator.translate(code, translation_dict, parallel=parallel)
+
+    if cache is None:
+        return translate()
+
+    key = cache.key(code, translation_dict, "bytes" if binary else translator.engine)
+    cached_code = cache.get(key)
+    if cached_code is not None:
+        return cached_code if binary else cached_code.decode("utf-8")
+
+    translated_code = translate()
+    cache.put(key, translated_code if binary else translated_code.encode("utf-8"))
+    return translated_code
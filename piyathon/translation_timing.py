@@ -0,0 +1,175 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Piyathon Translation Timing Module
+
+This module provides the records passed to the timing hook of PiyathonTranslator
+and an aggregator that summarizes them across a run, to find out where
+translation time goes.
+
+Core Functionality:
+    - Per-call records of phase durations, tokens read and sizes
+    - Aggregation of records into p50/p95/p99 durations per phase
+    - Human-readable timing reports
+
+Dependencies:
+    - math: For nearest-rank percentiles
+    - threading: For recording from several threads at once
+
+Data Structures:
+    - TranslationTiming: Phase durations and sizes of one translate() call
+    - TimingAggregator: Duration samples per phase across many calls
+
+Integration Points:
+    - Records are produced by PiyathonTranslator when its timing_hook is set
+    - A TimingAggregator instance can be used directly as the timing hook
+
+Known Limitations:
+    - All samples are kept in memory until the aggregator is cleared
+"""
+
+import math
+import threading
+from collections import namedtuple
+
+TranslationTiming = namedtuple(
+    "TranslationTiming", ["phases", "tokens", "bytes_in", "bytes_out"]
+)
+TranslationTiming.__doc__ = """
+Timing of one translation.
+
+Attributes:
+    phases (dict): Seconds spent in each phase, keyed by phase name:
+                   "scan" for the keyword pre-scan, "tokenize" for reading
+                   tokens, "remap" for replacing names, and "untokenize" or
+                   "splice" for building the output with the engine of the
+                   translator; counting tokens for statistics is part of the
+                   phase reading them, and phases that did not run are left
+                   out
+    tokens (int): Number of tokens read
+    bytes_in (int): Size of the source code encoded as UTF-8
+    bytes_out (int): Size of the translated code encoded as UTF-8
+"""
+
+
+def percentile(sorted_samples, percent):
+    """
+    Return a nearest-rank percentile of sorted samples.
+
+    Args:
+        sorted_samples (list): Samples in ascending order, not empty
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: The smallest sample not exceeded by percent of the samples
+
+    Example:
+        >>> percentile([1, 2, 3, 4], 50)
+        2
+    """
+    rank = max(math.ceil(percent / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+class TimingAggregator:
+    """
+    A timing hook that collects per-phase durations across many translations.
+
+    Attributes:
+        samples (dict): Duration samples in seconds, keyed by phase name, with
+                        the duration of whole calls under "total"
+        calls (int): Number of recorded translations
+        tokens (int): Total number of tokens read
+        bytes_in (int): Total size of the translated sources
+        bytes_out (int): Total size of the translated outputs
+
+    Methods:
+        percentiles(percents): Compute duration percentiles per phase
+        format_report(): Format the percentiles as a table
+        clear(): Forget all recorded translations
+
+    Example:
+        >>> aggregator = TimingAggregator()
+        >>> translator = PiyathonTranslator(timing_hook=aggregator)
+        >>> translator.python_to_piyathon("print(1)")
+        'พิมพ์(1)'
+        >>> aggregator.calls
+        1
+    """
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.calls = 0
+        self.tokens = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __call__(self, timing):
+        """
+        Record the timing of one translation.
+
+        Args:
+            timing (TranslationTiming): The timing to record
+        """
+        with self.lock:
+            for phase, seconds in timing.phases.items():
+                self.samples.setdefault(phase, []).append(seconds)
+            self.samples.setdefault("total", []).append(sum(timing.phases.values()))
+            self.calls += 1
+            self.tokens += timing.tokens
+            self.bytes_in += timing.bytes_in
+            self.bytes_out += timing.bytes_out
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        Compute duration percentiles per phase.
+
+        Args:
+            percents (tuple): Percentiles to compute
+
+        Returns:
+            dict: For each phase, a dict mapping "p<percent>" to seconds
+
+        Example:
+            >>> aggregator.percentiles()["tokenize"]
+            {'p50': 0.00012, 'p95': 0.00031, 'p99': 0.00044}
+        """
+        with self.lock:
+            samples = {phase: sorted(values) for phase, values in self.samples.items()}
+        return {
+            phase: {
+                f"p{percent:g}": percentile(values, percent) for percent in percents
+            }
+            for phase, values in samples.items()
+        }
+
+    def format_report(self):
+        """
+        Format the duration percentiles of every phase as a table.
+
+        Returns:
+            str: One line per phase with p50, p95 and p99 in milliseconds
+        """
+        lines = [
+            f"{self.calls:,} translations, {self.tokens:,} tokens, "
+            f"{self.bytes_in:,} bytes in, {self.bytes_out:,} bytes out",
+            f"{'phase':<10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}",
+        ]
+        for phase, values in self.percentiles().items():
+            lines.append(
+                f"{phase:<10} "
+                + " ".join(f"{seconds * 1000:>10.3f}" for seconds in values.values())
+            )
+        return "\n".join(lines)
+
+    def clear(self):
+        """Forget all recorded translations."""
+        with self.lock:
+            self.samples = {}
+            self.calls = 0
+            self.tokens = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
@@ -79,6 +79,22 @@ def test_logger():
     return logger
 
 
+@pytest.fixture(autouse=True)
+def isolated_translation_cache(tmp_path, monkeypatch):
+    """
+    Pytest fixture that points the translation cache at a temporary directory.
+
+    This keeps tests that run the command-line tools from reading or writing
+    the user's real translation cache.
+
+    Returns:
+        pathlib.Path: The temporary cache directory used by the test
+    """
+    cache_dir = tmp_path / "piyathon-cache"
+    monkeypatch.setenv("PIYATHON_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_statistics_collection():
     """
@@ -1,2 +1,61 @@
 # Copyright (c) 2024 Piyawish Piyawat
 # Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Turtle Graphics Module (เต่า)
+
+This module contains unit tests for the lazy bindings of the turtle module.
+
+Test Coverage:
+    - Importing the module without importing turtle or tkinter
+    - Resolving Thai classes, Thai aliases and English names on access
+
+Dependencies:
+    - pytest: For test framework
+    - subprocess: For importing the module in a fresh interpreter
+"""
+
+import subprocess
+import sys
+import pytest
+
+
+def test_import_is_lazy():
+    """
+    Test that importing the module imports neither turtle nor tkinter.
+
+    Assertions:
+        - Only the wrapper module is imported
+    """
+    code = (
+        "import sys; import piyathon.Lib.เต่า; "
+        "print([name for name in ('turtle', 'tkinter') if name in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, encoding="utf-8"
+    )
+    assert result.stdout == "[]\n"
+
+
+def test_names_resolved_on_access():
+    """
+    Test that names are bound to turtle on first access.
+
+    Assertions:
+        - Thai classes are subclasses of the turtle classes, defined once
+        - Thai aliases and English names are the turtle attributes
+        - Thai names are listed by dir() and unknown names raise AttributeError
+    """
+    turtle = pytest.importorskip("turtle")
+    from piyathon.Lib import เต่า  # pylint: disable=import-outside-toplevel
+
+    vector = เต่า.เวคเตอร์สองมิติ(3, 4)
+    assert isinstance(vector, turtle.Vec2D)
+    assert abs(vector) == 5
+    assert เต่า.เวคเตอร์สองมิติ is type(vector)
+    assert เต่า.กำลังเติม is turtle.filling
+    assert เต่า.Vec2D is turtle.Vec2D
+    assert "เดินหน้า" in dir(เต่า)
+    assert "Vec2D" in เต่า.__all__
+    with pytest.raises(AttributeError):
+        _ = เต่า.ไม่มีชื่อนี้
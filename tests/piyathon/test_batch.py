@@ -0,0 +1,145 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Batch Runner Module
+
+This module contains unit tests for running many programs with
+`piyathon batch`.
+
+Test Coverage:
+    - Collecting programs from directories and manifests
+    - Results, stdin fixtures and output limits of runs
+    - Runaway programs stopped by the wall time and CPU time limits
+    - Keeping the translation cache within its size limit
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running the batch runner in a separate process
+    - piyathon.batch: For the batch runner implementation
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+import piyathon
+from piyathon.batch import BatchRunner, collect_runs
+from piyathon.translation_cache import TranslationCache
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="the batch runner needs fork()"
+)
+
+
+def write(path, text):
+    """Write a UTF-8 file, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_collect_runs(tmp_path):
+    """
+    Test collecting programs and stdin fixtures.
+
+    Args:
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - Directories are searched recursively in sorted order
+        - Manifest entries are relative to the manifest and may name a fixture
+    """
+    write(tmp_path / "b" / "main.pi", "")
+    write(tmp_path / "a" / "main.pi", "")
+    write(tmp_path / "a" / "notes.txt", "")
+    write(tmp_path / "manifest.txt", "# comment\na/main.pi\tinput.txt\n\nb/main.pi\n")
+
+    assert collect_runs([str(tmp_path / "a"), str(tmp_path / "b")], "in") == [
+        (str(tmp_path / "a" / "main.pi"), "in"),
+        (str(tmp_path / "b" / "main.pi"), "in"),
+    ]
+    assert collect_runs([str(tmp_path / "manifest.txt")]) == [
+        (str(tmp_path / "a" / "main.pi"), str(tmp_path / "input.txt")),
+        (str(tmp_path / "b" / "main.pi"), None),
+    ]
+
+
+def test_batch_results(tmp_path):
+    """
+    Test the results of a batch with well-behaved and runaway programs.
+
+    Args:
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - Every program gets one result line, in a single batch run
+        - Programs read the stdin fixture and their output is captured
+        - Output beyond the limit is dropped and marked as truncated
+        - Errors, wall time and CPU time overruns are told apart
+    """
+    programs = tmp_path / "programs"
+    write(programs / "echo.pi", 'พิมพ์("ได้", input())\n')
+    write(programs / "error.pi", "1 / 0\n")
+    write(programs / "loop.pi", "ขณะ จริง:\n    ผ่าน\n")
+    write(programs / "output.pi", 'พิมพ์("ก" * 1000)\n')
+    write(programs / "sleep.pi", "นำเข้า time\ntime.sleep(60)\n")
+    write(tmp_path / "input.txt", "ข้อมูล\n")
+
+    result = subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "batch", str(programs)]
+        + ["--stdin", str(tmp_path / "input.txt"), "--max-output", "30"]
+        + ["--cpu-time", "1", "--wall-time", "2", "-j", "5", "--no-cache"],
+        capture_output=True,
+        encoding="utf-8",
+        env=dict(
+            os.environ,
+            PYTHONPATH=os.path.dirname(os.path.dirname(piyathon.__file__)),
+        ),
+        check=True,
+        timeout=60,
+    )
+    results = {
+        os.path.basename(line["file"]): line
+        for line in map(json.loads, result.stdout.splitlines())
+    }
+
+    assert len(results) == 5
+    assert results["echo.pi"]["status"] == "ok"
+    assert results["echo.pi"]["stdout"] == "ได้ ข้อมูล\n"
+    assert results["error.pi"]["status"] == "error"
+    assert results["error.pi"]["exit_code"] == 1
+    assert results["output.pi"]["truncated"]
+    assert results["output.pi"]["stdout"].startswith("ก" * 10)
+    assert results["loop.pi"]["status"] == "cpu_time_exceeded"
+    assert results["sleep.pi"]["status"] == "wall_time_exceeded"
+    assert "5 runs" in result.stderr
+
+
+def test_batch_cache_size(tmp_path):
+    """
+    Test that the translation cache is trimmed after the runs.
+
+    Args:
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - Every run stores its translation
+        - The runs that wrote past the size limit are trimmed by the runner
+    """
+    runs = []
+    for number in range(4):
+        write(tmp_path / f"{number}.pi", f"ค่า = {number}\n" * 20)
+        runs.append((str(tmp_path / f"{number}.pi"), None))
+    cache = TranslationCache(str(tmp_path / "cache"), max_bytes=10**6)
+    results = []
+    BatchRunner(jobs=2, cache=cache).run(runs, results.append)
+    assert [result["status"] for result in results] == ["ok"] * 4
+    assert len(cache.entries()) == 4
+
+    size = cache.total_bytes // 4
+    cache.clear()
+    cache = TranslationCache(cache.cache_dir, max_bytes=2 * size)
+    BatchRunner(jobs=2, cache=cache).run(runs, results.append)
+    assert len(cache.entries()) == 2
+    assert cache.total_bytes == 2 * size
@@ -0,0 +1,129 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Code Object Cache Module
+
+This module contains unit tests for the cache of compiled code objects used by
+the piyathon runner.
+
+Test Coverage:
+    - Cache hits skipping translation and compilation
+    - Invalidation when the source or the keyword table changes
+    - Disabling the cache from the command line
+    - File names of cached code run from different working directories
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - unittest.mock: For detecting translations
+    - piyathon.code_cache: For the cache implementation
+"""
+
+import os
+import sys
+from unittest.mock import patch
+import pytest
+from piyathon import code_cache
+from piyathon.piyathon import main
+from piyathon.translation_cache import cached_translate
+
+
+@pytest.fixture(name="script")
+def fixture_script(tmp_path, monkeypatch):
+    """Create a .pi script and allow writing bytecode caches."""
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    script = tmp_path / "สคริปต์.pi"
+    script.write_text('พิมพ์("หนึ่ง")\n', encoding="utf-8")
+    return script
+
+
+def run(script, *options):
+    """Run a script with the piyathon runner, reporting whether it translated."""
+    with patch.object(sys, "argv", ["piyathon.py", *options, str(script)]):
+        with patch(
+            "piyathon.piyathon.cached_translate", wraps=cached_translate
+        ) as mocked_translate:
+            main()
+    return mocked_translate.called
+
+
+def test_cache_hit_skips_translation(script, capsys):
+    """
+    Test that an unchanged script runs from its cached code object.
+
+    Args:
+        script: A .pi script fixture
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - The first run translates and writes a cache file in __pycache__
+        - The second run does not translate and prints the same output
+    """
+    assert run(script)
+    path = code_cache.cache_path(str(script))
+    assert os.path.dirname(path) == str(script.parent / "__pycache__")
+    assert os.path.exists(path)
+
+    assert not run(script)
+    assert capsys.readouterr().out == "หนึ่ง\nหนึ่ง\n"
+
+
+def test_cache_invalidation(script, capsys):
+    """
+    Test that cached code objects are not used once they are stale.
+
+    Args:
+        script: A .pi script fixture
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - A changed source is translated again
+        - A changed keyword table fingerprint invalidates the cache
+        - --no-cache neither reads nor writes cached code objects
+    """
+    run(script)
+    script.write_text('พิมพ์("สองสอง")\n', encoding="utf-8")
+    assert run(script)
+
+    source_stat = os.stat(script)
+    fingerprint = code_cache.translator_fingerprint()
+    assert code_cache.load_code(str(script), source_stat, fingerprint) is not None
+    assert code_cache.load_code(str(script), source_stat, bytes(32)) is None
+
+    os.unlink(code_cache.cache_path(str(script)))
+    assert run(script, "--no-cache")
+    assert not os.path.exists(code_cache.cache_path(str(script)))
+    assert capsys.readouterr().out == "หนึ่ง\nสองสอง\nสองสอง\n"
+
+
+def test_cached_code_file_name(script, monkeypatch, capsys):
+    """
+    Test that cached code names its source by absolute path, wherever it runs.
+
+    Args:
+        script: A .pi script fixture
+        monkeypatch: pytest fixture used to change the working directory
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - A run from the script's directory names it by absolute path
+        - A run from another directory loads the cached code under the same
+          absolute path, also in nested code objects
+        - Cached code takes the path it is loaded from
+    """
+    script.write_text(
+        "นิยาม ชื่อ():\n    คืนค่า ชื่อ.__code__.co_filename\nพิมพ์(ชื่อ())\n",
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(script.parent)
+    assert run(script.name)
+    (script.parent / "sub").mkdir()
+    monkeypatch.chdir(script.parent / "sub")
+    assert not run(os.path.join("..", script.name))
+    assert capsys.readouterr().out == f"{script}\n{script}\n"
+
+    source_stat = os.stat(script)
+    fingerprint = code_cache.translator_fingerprint()
+    other_path = os.path.join("..", script.name)
+    code = code_cache.load_code(other_path, source_stat, fingerprint)
+    assert code.co_filename == other_path
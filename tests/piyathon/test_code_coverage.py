@@ -0,0 +1,213 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Code Coverage Module
+
+This module contains unit tests for `piyathon --coverage` and
+`piyathon coverage`.
+
+Test Coverage:
+    - Statements, executed lines and branches of code run from .pi files
+    - Measuring lines only, and releasing the monitoring tool
+    - Merging the data of several runs into one data file
+    - Summaries and annotated listings
+    - Merging concurrent runs and reporting from the command line
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+"""
+
+import json
+import os
+import subprocess
+import sys
+from piyathon.code_coverage import (
+    TOOL_ID,
+    CoverageRecorder,
+    format_annotated,
+    format_summary,
+    merge,
+    save,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+SOURCE = """\
+def grade(score):
+    if score >= 80:
+        return "A"
+    elif score >= 50:
+        return "B"
+    else:
+        return "F"
+
+def unused():
+    return 1
+
+for score in [90, 60]:
+    grade(score)
+"""
+
+
+LOOP_SOURCE = """\
+for score in [1, 2]:
+    if score > 5:
+        print(score)
+print("done")
+"""
+
+
+def record(tmp_path, branch, source=SOURCE):
+    """Run source as a .pi file and return its path and coverage data."""
+    source_file = str(tmp_path / "grades.pi")
+    with open(source_file, "w", encoding="utf-8") as file:
+        file.write(source)
+    recorder = CoverageRecorder(str(tmp_path / "data.cov"), branch=branch)
+    recorder.start()
+    try:
+        exec(compile(source, source_file, "exec"), {})  # pylint: disable=exec-used
+    finally:
+        recorder.stop()
+    return source_file, recorder
+
+
+def test_branch_coverage(tmp_path):
+    """
+    Test that lines and branches between lines are recorded.
+
+    Assertions:
+        - Statements include the lines of functions that never ran
+        - Lines that did not run are missing from the executed lines
+        - Both ways of the first condition were taken, one way of the second
+        - A condition at the end of a loop body branches back to the loop,
+          and is partially taken if its body never runs
+    """
+    source_file, recorder = record(tmp_path, branch=True)
+    data = recorder.files[source_file]
+    assert data["statements"] == [1, 2, 3, 4, 5, 7, 9, 10, 12, 13]
+    assert data["executed"] == [1, 2, 3, 4, 5, 9, 12, 13]
+    assert data["branches"] == {"2": [3, 4], "4": [5, 7]}
+    assert data["taken"] == {"2": [3, 4], "4": [5]}
+
+    source_file, recorder = record(tmp_path, branch=True, source=LOOP_SOURCE)
+    data = recorder.files[source_file]
+    assert data["branches"] == {"1": [2, 4], "2": [1, 3]}
+    assert data["taken"] == {"1": [2, 4], "2": [1]}
+
+
+def test_line_coverage(tmp_path):
+    """
+    Test that only lines are recorded without branch coverage.
+
+    Assertions:
+        - The executed lines are the same as with branches
+        - No branch is recorded
+        - The monitoring tool is released when recording stops
+    """
+    source_file, recorder = record(tmp_path, branch=False)
+    data = recorder.files[source_file]
+    assert data["executed"] == [1, 2, 3, 4, 5, 9, 12, 13]
+    assert data["branches"] == {} and data["taken"] == {}
+    assert sys.monitoring.get_tool(TOOL_ID) is None
+
+
+def test_merge(tmp_path):
+    """
+    Test that runs are merged into the data file.
+
+    Assertions:
+        - Lines and branches of runs of the same file are combined
+        - The data of a changed file are replaced by the new run's
+    """
+    source_file, recorder = record(tmp_path, branch=True)
+    data = recorder.files[source_file]
+    other = dict(data, executed=[7], taken={"4": [7]})
+    save(recorder.output, {source_file: data})
+    merged = save(recorder.output, {source_file: other})["files"][source_file]
+    assert merged["executed"] == [1, 2, 3, 4, 5, 7, 9, 12, 13]
+    assert merged["taken"]["4"] == [5, 7]
+    with open(recorder.output, encoding="utf-8") as file:
+        assert json.load(file)["files"][source_file] == merged
+
+    changed = dict(other, fingerprint=[0, 0])
+    assert merge({"files": {source_file: data}}, {source_file: changed}) == {
+        "files": {source_file: changed}
+    }
+
+
+def test_reports(tmp_path, monkeypatch):
+    """
+    Test the summary and the annotated listing.
+
+    Assertions:
+        - The summary counts statements and branches, and lists the missing
+          lines and the branches not taken
+        - Lines are marked as run, not run or partially run
+    """
+    source_file, recorder = record(tmp_path, branch=True)
+    monkeypatch.chdir(tmp_path)
+    summary = format_summary({"files": recorder.files}).splitlines()
+    assert summary[2].split(None, 6) == [
+        "grades.pi",
+        "10",
+        "2",
+        "4",
+        "1",
+        "1",
+        "78.6%   7, 10, 4->7",
+    ]
+    assert summary[-1].split() == ["TOTAL", "10", "2", "4", "1", "1", "78.6%"]
+
+    listing = format_annotated(source_file, recorder.files[source_file])
+    lines = listing.splitlines()
+    assert lines[0] == "File: grades.pi"
+    assert lines[4] == "     4 ~     elif score >= 50:  # never went to line 7"
+    assert lines[7] == '     7 !         return "F"'
+    assert lines[8] == "     8   "
+
+
+def test_coverage_command_line(tmp_path):
+    """
+    Test concurrent `piyathon` runs measured through PIYATHON_COVERAGE.
+
+    Assertions:
+        - Concurrent runs merge into one data file without printing
+        - `piyathon coverage` prints the summary of every file
+        - --fail-under fails if the coverage is too low
+    """
+    for name in ("a", "b", "c", "d"):
+        (tmp_path / f"{name}.pi").write_text(
+            f"ค่า = 1\nถ้า ค่า > 1:\n    พิมพ์('ไม่')\nพิมพ์('{name}')\n",
+            encoding="utf-8",
+        )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PIYATHON_COVERAGE="data.cov")
+    processes = [
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-m", "piyathon.piyathon", f"{name}.pi"],
+            cwd=tmp_path,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        for name in ("a", "b", "c", "d")
+    ]
+    for process in processes:
+        stdout, stderr = process.communicate()
+        assert process.returncode == 0
+        assert stderr == b"" and len(stdout.splitlines()) == 1
+
+    result = subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "coverage", "--fail-under=90"],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        check=False,
+        encoding="utf-8",
+    )
+    assert result.returncode == 2
+    lines = result.stdout.splitlines()
+    assert [line.split()[0] for line in lines[2:6]] == ["a.pi", "b.pi", "c.pi", "d.pi"]
+    assert lines[7].split()[:3] == ["TOTAL", "16", "4"]
+    assert lines[-1] == "Coverage 75.0% is below 90%"
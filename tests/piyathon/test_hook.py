@@ -0,0 +1,137 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Import Hook Module
+
+This module contains unit tests for importing .pi modules and packages from
+plain Python through the Piyathon import hook.
+
+Test Coverage:
+    - Importing .pi modules and packages with relative imports
+    - Reusing cached bytecode on later imports
+    - Precedence of .py modules over .pi modules in the same directory
+    - Keeping the sys.path order with entries of other path hooks, such as
+      zip files
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - importlib: For clearing finder caches between imports
+    - piyathon.hook: For the import hook implementation
+"""
+
+import importlib
+import sys
+import zipfile
+from unittest.mock import patch
+import pytest
+from piyathon import hook
+from piyathon.code_cache import cache_path
+from piyathon.piyathon_translator import PiyathonTranslator
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path, monkeypatch):
+    """Put a directory on sys.path and forget the modules imported from it."""
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    modules = set(sys.modules)
+    yield tmp_path
+    for name in set(sys.modules) - modules:
+        del sys.modules[name]
+    importlib.invalidate_caches()
+
+
+def test_import_package(project):
+    """
+    Test importing a Piyathon package made of .pi modules.
+
+    Args:
+        project: A directory on sys.path
+
+    Assertions:
+        - The path hook is installed before the regular directory hook
+        - The package and its submodule are imported through relative imports
+        - Module attributes point at the .pi source and its cache file
+    """
+    package = project / "แพ็ก"
+    package.mkdir()
+    (package / "__init__.pi").write_text(
+        "จาก .ย่อย นำเข้า ทักทาย\nค่า = ทักทาย(1)\n", encoding="utf-8"
+    )
+    (package / "ย่อย.pi").write_text(
+        "นิยาม ทักทาย(x):\n    คืนค่า x + 1\n", encoding="utf-8"
+    )
+
+    assert sys.path_hooks.index(hook.install()) < len(sys.path_hooks) - 1
+    module = importlib.import_module("แพ็ก")
+
+    assert module.ค่า == 2
+    assert module.__file__ == str(package / "__init__.pi")
+    assert module.__cached__ == cache_path(str(package / "__init__.pi"))
+    assert sys.modules["แพ็ก.ย่อย"].ทักทาย(2) == 3
+
+
+def test_bytecode_cache(project):
+    """
+    Test that imported .pi modules are translated only once.
+
+    Args:
+        project: A directory on sys.path
+
+    Assertions:
+        - The first import writes a cache file
+        - Importing again in a fresh interpreter state skips translation
+    """
+    (project / "โมดูล.pi").write_text("ค่า = จริง\n", encoding="utf-8")
+    importlib.import_module("โมดูล")
+    assert (project / "__pycache__").is_dir()
+
+    del sys.modules["โมดูล"]
+    with patch.object(
+        PiyathonTranslator, "translate_bytes", side_effect=AssertionError
+    ):
+        assert importlib.import_module("โมดูล").ค่า is True
+
+
+def test_python_module_precedence(project):
+    """
+    Test that a .py module wins over a .pi module of the same name.
+
+    Args:
+        project: A directory on sys.path
+
+    Assertions:
+        - The .py module is imported and keeps its regular cache file
+    """
+    (project / "ชื่อซ้ำ.pi").write_text("ค่า = 1\n", encoding="utf-8")
+    (project / "ชื่อซ้ำ.py").write_text("ค่า = 2\n", encoding="utf-8")
+
+    module = importlib.import_module("ชื่อซ้ำ")
+
+    assert module.ค่า == 2
+    assert module.__file__.endswith(".py")
+
+
+def test_zip_path_order(project, monkeypatch):
+    """
+    Test that a zip file on sys.path keeps its place before a directory.
+
+    Args:
+        project: A directory on sys.path
+        monkeypatch: pytest fixture used to put the zip file first
+
+    Assertions:
+        - A module in the zip file wins over one in a later directory
+        - .pi modules are still found in the directory
+    """
+    archive = project / "z.zip"
+    with zipfile.ZipFile(archive, "w") as file:
+        file.writestr("ลำดับ.py", "ค่า = 'zip'\n")
+    (project / "ลำดับ.py").write_text("ค่า = 'dir'\n", encoding="utf-8")
+    (project / "อื่น.pi").write_text("ค่า = 'pi'\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(archive))
+    hook.install()
+
+    assert importlib.import_module("ลำดับ").ค่า == "zip"
+    assert importlib.import_module("อื่น").ค่า == "pi"
@@ -0,0 +1,133 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Incremental Translation Module
+
+This module contains unit tests for the incremental translator used to keep the
+translation of an edited buffer up to date.
+
+Test Coverage:
+    - Agreement with full translation after edits
+    - Reported output ranges
+    - Edits inside multi-line strings
+    - Incomplete code while typing
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - piyathon.incremental: For the incremental translator
+"""
+
+import pytest
+from piyathon.incremental import IncrementalTranslator
+from piyathon.keywords import PI_TO_PY
+from piyathon.piyathon_translator import PiyathonTranslator
+
+SOURCE = """\
+นิยาม หลัก():
+    ถ้า จริง:
+        พิมพ์("สวัสดี")  # ทักทาย
+    คืนค่า [
+        ไม่มีค่า,
+        เท็จ,
+    ]
+
+หลัก()
+"""
+
+
+def full_translation(code):
+    """Translate code from scratch with the splice engine."""
+    return PiyathonTranslator(engine="splice").translate(code, PI_TO_PY)
+
+
+def test_edits_match_full_translation():
+    """
+    Test that the output stays equal to a full translation after edits.
+
+    Assertions:
+        - The initial output matches a full translation
+        - Each insertion, deletion and replacement keeps the output in sync
+        - Only the edited logical line is reported as changed
+    """
+    translator = IncrementalTranslator(PI_TO_PY, SOURCE)
+    assert translator.output == full_translation(SOURCE)
+
+    offset = SOURCE.index("จริง")
+    result = translator.edit(offset, offset + len("จริง"), "เท็จ")
+    assert result.output == full_translation(translator.source)
+    assert result.output[result.start : result.new_end] == "    if False:\n"
+
+    offset = translator.source.index("หลัก()\n", 10)
+    result = translator.edit(offset, offset, "ลบ x\n")
+    assert result.output == full_translation(translator.source)
+    assert result.output[result.start : result.new_end] == "\ndel x\nหลัก()\n"
+
+    result = translator.edit(0, translator.source.index("\n") + 1, "")
+    assert result.output == full_translation(translator.source)
+
+
+def test_output_range_replaces_old_output():
+    """
+    Test that the reported range turns the old output into the new one.
+
+    Assertions:
+        - Replacing old_output[start:old_end] with output[start:new_end]
+          gives the new output
+    """
+    translator = IncrementalTranslator(PI_TO_PY, SOURCE)
+    old_output = translator.output
+    offset = SOURCE.index("ไม่มีค่า")
+    result = translator.edit(offset, offset + len("ไม่มีค่า"), "จริง")
+    assert (
+        old_output[: result.start]
+        + result.output[result.start : result.new_end]
+        + old_output[result.old_end :]
+        == result.output
+    )
+
+
+def test_edit_opening_multiline_string():
+    """
+    Test edits that open and close a multi-line string.
+
+    Assertions:
+        - Keywords inside an unterminated string are still translated per line
+        - Closing the string stops translating the keywords inside it
+    """
+    translator = IncrementalTranslator(PI_TO_PY, SOURCE)
+    translator.edit(0, 0, 'x = """\n')
+    assert translator.output.startswith('x = """\ndef หลัก():\n')
+
+    offset = translator.source.index("หลัก()\n", 20)
+    result = translator.edit(offset, offset, '"""\n')
+    assert result.output == full_translation(translator.source)
+    assert "นิยาม หลัก():" in result.output
+
+
+def test_incomplete_code():
+    """
+    Test typing code that cannot be tokenized yet.
+
+    Assertions:
+        - An unclosed bracket does not stop the following lines from being
+          translated
+        - Closing the bracket matches a full translation again
+    """
+    translator = IncrementalTranslator(PI_TO_PY, "ค่า = (\nพิมพ์(1)\n")
+    assert translator.output == "ค่า = (\nprint(1)\n"
+
+    translator.edit(translator.source.index("\n"), translator.source.index("\n"), ")")
+    assert translator.output == full_translation(translator.source)
+
+
+def test_invalid_range():
+    """
+    Test that edits outside the source are rejected.
+
+    Assertions:
+        - A range past the end of the source raises ValueError
+    """
+    translator = IncrementalTranslator(PI_TO_PY, "x\n")
+    with pytest.raises(ValueError):
+        translator.edit(0, 5, "")
@@ -0,0 +1,67 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Package Initialization Module
+
+This module contains unit tests for the package attributes of piyathon,
+in particular the lazy loading of the Lib wrapper modules.
+
+Test Coverage:
+    - Importing the package without importing any wrapper module
+    - Importing wrapper modules on first attribute access
+    - Listing wrapper modules in dir()
+
+Dependencies:
+    - pytest: For test framework
+    - subprocess: For importing the package in a fresh interpreter
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+import piyathon
+
+
+def test_import_is_lazy():
+    """
+    Test that importing the package imports no wrapper module.
+
+    Assertions:
+        - Neither the wrapper modules nor the modules they wrap are imported,
+          even when the current directory is not the package directory
+    """
+    code = (
+        "import sys, piyathon; "
+        "print(sorted(name for name in sys.modules "
+        "if name.startswith('piyathon.') or name in ('random', 'turtle')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(piyathon.__file__)),
+        encoding="utf-8",
+    )
+    assert result.stdout == "[]\n"
+
+
+def test_wrapper_attributes():
+    """
+    Test accessing the wrapper modules as package attributes.
+
+    Assertions:
+        - The wrapper modules are listed by dir() and lib_modules()
+        - Accessing one imports piyathon.Lib.<name>
+        - Unknown names raise AttributeError
+    """
+    assert "สุ่ม" in piyathon.lib_modules()
+    assert "เต่า" in dir(piyathon)
+
+    module = piyathon.สุ่ม
+
+    assert module is sys.modules["piyathon.Lib.สุ่ม"]
+    assert module.สุ่มจำนวนเต็ม(1, 1) == 1
+    with pytest.raises(AttributeError):
+        _ = piyathon.ไม่มีโมดูลนี้
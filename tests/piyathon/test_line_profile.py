@@ -0,0 +1,166 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Line Profiling Module
+
+This module contains unit tests for `piyathon --line-profile`.
+
+Test Coverage:
+    - Hit counts and times of lines run in loops, recursion, generators and
+      exceptions
+    - Lines run by several threads
+    - Releasing the monitoring tool when profiling stops
+    - Annotated listings printed by the command line
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+"""
+
+import io
+import os
+import subprocess
+import sys
+import threading
+from piyathon.line_profile import TOOL_ID, LineProfiler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+SOURCE = """\
+def square_sum(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+def fact(n):
+    if n <= 1:
+        return 1
+    return n * fact(n - 1)
+
+def broken():
+    raise ValueError
+
+square_sum(10)
+fact(5)
+try:
+    broken()
+except ValueError:
+    pass
+values = list(i for i in range(3))
+"""
+
+
+def test_line_profiler(tmp_path):
+    """
+    Test that lines of .pi code are counted and timed.
+
+    Assertions:
+        - Hit counts match the number of times each line ran
+        - A recursive call is timed once, within the line calling it
+        - Every frame is popped, including those left by an exception
+        - The monitoring tool and its events are released on stop
+    """
+    source_file = str(tmp_path / "work.pi")
+    with open(source_file, "w", encoding="utf-8") as file:
+        file.write(SOURCE)
+    code = compile(SOURCE, source_file, "exec")
+    profiler = LineProfiler()
+    profiler.start()
+    exec(code, {})  # pylint: disable=exec-used
+    profiler.stop()
+
+    stats = profiler.line_stats()[source_file]
+    hits = {line: line_hits for line, (line_hits, _) in stats.items()}
+    assert (hits[3], hits[4], hits[5]) == (11, 10, 1)
+    assert (hits[8], hits[9], hits[10]) == (5, 1, 4)
+    assert (hits[13], hits[19], hits[20]) == (1, 1, 1)
+    assert stats[10][1] <= stats[16][1]
+    assert all(
+        running == 0
+        for file_stats in profiler.files.values()
+        for _, _, running in file_stats.values()
+    )
+    assert sys.monitoring.get_tool(TOOL_ID) is None
+    assert all(sys.monitoring.get_local_events(TOOL_ID, c) == 0 for c in profiler.codes)
+
+    output = io.StringIO()
+    profiler.report(output)
+    listing = output.getvalue().splitlines()
+    assert f"File: {source_file}" in listing
+    assert listing[-1].split()[0] == "21"
+    assert listing[-1].endswith("  values = list(i for i in range(3))")
+
+
+def test_line_profiler_threads(tmp_path):
+    """
+    Test that lines run by several threads are counted on their own stacks.
+
+    Assertions:
+        - Lines of the main thread and of other threads are all counted
+        - Threads have their own stacks, and every frame on them is popped
+    """
+    source_file = str(tmp_path / "threads.pi")
+    namespace = {}
+    exec(compile(SOURCE, source_file, "exec"), namespace)  # pylint: disable=exec-used
+    profiler = LineProfiler()
+    profiler.start()
+    threads = [
+        threading.Thread(target=namespace["square_sum"], args=(10,)) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    namespace["square_sum"](10)
+    for thread in threads:
+        thread.join()
+    profiler.stop()
+
+    hits = {
+        line: line_hits
+        for line, (line_hits, _) in profiler.line_stats()[source_file].items()
+    }
+    assert (hits[2], hits[3], hits[4], hits[5]) == (4, 44, 40, 4)
+    assert len(profiler.stacks) > 1
+    assert all(not stack for stack in profiler.stacks.values())
+
+
+def test_line_profile_command_line(tmp_path):
+    """
+    Test `piyathon --line-profile`.
+
+    Assertions:
+        - The script output is unchanged
+        - The listing shows the lines of the .pi file as written
+        - --line-profile cannot be combined with --profile
+    """
+    (tmp_path / "loop.pi").write_text(
+        "สำหรับ i ใน range(3):\n    พิมพ์(i)\n", encoding="utf-8"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    command = [sys.executable, "-m", "piyathon.piyathon", "--line-profile", "loop.pi"]
+    result = subprocess.run(
+        command,
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    assert result.stdout == "0\n1\n2\n"
+    assert f"File: {tmp_path / 'loop.pi'}" in result.stderr
+    assert any(
+        line.split()[:2] == ["2", "3"] and line.endswith("    พิมพ์(i)")
+        for line in result.stderr.splitlines()
+    )
+
+    result = subprocess.run(
+        command + ["--profile"],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        check=False,
+        encoding="utf-8",
+    )
+    assert result.returncode == 2
+    assert "not allowed with argument" in result.stderr
@@ -0,0 +1,165 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Memory Profiling Module
+
+This module contains unit tests for `piyathon --memprofile`.
+
+Test Coverage:
+    - Formatting sizes
+    - Attributing allocations to lines of .pi code
+    - Leaving the memory held from translation out of the user code peak
+    - Reporting the growth of sites since a SIGUSR1 report
+    - Reporting from the command line
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import pytest
+from piyathon.memory_profile import MemoryProfiler, format_size
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+SOURCE = """\
+import json
+
+def allocate(n):
+    return [str(i) * 10 for i in range(n)]
+
+data = allocate(20000)
+parsed = json.loads(json.dumps(data))
+"""
+
+
+def run(tmp_path, profiler):
+    """Compile SOURCE as a .pi file and run it under the profiler."""
+    source_file = str(tmp_path / "data.pi")
+    with open(source_file, "w", encoding="utf-8") as file:
+        file.write(SOURCE)
+    code = compile(SOURCE, source_file, "exec")
+    namespace = {}
+    profiler.start()
+    try:
+        exec(code, namespace)  # pylint: disable=exec-used
+    finally:
+        profiler.stop()
+    return source_file, namespace
+
+
+def test_format_size():
+    """
+    Test that sizes are formatted with binary units.
+
+    Assertions:
+        - Bytes are shown as whole numbers
+        - Larger sizes, including negative ones, are shown with one decimal
+    """
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KiB"
+    assert format_size(-3 * 1024**2) == "-3.0 MiB"
+    assert format_size(5 * 1024**4) == "5120.0 GiB"
+
+
+def test_memory_profiler(tmp_path):
+    """
+    Test that allocations are attributed to the .pi lines making them.
+
+    Assertions:
+        - The list comprehension and the JSON parsing are the top sites
+        - Allocations made by library code count for the .pi line calling it
+        - The report shows the translation, the peak and the source lines
+    """
+    profiler = MemoryProfiler()
+    source_file, _ = run(tmp_path, profiler)
+    report = profiler.format_report()
+
+    lines = report.splitlines()
+    assert lines[0] == "Memory profile"
+    assert lines[1].startswith("Reading and translating: ")
+    assert lines[2].startswith("User code: ")
+    sites = lines[lines.index("Top allocation sites in .pi code:") + 1 :][:2]
+    assert sorted(site.split("  ")[-2] for site in sites) == [
+        f"{source_file}:4",
+        f"{source_file}:7",
+    ]
+    assert "parsed = json.loads(json.dumps(data))" in report
+    assert lines[-1].startswith("Outside .pi code: ")
+
+
+def test_user_peak(tmp_path):
+    """
+    Test that memory allocated before the user code is not counted in its peak.
+
+    Assertions:
+        - The process peak includes memory allocated before start()
+        - The user code peak does not
+    """
+    profiler = MemoryProfiler()
+    translation = bytearray(32 * 1024**2)
+    run(tmp_path, profiler)
+    assert profiler.peak > len(translation)
+    assert 0 < profiler.user_peak < len(translation)
+    assert f"User code: {format_size(profiler.user_peak)} at peak" in (
+        profiler.format_report()
+    )
+    del translation
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs SIGUSR1")
+def test_signal_report(tmp_path, capsys):
+    """
+    Test that SIGUSR1 reports while the script runs and diffs reports.
+
+    Assertions:
+        - Each signal prints a report to stderr
+        - The second report shows the growth since the first
+        - The previous handler is restored when the profiler stops
+    """
+    previous = signal.getsignal(signal.SIGUSR1)
+    profiler = MemoryProfiler()
+    profiler.start()
+    try:
+        signal.raise_signal(signal.SIGUSR1)
+        data = [str(i) * 10 for i in range(20000)]
+        signal.raise_signal(signal.SIGUSR1)
+    finally:
+        profiler.stop()
+    del data
+
+    reports = capsys.readouterr().err.split("Memory profile\n")[1:]
+    assert len(reports) == 2
+    assert "Growth since the previous report:" not in reports[0]
+    assert "Growth since the previous report:" in reports[1]
+    assert signal.getsignal(signal.SIGUSR1) == previous
+
+
+def test_memprofile_command_line(tmp_path):
+    """
+    Test `piyathon --memprofile`.
+
+    Assertions:
+        - The script output is unchanged
+        - The report points at the allocating line of the script
+    """
+    (tmp_path / "data.pi").write_text(
+        "ข้อมูล = [str(i) * 10 สำหรับ i ใน range(20000)]\nพิมพ์(len(ข้อมูล))\n",
+        encoding="utf-8",
+    )
+    result = subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "--memprofile", "data.pi"],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    assert result.stdout == "20000\n"
+    assert result.stderr.startswith("Memory profile\n")
+    assert "data.pi:1  ข้อมูล = [str(i) * 10 สำหรับ i ใน range(20000)]" in result.stderr
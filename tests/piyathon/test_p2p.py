@@ -15,6 +15,8 @@ Test Coverage:
     - Error message formatting
     - Bidirectional translation integrity
     - File I/O operations
+    - Parallel translation with --jobs
+    - Mirroring directory trees with include and exclude globs
 
 Dependencies:
     - pytest: For test framework and fixtures
@@ -212,3 +214,128 @@ def test_bidirectional_translation(tmp_path, capsys):
     assert source_py.exists()
     assert intermediate_pi.exists()
     assert final_py.exists()
+
+
+def test_jobs_option(tmp_path, capsys, monkeypatch):
+    """
+    Test translating a file with several processes.
+
+    Args:
+        tmp_path: pytest fixture for temporary directory
+        capsys: pytest fixture for capturing stdout/stderr
+        monkeypatch: pytest fixture used to allow splitting small files
+
+    Assertions:
+        - The output is the same as a translation in a single process
+    """
+    monkeypatch.setattr("piyathon.piyathon_translator.PARALLEL_MIN_CHUNK", 256)
+    source_py = tmp_path / "p2p.py"
+    with open("piyathon/p2p.py", "rb") as f:
+        source_py.write_bytes(f.read())
+
+    for jobs in ("1", "3"):
+        test_args = ["p2p.py", "--no-cache", "-j", jobs, str(source_py)]
+        with patch.object(sys, "argv", test_args + [str(tmp_path / f"{jobs}.pi")]):
+            main()
+    assert "translation completed" in capsys.readouterr().out
+    assert (tmp_path / "3.pi").read_bytes() == (tmp_path / "1.pi").read_bytes()
+
+
+def test_directory_translation(tmp_path, capsys):
+    """
+    Test mirroring a directory tree in both directions.
+
+    Args:
+        tmp_path: pytest fixture for temporary directory
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - Source files are translated to the mirrored layout
+        - Other files are copied with --copy-other
+        - Excluded directories and files outside --include are skipped
+        - Translating the mirror back gives the original sources
+    """
+    source = tmp_path / "project"
+    (source / "pkg").mkdir(parents=True)
+    (source / "build").mkdir()
+    (source / "main.py").write_text("from pkg import util\nprint(util.f())\n")
+    (source / "pkg" / "util.py").write_text("def f():\n    return True\n")
+    (source / "pkg" / "data.txt").write_text("data\n")
+    (source / "build" / "skip.py").write_text("pass\n")
+
+    test_args = ["p2p.py", "--no-cache", "-j", "2", "--copy-other"]
+    test_args += ["--exclude", "build", str(source), str(tmp_path / "project_pi")]
+    with patch.object(sys, "argv", test_args):
+        main()
+    captured = capsys.readouterr()
+    assert "Python to Piyathon translation completed." in captured.out
+    assert "Translated 2 files, copied 1 and failed 0 in " in captured.out
+    mirror = tmp_path / "project_pi"
+    assert sorted(
+        path.relative_to(mirror).as_posix() for path in mirror.rglob("*")
+    ) == ["main.pi", "pkg", "pkg/data.txt", "pkg/util.pi"]
+    assert "นิยาม f():" in (mirror / "pkg" / "util.pi").read_text(encoding="utf-8")
+
+    test_args = ["p2p.py", "--no-cache", "--include", "pkg/*"]
+    with patch.object(sys, "argv", test_args + [str(mirror), str(tmp_path / "back")]):
+        main()
+    assert "Translated 1 files, copied 0" in capsys.readouterr().out
+    assert [path.name for path in (tmp_path / "back").rglob("*")] == ["pkg", "util.py"]
+    assert (tmp_path / "back" / "pkg" / "util.py").read_text() == (
+        source / "pkg" / "util.py"
+    ).read_text()
+
+
+def test_directory_errors(tmp_path, capsys):
+    """
+    Test failures of directory translation.
+
+    Args:
+        tmp_path: pytest fixture for temporary directory
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - A file that cannot be translated is reported, the others are
+          translated, and the exit status is 1
+        - The direction must be chosen with --to if both kinds of files exist
+        - A copy that would overwrite a translated file is reported as a
+          failure instead of being made
+        - Directory options are rejected for a single source file
+    """
+    source = tmp_path / "project"
+    source.mkdir()
+    (source / "good.py").write_text("print(1)\n")
+    (source / "broken.py").write_text("x = (1,\n")
+    with patch.object(sys, "argv", ["p2p.py", str(source), str(tmp_path / "out")]):
+        with pytest.raises(SystemExit) as e:
+            main()
+    assert e.value.code == 1
+    captured = capsys.readouterr()
+    assert f"Error: Unable to translate '{source / 'broken.py'}'" in captured.out
+    assert "Translated 1 files, copied 0 and failed 1 in " in captured.out
+    assert (tmp_path / "out" / "good.pi").exists()
+
+    (source / "other.pi").write_text("พิมพ์(1)\n", encoding="utf-8")
+    with patch.object(sys, "argv", ["p2p.py", str(source), str(tmp_path / "out")]):
+        with pytest.raises(SystemExit) as e:
+            main()
+    assert e.value.code == 1
+    assert "Found both .py and .pi files" in capsys.readouterr().out
+
+    (source / "good.pi").write_text("ผ่าน\n", encoding="utf-8")
+    test_args = ["p2p.py", "--to", "pi", "--copy-other", "--include", "good.*"]
+    with patch.object(sys, "argv", test_args + [str(source), str(tmp_path / "both")]):
+        with pytest.raises(SystemExit) as e:
+            main()
+    assert e.value.code == 1
+    captured = capsys.readouterr()
+    assert f"Error: Not copying '{source / 'good.pi'}'" in captured.out
+    assert "Translated 1 files, copied 0 and failed 1 in " in captured.out
+    assert (tmp_path / "both" / "good.pi").read_text(encoding="utf-8") == "พิมพ์(1)\n"
+
+    test_args = ["p2p.py", "--to", "py", str(source / "good.py"), "good.pi"]
+    with patch.object(sys, "argv", test_args):
+        with pytest.raises(SystemExit) as e:
+            main()
+    assert e.value.code == 2
+    assert "require a source directory" in capsys.readouterr().err
@@ -12,6 +12,7 @@ Test Coverage:
     - File extension validation
     - File existence and readability checks
     - Error message formatting and content
+    - Running scripts as the __main__ module
 
 Dependencies:
     - pytest: For test framework and fixtures
@@ -19,6 +20,7 @@ Dependencies:
     - sys: For command-line argument manipulation
 """
 
+import multiprocessing
 import sys
 from unittest.mock import patch, mock_open
 import pytest
@@ -121,3 +123,46 @@ def test_file_read_error(capsys):
             assert e.value.code == 1
             captured = capsys.readouterr()
             assert "Error: Unable to read input file 'source.pi'." in captured.out
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork()"
+)
+def test_script_runs_as_main_module(tmp_path, monkeypatch, capsys):
+    """
+    Test that scripts run as a real __main__ module.
+
+    Args:
+        tmp_path: pytest fixture providing a temporary directory
+        monkeypatch: pytest fixture for restoring sys.modules and sys.path
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - __name__, __file__ and __spec__ describe the script
+        - The script module is sys.modules["__main__"]
+        - Functions and classes of the script can be pickled and run in
+          worker processes
+    """
+    monkeypatch.setitem(sys.modules, "__main__", sys.modules["__main__"])
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    script = tmp_path / "ขนาน.pi"
+    script.write_text(
+        "นำเข้า multiprocessing, pickle, sys\n"
+        "จาก concurrent.futures นำเข้า ProcessPoolExecutor\n"
+        "นิยาม กำลังสอง(x):\n"
+        "    คืนค่า x * x\n"
+        "ชั้น จุด:\n"
+        "    ผ่าน\n"
+        'ถ้า __name__ == "__main__":\n'
+        '    พิมพ์(__file__, __spec__.name, sys.modules["__main__"].จุด คือ จุด)\n'
+        "    พิมพ์(pickle.loads(pickle.dumps(จุด())).__class__ คือ จุด)\n"
+        '    บริบท = multiprocessing.get_context("fork")\n'
+        "    ด้วย ProcessPoolExecutor(2, mp_context=บริบท) เป็น ตัวรัน:\n"
+        "        พิมพ์(list(ตัวรัน.map(กำลังสอง, range(4))))\n",
+        encoding="utf-8",
+    )
+
+    with patch.object(sys, "argv", ["piyathon.py", "--no-cache", str(script)]):
+        main()
+
+    assert capsys.readouterr().out == f"{script} __main__ True\nTrue\n[0, 1, 4, 9]\n"
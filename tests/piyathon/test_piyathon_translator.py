@@ -16,13 +16,31 @@ Test Coverage:
     - Thai language function names
     - Import statement translation
     - Control flow constructs (if-elif-else, for-in)
+    - Streaming translation through file objects, which untokenizes every line
+    - Keyword pre-scan fast path, including keywords right after numbers,
+      and errors of code that is not tokenized
+    - Span-splicing output engine
+    - In-process LRU memoization
+    - Batch translation across worker processes
+    - Bytes translation honoring source encodings
+    - Single-pass translation statistics
+    - Chunk-parallel translation of a single source
+    - Modules left unimported until they are needed
 
 Dependencies:
     - pytest: For test framework and fixtures
     - piyathon.piyathon_translator: For code translation functionality
 """
 
+import os
+import subprocess
+import sys
+import tokenize
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
 import pytest
+import piyathon
+from piyathon.keywords import PY_TO_PI, PI_TO_PY
 from piyathon.piyathon_translator import PiyathonTranslator
 
 
@@ -319,3 +337,367 @@ for ตัว in [1, 2, 3, 4, 5]:
     # Log the translations for debugging
     test_logger.debug("Piyathon to Python:\n%s", translated_python)
     test_logger.debug("Python to Piyathon:\n%s", translated_piyathon)
+
+
+def test_iter_translate_matches_translate(translator):
+    """
+    Test that streaming translation produces the same code as translate().
+
+    Verifies that the chunks yielded by iter_translate join into exactly the
+    output of the in-memory translation, including indentation and dedents.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - One chunk is produced per logical line, plus the final line break
+        - Joined chunks equal the translate() result
+    """
+    python_code = """
+def nested_func(x):
+\tif x > 0:
+\t\tfor i in range(x):
+\t\t\tprint("a"  "b", i)
+\treturn None
+
+print(nested_func(3))
+"""
+    chunks = list(translator.iter_translate(StringIO(python_code), PY_TO_PI))
+    assert len(chunks) == 7
+    assert "".join(chunks) == translator.python_to_piyathon(python_code)
+
+
+def test_iter_translate_untokenizes_every_line(translator):
+    """
+    Test that streaming translation also untokenizes lines without names.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - Lines after the last translated name have their spacing normalized
+          by streaming, and are copied unchanged by translate()
+        - Code without names to translate is untokenized too
+    """
+    python_code = 'print(1)\nx = "a"  "b"\n'
+    assert "".join(translator.iter_translate(StringIO(python_code), PY_TO_PI)) == (
+        'พิมพ์(1)\nx = "a" "b"\n'
+    )
+    assert translator.python_to_piyathon(python_code) == 'พิมพ์(1)\nx = "a"  "b"\n'
+    untranslatable = "x = 1 \\\n  + 2\n"
+    assert "".join(translator.iter_translate(StringIO(untranslatable), PY_TO_PI)) == (
+        "x = 1\\\n  + 2\n"
+    )
+
+
+def test_translate_stream(translator):
+    """
+    Test translation from one file object into another.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - The written output equals the in-memory translation
+    """
+    piyathon_code = "สำหรับ i ใน ช่วง(5):\n    พิมพ์(i)\n"
+    out_file = StringIO()
+    translator.translate_stream(StringIO(piyathon_code), out_file, PI_TO_PY)
+    assert out_file.getvalue() == "for i in range(5):\n    print(i)\n"
+
+
+def test_untranslatable_code_is_returned_unchanged(translator):
+    """
+    Test the fast path for code without any identifier to translate.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - Code without keywords is returned exactly as written
+        - Keywords that are only part of a longer identifier are not candidates
+    """
+    python_code = "x = 1 \\\n  + 2\nและx = 3\n"
+    assert translator.last_candidate_row(python_code, PI_TO_PY) == 0
+    assert translator.piyathon_to_python(python_code) is python_code
+
+
+def test_only_lines_up_to_last_candidate_are_rewritten(translator):
+    """
+    Test that code after the last keyword is copied unchanged.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - Keywords spanning a multi-line logical line are translated
+        - The remainder after the last candidate keeps its original spacing
+    """
+    piyathon_code = "ถ้า (x และ\n    y):\n    z = 1 \\\n  + 2\n"
+    assert translator.last_candidate_row(piyathon_code, PI_TO_PY) == 1
+    assert translator.piyathon_to_python(piyathon_code) == (
+        "if (x and\n    y):\n    z = 1 \\\n  + 2\n"
+    )
+
+
+def test_keyword_after_number_is_candidate(translator):
+    """
+    Test that a keyword written right after a number is translated.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - A keyword following a digit is the last candidate
+        - The keyword is translated as tokenize splits it from the number
+    """
+    piyathon_code = "x = 1หรือ 2\n"
+    assert translator.last_candidate_row(piyathon_code, PI_TO_PY) == 1
+    assert translator.piyathon_to_python(piyathon_code) == "x = 1or 2\n"
+
+
+def test_broken_code_after_last_candidate(translator):
+    """
+    Test that tokenize errors are only raised for the tokenized part.
+
+    Args:
+        translator: PiyathonTranslator fixture
+
+    Assertions:
+        - An unclosed bracket after the last candidate is copied unchanged
+        - Code without candidates is returned unchanged even if broken
+        - An unclosed bracket before the last candidate raises TokenError
+        - Statistics, which read every token, raise TokenError
+    """
+    broken_code = "print(1)\n  x=(\n"
+    assert translator.python_to_piyathon(broken_code) == "พิมพ์(1)\n  x=(\n"
+    assert translator.python_to_piyathon("x = (\n") == "x = (\n"
+    with pytest.raises(tokenize.TokenError):
+        translator.python_to_piyathon("x = (\nprint(1)\n")
+    with pytest.raises(tokenize.TokenError):
+        translator.python_to_piyathon(broken_code, collect_stats=True)
+
+
+def test_splice_engine_keeps_source_bytes():
+    """
+    Test the span-splicing output engine.
+
+    Verifies that only translated names change and that spacing which the
+    untokenize engine normalizes is kept exactly as written.
+
+    Assertions:
+        - Adjacent strings and backslash continuations keep their spacing
+        - Round-trip translation reproduces the original code exactly
+        - Form feeds are kept, where the untokenize engine writes a space
+        - Unknown engines are rejected
+    """
+    translator = PiyathonTranslator(engine="splice")
+    python_code = 'if x:\n    print("a"  "b", \\\n  len(x))  # if\n'
+    piyathon_code = translator.python_to_piyathon(python_code)
+    assert piyathon_code == 'ถ้า x:\n    พิมพ์("a"  "b", \\\n  ความยาว(x))  # if\n'
+    assert translator.piyathon_to_python(piyathon_code) == python_code
+
+    form_feed_code = "\fprint(1)\n"
+    assert translator.python_to_piyathon(form_feed_code) == "\fพิมพ์(1)\n"
+    assert PiyathonTranslator().python_to_piyathon(form_feed_code) == " พิมพ์(1)\n"
+
+    with pytest.raises(ValueError):
+        PiyathonTranslator(engine="unknown")
+
+
+def test_memoized_translation():
+    """
+    Test the in-process LRU memo of translations.
+
+    Assertions:
+        - Repeated translations are served from the memo
+        - Direction and collect_stats are part of the key
+        - The least recently used entry is evicted over the entry limit
+    """
+    translator = PiyathonTranslator(cache_size=2)
+    assert translator.python_to_piyathon("print(1)") == "พิมพ์(1)"
+    assert translator.python_to_piyathon("print(1)") == "พิมพ์(1)"
+    assert translator.python_to_piyathon("print(1)", collect_stats=True) == (
+        "พิมพ์(1)",
+        4,
+        1,
+    )
+    assert translator.piyathon_to_python("print(1)") == "print(1)"
+
+    info = translator.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 3, 1, 2)
+
+    translator.cache_clear()
+    assert translator.cache_info().currsize == 0
+    assert PiyathonTranslator().cache_info() is None
+
+
+def test_memo_byte_limit_and_threads():
+    """
+    Test the memo byte limit and sharing one translator across threads.
+
+    Assertions:
+        - Entries larger than the byte limit are not kept
+        - Concurrent translations return correct results
+    """
+    translator = PiyathonTranslator(cache_size=100, cache_bytes=1000)
+    translator.python_to_piyathon("print(1)\n" * 100)
+    assert translator.cache_info().currsize == 0
+    assert translator.cache_info().evictions == 1
+
+    translator = PiyathonTranslator(cache_size=100, cache_bytes=100_000)
+    codes = [f"print({i % 10})" for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(translator.python_to_piyathon, codes))
+    assert results == [f"พิมพ์({i % 10})" for i in range(200)]
+    assert translator.cache_info().currsize == 10
+    assert translator.cache_info().hits >= 120
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_translate_many(translator, workers):
+    """
+    Test batch translation in-process and across worker processes.
+
+    Args:
+        translator: PiyathonTranslator fixture
+        workers: Number of worker processes
+
+    Assertions:
+        - Results are returned in input order with token statistics
+        - A failing source is reported without aborting the batch
+    """
+    codes = [f"print({i})" for i in range(20)]
+    codes[7] = "print('unterminated"
+    results = list(
+        translator.translate_many(codes, PY_TO_PI, workers=workers, chunksize=3)
+    )
+
+    assert len(results) == 20
+    assert results[7].translated_code is None
+    assert results[7].error is not None
+    for i, result in enumerate(results):
+        if i != 7:
+            assert result == (f"พิมพ์({i})", 4, 1, None)
+
+
+def test_translate_bytes_keeps_encoding():
+    """
+    Test bytes-in/bytes-out translation with declared encodings.
+
+    Assertions:
+        - A PEP 263 legacy encoding is used for input and output
+        - A UTF-8 byte order mark is kept and not mistaken for code
+        - Names that cannot be encoded in the source encoding are rejected
+    """
+    thai_source = '# -*- coding: tis-620 -*-\nพิมพ์("สวัสดี")\n'
+    python_bytes = PiyathonTranslator.translate_bytes(
+        thai_source.encode("tis-620"), PI_TO_PY
+    )
+    assert python_bytes == thai_source.replace("พิมพ์", "print").encode("tis-620")
+
+    bom_source = 'ถ้า x:\n    พิมพ์("é")\n'.encode("utf-8-sig")
+    assert PiyathonTranslator.translate_bytes(BytesIO(bom_source), PI_TO_PY) == (
+        'if x:\n    print("é")\n'.encode("utf-8-sig")
+    )
+
+    with pytest.raises(UnicodeEncodeError):
+        PiyathonTranslator.translate_bytes(
+            b"# -*- coding: latin-1 -*-\nprint(1)\n", PY_TO_PI
+        )
+
+
+def test_translate_with_stats(translator):
+    """
+    Test statistics gathered in the same pass as the translation.
+
+    Assertions:
+        - Token counts match the tuple returned with collect_stats
+        - Translated names are split into keywords, builtins and dunders
+        - Names without a mapping and input and output sizes are recorded
+        - Statistics of several translations can be added together
+    """
+    code = 'if __name__ == "__main__":\n    print(len(x))\n# done\ny = 1\n'
+    translated_code, stats = translator.translate_with_stats(code, PY_TO_PI)
+    assert (translated_code, stats.total_tokens, stats.name_tokens) == (
+        translator.translate(code, PY_TO_PI, collect_stats=True)
+    )
+    assert stats.keywords == {"if": 1}
+    assert stats.builtins == {"print": 1, "len": 1}
+    assert stats.dunders == {"__name__": 1}
+    assert stats.unmapped_names == {"x": 1, "y": 1}
+    assert stats.bytes_in == len(code.encode("utf-8"))
+    assert stats.bytes_out == len(translated_code.encode("utf-8"))
+
+    _, reverse_stats = translator.translate_with_stats(translated_code, PI_TO_PY)
+    assert reverse_stats.builtins == {"พิมพ์": 1, "ความยาว": 1}
+    total = stats + reverse_stats
+    assert total.name_tokens == 2 * stats.name_tokens
+    assert total.unmapped_names == {"x": 2, "y": 2}
+
+
+def test_parallel_translation(monkeypatch):
+    """
+    Test chunk-parallel translation of a single source.
+
+    Args:
+        monkeypatch: pytest fixture used to allow splitting small sources
+
+    Assertions:
+        - Code is split only before lines starting at column 0
+        - Both engines give the same result as a serial translation
+        - A split inside a multi-line string falls back to serial translation
+        - Encoded sources are translated in parallel keeping their encoding
+    """
+    monkeypatch.setattr("piyathon.piyathon_translator.PARALLEL_MIN_CHUNK", 64)
+    code = (
+        'def f(x):\n    if x:\n        return len("""\nif\n""")\n\n'
+        "@property\nclass A:\n    pass\n# else\n" * 20
+    )
+    bounds = PiyathonTranslator.split_top_level(code, 4)
+    assert len(bounds) == 5
+    assert all(code[bound - 1] == "\n" for bound in bounds[1:-1])
+
+    for engine in PiyathonTranslator.ENGINES:
+        translator = PiyathonTranslator(engine)
+        expected = translator.translate(code, PY_TO_PI)
+        assert translator.translate(code, PY_TO_PI, parallel=4) == expected
+        assert translator.translate(expected, PI_TO_PY, parallel=4) == (
+            translator.translate(expected, PI_TO_PY)
+        )
+
+    docstring = '"""\n' + "if it works\n" * 100 + '"""\nprint(1)\n'
+    assert PiyathonTranslator().translate(docstring, PY_TO_PI, parallel=4) == (
+        docstring.replace("print", "พิมพ์")
+    )
+
+    source = "# -*- coding: tis-620 -*-\n" + code.replace("f(x)", "ฟ(x)")
+    assert PiyathonTranslator.translate_bytes(
+        source.encode("tis-620"), PY_TO_PI, parallel=4
+    ) == PiyathonTranslator.translate_bytes(source.encode("tis-620"), PY_TO_PI)
+
+
+def test_lazy_imports():
+    """
+    Test that importing the translator leaves costly modules unimported.
+
+    Assertions:
+        - concurrent.futures and dataclasses, which imports inspect, are not
+          imported along with the translator
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, piyathon.piyathon_translator; "
+            "print(sorted({'concurrent.futures', 'dataclasses'} & set(sys.modules)))",
+        ],
+        env=dict(
+            os.environ,
+            PYTHONPATH=os.path.dirname(os.path.dirname(piyathon.__file__)),
+        ),
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    assert result.stdout == "[]\n"
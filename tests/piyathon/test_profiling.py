@@ -0,0 +1,118 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Profiling Module
+
+This module contains unit tests for `piyathon --profile`.
+
+Test Coverage:
+    - Recovering names as written from their NFKC normalized form
+    - Profiling code compiled from a .pi file
+    - Profiling a script from the command line and saving the statistics
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+    - pstats: For reading saved statistics
+"""
+
+import io
+import os
+import pstats
+import subprocess
+import sys
+import unicodedata
+from piyathon.profiling import FunctionProfiler, SourceNames, written_names
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+SOURCE = """\
+def ทำงาน(n):
+    return sum(i * i for i in range(n))
+
+for _ in range(3):
+    ทำงาน(100)
+"""
+
+
+def test_written_names(tmp_path):
+    """
+    Test that normalized names are mapped back to the names as written.
+
+    Assertions:
+        - Only names changed by normalization are mapped
+        - Names with tone marks are found whole
+        - Names outside .pi files and in unreadable files are unchanged
+    """
+    source_file = tmp_path / "work.pi"
+    source_file.write_text(SOURCE, encoding="utf-8")
+    normalized = unicodedata.normalize("NFKC", "ทำงาน")
+    assert written_names(source_file) == {normalized: "ทำงาน"}
+
+    names = SourceNames()
+    assert names.display(str(source_file), normalized) == "ทำงาน"
+    assert names.display(str(source_file), f"ชั้น.{normalized}") == "ชั้น.ทำงาน"
+    assert names.display("work.py", normalized) == normalized
+    assert names.display(str(tmp_path / "missing.pi"), normalized) == normalized
+
+    source_file = tmp_path / "marks.pi"
+    source_file.write_text("def คำนวณซ้ำ():\n    pass\n", encoding="utf-8")
+    normalized = unicodedata.normalize("NFKC", "คำนวณซ้ำ")
+    assert written_names(source_file) == {normalized: "คำนวณซ้ำ"}
+
+
+def test_function_profiler(tmp_path):
+    """
+    Test that profiles point at the lines of the .pi file.
+
+    Assertions:
+        - Functions are listed with their call counts by .pi file, line
+          and name as written
+        - The profiler itself is left out of the summary
+    """
+    source_file = str(tmp_path / "work.pi")
+    with open(source_file, "w", encoding="utf-8") as file:
+        file.write(SOURCE)
+    code = compile(SOURCE, source_file, "exec")
+    profiler = FunctionProfiler()
+    profiler.start()
+    exec(code, {})  # pylint: disable=exec-used
+    profiler.stop()
+
+    output = io.StringIO()
+    profiler.report(output)
+    summary = output.getvalue()
+    line = next(line for line in summary.splitlines() if line.endswith("(ทำงาน)"))
+    assert line.split()[0] == "3"
+    assert line.split()[-1] == f"{source_file}:1(ทำงาน)"
+    assert "profiling.py" not in summary
+    assert "_lsprof" not in summary
+
+
+def test_profile_command_line(tmp_path):
+    """
+    Test `piyathon --profile=OUTPUT` and a bare --profile before the file.
+
+    Assertions:
+        - The script output is unchanged
+        - The summary is printed to stderr and the statistics are saved
+    """
+    (tmp_path / "hello.pi").write_text(
+        "นิยาม ทักทาย():\n    พิมพ์('สวัสดี')\n\nทักทาย()\n", encoding="utf-8"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    for option in ("--profile=hello.pstats", "--profile"):
+        result = subprocess.run(
+            [sys.executable, "-m", "piyathon.piyathon", option, "hello.pi"],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+        )
+        assert result.stdout == "สวัสดี\n"
+        assert "hello.pi:1(ทักทาย)" in result.stderr
+
+    stats = pstats.Stats(str(tmp_path / "hello.pstats"))
+    assert (str(tmp_path / "hello.pi"), 1, "ทักทาย") in stats.stats
@@ -0,0 +1,134 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Runtime Timing Module
+
+This module contains unit tests for the phase and import timings reported by
+`piyathon --timings`.
+
+Test Coverage:
+    - Selecting the report format from the option and the environment
+    - Marking phases and formatting reports
+    - Timing imports with self and cumulative durations
+    - Reporting the phases of a script run as JSON
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+from piyathon.run_timing import ImportTimer, RunTimings, report_format
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+def test_report_format(monkeypatch):
+    """
+    Test that the option takes precedence over PIYATHON_TIMINGS.
+
+    Assertions:
+        - Timings are disabled without the option and the variable
+        - "0" disables, "json" selects JSON and other values the table
+    """
+    monkeypatch.delenv("PIYATHON_TIMINGS", raising=False)
+    assert report_format() is None
+    assert report_format("json") == "json"
+    monkeypatch.setenv("PIYATHON_TIMINGS", "0")
+    assert report_format() is None
+    monkeypatch.setenv("PIYATHON_TIMINGS", "JSON")
+    assert report_format() == "json"
+    monkeypatch.setenv("PIYATHON_TIMINGS", "1")
+    assert report_format() == "table"
+    assert report_format("json") == "json"
+
+
+def test_phases_and_report(capsys):
+    """
+    Test that phases add up to the total and are reported in order.
+
+    Assertions:
+        - Marking a phase twice adds to its duration
+        - The table lists the phases in order, then the total
+        - The JSON report holds the same phases
+    """
+    timings = RunTimings()
+    for phase in ("read", "compile", "read"):
+        timings.mark(phase)
+    assert list(timings.phases) == ["read", "compile"]
+    assert sum(timings.phases.values()) == pytest.approx(timings.last - timings.started)
+
+    timings.report("table")
+    lines = capsys.readouterr().err.splitlines()
+    assert [line.split()[0] for line in lines] == ["phase", "read", "compile", "total"]
+
+    timings.report("json")
+    report = json.loads(capsys.readouterr().err)
+    assert report["phases"] == timings.phases
+    assert report["imports"] == []
+
+
+def test_import_timer(tmp_path, monkeypatch):
+    """
+    Test that nested imports are timed with their depth.
+
+    Assertions:
+        - Imports are recorded in the order they complete
+        - A module's cumulative time includes the modules it imports
+        - The original loader is restored once the module is imported
+    """
+    (tmp_path / "timed_outer.py").write_text("import timed_inner\n")
+    (tmp_path / "timed_inner.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = ImportTimer()
+    timer.install()
+    try:
+        import timed_outer  # pylint: disable=import-outside-toplevel,import-error
+    finally:
+        timer.uninstall()
+        sys.modules.pop("timed_outer", None)
+        sys.modules.pop("timed_inner", None)
+
+    inner, outer = timer.imports
+    assert (inner.module, inner.depth) == ("timed_inner", 1)
+    assert (outer.module, outer.depth) == ("timed_outer", 0)
+    assert outer.self + inner.cumulative == pytest.approx(outer.cumulative)
+    assert type(timed_outer.__loader__).__name__ == "SourceFileLoader"
+    assert timer not in sys.meta_path
+
+
+def test_script_timings(tmp_path):
+    """
+    Test that PIYATHON_TIMINGS reports the phases of a script run.
+
+    Assertions:
+        - The script output is unchanged
+        - Every runtime phase is reported, including the Lib modules imported
+    """
+    (tmp_path / "hello.pi").write_text("นำเข้า สุ่ม\nพิมพ์(1)\n", encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PIYATHON_TIMINGS="json")
+    result = subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "--no-cache", "hello.pi"],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    assert result.stdout == "1\n"
+    report = json.loads(result.stderr)
+    assert list(report["phases"]) == [
+        "imports",
+        "arguments",
+        "read",
+        "translate",
+        "compile",
+        "setup",
+        "run",
+    ]
+    assert "สุ่ม" in [timing["module"] for timing in report["imports"]]
@@ -0,0 +1,138 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for the Piyathon Sampling Profiler Module
+
+This module contains unit tests for `piyathon --sample`.
+
+Test Coverage:
+    - Labeling frames of .pi code and leaving out the runner's frames
+    - Sampling a running program into collapsed stacks
+    - Writing collapsed stacks from the command line
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running scripts in a fresh interpreter
+"""
+
+import os
+import pstats
+import subprocess
+import sys
+import unicodedata
+from piyathon.sampling import StackSampler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+SOURCE = """\
+import sys, time
+
+def ทำงาน(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return sys._getframe()
+"""
+
+
+def load(tmp_path):
+    """Compile SOURCE as a .pi file and return its path and function."""
+    source_file = str(tmp_path / "work.pi")
+    with open(source_file, "w", encoding="utf-8") as file:
+        file.write(SOURCE)
+    namespace = {}
+    exec(compile(SOURCE, source_file, "exec"), namespace)  # pylint: disable=exec-used
+    # Names are NFKC normalized by the parser
+    return source_file, namespace[unicodedata.normalize("NFKC", "ทำงาน")]
+
+
+def test_stack_labels(tmp_path):
+    """
+    Test that frames are labeled with names as written and .pi lines.
+
+    Assertions:
+        - The stack starts at the outermost frame of .pi code
+        - A stack of the runner only is left out
+    """
+    source_file, function = load(tmp_path)
+    frame = function(0)
+    sampler = StackSampler(100, str(tmp_path / "out.collapsed"))
+    assert sampler.stack(frame) == (f"ทำงาน ({source_file}:7)",)
+    assert sampler.stack(sys._getframe(), runner=True) == ()
+    assert sampler.stack(sys._getframe())[-1].startswith("test_stack_labels (")
+
+
+def test_sampling(tmp_path):
+    """
+    Test that a running program is sampled into collapsed stacks.
+
+    Assertions:
+        - Samples are taken at about the set rate
+        - The busy line of the .pi function is the most sampled stack
+        - Every collapsed line ends with a sample count
+    """
+    _, function = load(tmp_path)
+    sampler = StackSampler(200, str(tmp_path / "out.collapsed"))
+    sampler.start()
+    function(0.3)
+    sampler.stop()
+
+    assert 20 <= sampler.samples <= 70
+    stack, _ = sampler.counts.most_common(1)[0]
+    assert stack[0].startswith("ทำงาน (") and stack[0].endswith(":5)")
+    for line in sampler.collapsed().splitlines():
+        frames, count = line.rsplit(" ", 1)
+        assert frames and int(count) > 0
+
+
+def test_sample_command_line(tmp_path):
+    """
+    Test `piyathon --sample=HZ --sample-output=PATH`.
+
+    Assertions:
+        - The script output is unchanged
+        - The collapsed stacks start at the script's module
+        - The sampler, and joining its thread, are left out of a profile
+          taken with it
+    """
+    (tmp_path / "busy.pi").write_text(
+        "นำเข้า time\n"
+        "จบ = time.perf_counter() + 0.2\n"
+        "ขณะ time.perf_counter() < จบ:\n"
+        "    ผ่าน\n"
+        "พิมพ์('เสร็จ')\n",
+        encoding="utf-8",
+    )
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "piyathon.piyathon",
+            "--sample=200",
+            "--sample-output=busy.txt",
+            "busy.pi",
+        ],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    assert result.stdout == "เสร็จ\n"
+    assert "written to 'busy.txt'" in result.stderr
+    collapsed = (tmp_path / "busy.txt").read_text(encoding="utf-8")
+    assert collapsed.startswith(f"<module> ({tmp_path / 'busy.pi'}:")
+
+    result = subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "--sample", "--profile=busy.pstats"]
+        + ["--sample-output=busy.txt", "busy.pi"],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    stats = pstats.Stats(str(tmp_path / "busy.pstats")).stats
+    assert not any(filename.endswith("sampling.py") for filename, _, _ in stats)
+    assert not any(name == "join" for _, _, name in stats)
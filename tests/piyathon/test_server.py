@@ -0,0 +1,205 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Execution Server and Client Modules
+
+This module contains unit tests for running scripts through `piyathon serve`
+with `piyathon --client`.
+
+Test Coverage:
+    - Output, working directory and exit codes of scripts run by the server
+    - Runs not waiting for clients that send their requests slowly
+    - Errors of the client without a server or with bad arguments
+    - Checking the user of the server and the privacy of its directory
+    - Removal of the socket when the server stops
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - subprocess: For running the server and clients in separate processes
+    - piyathon.client: For the client implementation
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import piyathon
+from piyathon.client import client_main, peer_uid
+from piyathon.server import make_private_directory
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"),
+    reason="the execution server needs Unix sockets and fork()",
+)
+
+
+# Lets the clients import piyathon from their own working directories
+ENV = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(piyathon.__file__)))
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    """Start an execution server on a socket in a temporary directory."""
+    socket_path = str(tmp_path / "piyathon.sock")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "piyathon.piyathon", "serve", "--socket", socket_path],
+        stdout=subprocess.PIPE,
+        encoding="utf-8",
+    )
+    assert "listening" in process.stdout.readline()
+    yield socket_path
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=10)
+    process.stdout.close()
+    assert not os.path.exists(socket_path)
+
+
+def run_client(socket_path, source_file, cwd):
+    """Run a script with `piyathon --client` in a separate process."""
+    return subprocess.run(
+        [sys.executable, "-m", "piyathon.piyathon", "--client", source_file]
+        + ["--socket", socket_path],
+        capture_output=True,
+        cwd=cwd,
+        env=ENV,
+        encoding="utf-8",
+        check=False,
+    )
+
+
+def test_client_runs(server, tmp_path):
+    """
+    Test running scripts through the server.
+
+    Args:
+        server: Path of the socket of a running server
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - Output goes to the client's stdout and stderr
+        - Relative paths are resolved in the client's working directory
+        - The exit code of the script is the exit code of the client
+        - Runs do not see each other's changes to the interpreter state
+    """
+    (tmp_path / "ออก.pi").write_text(
+        "นำเข้า sys\n"
+        'พิมพ์("ก", getattr(sys, "ค่า", 0))\n'
+        "sys.ค่า = 1\n"
+        'พิมพ์("ข", file=sys.stderr)\n'
+        "sys.exit(3)\n",
+        encoding="utf-8",
+    )
+
+    for _ in range(2):
+        result = run_client(server, "ออก.pi", tmp_path)
+        assert result.stdout == "ก 0\n"
+        assert result.stderr == "ข\n"
+        assert result.returncode == 3
+
+    result = run_client(server, "ไม่มี.pi", tmp_path)
+    assert "not found" in result.stdout
+    assert result.returncode == 1
+
+
+def test_slow_client(server, tmp_path):
+    """
+    Test that a client sending its request slowly does not hold up others.
+
+    Args:
+        server: Path of the socket of a running server
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - A script runs while another client has sent only part of a request
+    """
+    (tmp_path / "ทัก.pi").write_text('พิมพ์("สวัสดี")\n', encoding="utf-8")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server)
+        sock.sendall(b"\0\0")
+        start = time.perf_counter()
+        result = run_client(server, "ทัก.pi", tmp_path)
+        assert result.stdout == "สวัสดี\n"
+        assert time.perf_counter() - start < 4
+
+
+def test_client_errors(tmp_path, capsys):
+    """
+    Test client errors that do not involve a server.
+
+    Args:
+        tmp_path: pytest fixture providing a temporary directory
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - A missing server is reported with exit code 1
+        - Bad arguments print the usage with exit code 2
+    """
+    socket_path = str(tmp_path / "none.sock")
+    assert client_main(["--client", f"--socket={socket_path}", "a.pi"]) == 1
+    assert "No piyathon server" in capsys.readouterr().out
+
+    assert client_main(["--client", "a.py"]) == 2
+    assert client_main(["--client", "a.pi", "b.pi"]) == 2
+    assert "usage" in capsys.readouterr().err
+
+
+def test_server_user(server, tmp_path):
+    """
+    Test the checks keeping scripts away from servers of other users.
+
+    Args:
+        server: Path of the socket of a running server
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - The client sees the server as run by the current user
+        - A private directory is created with mode 0700
+        - A directory accessible by other users is refused
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server)
+        assert peer_uid(sock, server) == os.getuid()
+
+    directory = tmp_path / "private"
+    make_private_directory(str(directory))
+    make_private_directory(str(directory))
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+    directory.chmod(0o755)
+    with pytest.raises(OSError, match="not a private directory"):
+        make_private_directory(str(directory))
+
+
+def test_signal_forwarding(server, tmp_path):
+    """
+    Test that interrupting the client interrupts the script.
+
+    Args:
+        server: Path of the socket of a running server
+        tmp_path: pytest fixture providing a temporary directory
+
+    Assertions:
+        - The script gets KeyboardInterrupt and the client exits with 130
+    """
+    (tmp_path / "หลับ.pi").write_text(
+        'นำเข้า time\nพิมพ์("เริ่ม", flush=จริง)\ntime.sleep(30)\n', encoding="utf-8"
+    )
+    client = subprocess.Popen(
+        [sys.executable, "-m", "piyathon.piyathon", "--client", "หลับ.pi"]
+        + ["--socket", server],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=tmp_path,
+        env=ENV,
+        encoding="utf-8",
+    )
+    assert client.stdout.readline() == "เริ่ม\n"
+    time.sleep(0.1)
+    client.send_signal(signal.SIGINT)
+    _, stderr = client.communicate(timeout=10)
+    assert "KeyboardInterrupt" in stderr
+    assert client.returncode == 130
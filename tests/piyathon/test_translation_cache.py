@@ -0,0 +1,107 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Translation Cache Module
+
+This module contains unit tests for the on-disk translation cache shared by the
+piyathon runner and the p2p translation tool.
+
+Test Coverage:
+    - Cache hits and misses
+    - Key invalidation on keyword table and engine changes
+    - Least recently used eviction
+    - Cache clearing from the command line
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - piyathon.translation_cache: For the cache implementation
+"""
+
+import os
+import sys
+from unittest.mock import patch
+from piyathon.keywords import PY_TO_PI
+from piyathon.p2p import main
+from piyathon.piyathon_translator import PiyathonTranslator
+from piyathon.translation_cache import TranslationCache, cached_translate
+
+
+def test_cache_hit_skips_translation(tmp_path):
+    """
+    Test that a cached translation is reused.
+
+    Args:
+        tmp_path: pytest fixture for temporary directory
+
+    Assertions:
+        - The first call translates and stores the result
+        - The second call returns the stored result without translating
+    """
+    cache = TranslationCache(str(tmp_path))
+    translator = PiyathonTranslator()
+    assert cached_translate(translator, "print(1)", PY_TO_PI, cache) == "พิมพ์(1)"
+
+    with patch.object(translator, "translate") as mocked_translate:
+        assert cached_translate(translator, "print(1)", PY_TO_PI, cache) == "พิมพ์(1)"
+        mocked_translate.assert_not_called()
+
+
+def test_key_depends_on_table_and_engine():
+    """
+    Test that cache keys change with the keyword table and output engine.
+
+    Assertions:
+        - Changing a single mapping changes the key
+        - Changing the engine changes the key
+    """
+    key = TranslationCache.key("print(1)", PY_TO_PI, "untokenize")
+    changed_table = {**PY_TO_PI, "print": "แสดง"}
+    assert TranslationCache.key("print(1)", changed_table, "untokenize") != key
+    assert TranslationCache.key("print(1)", PY_TO_PI, "splice") != key
+    assert TranslationCache.key("print(1)", PY_TO_PI, "untokenize") == key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """
+    Test eviction once the cache exceeds its size limit.
+
+    Args:
+        tmp_path: pytest fixture for temporary directory
+
+    Assertions:
+        - The least recently used entry is removed first
+        - Recently read entries are kept
+    """
+    cache = TranslationCache(str(tmp_path), max_bytes=25)
+    cache.put("aa", b"x" * 10)
+    cache.put("bb", b"y" * 10)
+    os.utime(cache.entry_path("aa"), (1, 1))
+    os.utime(cache.entry_path("bb"), (2, 2))
+    assert cache.get("aa") == b"x" * 10
+
+    cache.put("cc", b"z" * 10)
+    assert cache.get("bb") is None
+    assert cache.get("aa") == b"x" * 10
+    assert cache.get("cc") == b"z" * 10
+
+
+def test_clear_cache_option(isolated_translation_cache, capsys):
+    """
+    Test clearing the cache from the p2p command line without translating.
+
+    Args:
+        isolated_translation_cache: Temporary cache directory fixture
+        capsys: pytest fixture for capturing stdout/stderr
+
+    Assertions:
+        - All entries are removed
+        - The number of removed entries is reported
+    """
+    cache = TranslationCache(str(isolated_translation_cache))
+    cache.put(cache.key("print(1)", PY_TO_PI, "untokenize"), "พิมพ์(1)".encode())
+
+    with patch.object(sys, "argv", ["p2p.py", "--clear-cache"]):
+        main()
+    assert not cache.entries()
+    assert "Removed 1 cached translations" in capsys.readouterr().out
@@ -0,0 +1,97 @@
+# Copyright (c) 2024 Piyawish Piyawat
+# Licensed under the MIT License
+
+"""
+Unit Tests for Piyathon Translation Timing Module
+
+This module contains unit tests for the timing hook of the translator and the
+aggregation of phase durations.
+
+Test Coverage:
+    - Timing records passed to the hook
+    - Setting the hook with a context manager
+    - Percentiles and reports of the aggregator
+
+Dependencies:
+    - pytest: For test framework and fixtures
+    - piyathon.translation_timing: For timing records and aggregation
+"""
+
+import pytest
+from piyathon.piyathon_translator import PiyathonTranslator
+from piyathon.translation_timing import TimingAggregator, TranslationTiming, percentile
+
+
+def test_timing_hook_receives_phases():
+    """
+    Test the records passed to the timing hook.
+
+    Assertions:
+        - Translated code is the same as without the hook
+        - Code with names to translate reports the scan and tokenize phases,
+          and the remap and output phases of the engine
+        - Code without names to translate only reports the scan phase
+        - Token counts and sizes are reported
+    """
+    timings = []
+    translator = PiyathonTranslator(timing_hook=timings.append)
+    assert translator.python_to_piyathon("print(1)\n") == "พิมพ์(1)\n"
+    assert translator.python_to_piyathon("x = 1\n") == "x = 1\n"
+
+    timing = timings[0]
+    assert isinstance(timing, TranslationTiming)
+    assert set(timing.phases) == {"scan", "tokenize", "remap", "untokenize"}
+    assert all(seconds >= 0 for seconds in timing.phases.values())
+    assert timing.tokens == 5
+    assert timing.bytes_in == 9
+    assert timing.bytes_out == len("พิมพ์(1)\n".encode("utf-8"))
+    assert set(timings[1].phases) == {"scan"}
+
+
+def test_timing_context_manager():
+    """
+    Test setting the timing hook for a with block.
+
+    Assertions:
+        - Translations inside the block are recorded
+        - Statistics are returned unchanged while timed
+        - The splice engine reports its own output phase
+        - The previous hook is restored after the block
+    """
+    translator = PiyathonTranslator(engine="splice")
+    aggregator = TimingAggregator()
+    with translator.timing(aggregator):
+        result = translator.python_to_piyathon("def f(): pass\n", collect_stats=True)
+    translator.python_to_piyathon("print(1)\n")
+
+    assert result == ("นิยาม f(): ผ่าน\n", 6, 3)
+    assert translator.timing_hook is None
+    assert aggregator.calls == 1
+    assert set(aggregator.samples) == {"scan", "tokenize", "remap", "splice", "total"}
+
+
+def test_aggregator_percentiles():
+    """
+    Test percentiles and reports of the aggregator.
+
+    Assertions:
+        - Nearest-rank percentiles are computed per phase and in total
+        - The report lists every phase
+        - Clearing forgets all samples
+    """
+    aggregator = TimingAggregator()
+    for i in range(1, 101):
+        aggregator(TranslationTiming({"scan": i / 1000, "remap": 0.001}, 1, 2, 3))
+
+    percentiles = aggregator.percentiles()
+    assert percentiles["scan"] == {"p50": 0.05, "p95": 0.095, "p99": 0.099}
+    assert percentiles["total"]["p50"] == pytest.approx(0.051)
+    assert percentile([3], 99) == 3
+    assert aggregator.tokens == 100
+
+    report = aggregator.format_report()
+    assert "100 translations" in report
+    assert all(phase in report for phase in ("scan", "remap", "total"))
+
+    aggregator.clear()
+    assert aggregator.calls == 0 and aggregator.percentiles() == {}
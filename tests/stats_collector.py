@@ -17,11 +17,13 @@ Dependencies:
     - time: For measuring processing duration
     - dataclasses: For structured statistics storage
     - typing: For type hints
+    - piyathon_translator: For per-file translation statistics
 """
 
 import time
 from dataclasses import dataclass, field
 from typing import List, Optional
+from piyathon.piyathon_translator import TranslationStats
 
 
 @dataclass
@@ -36,6 +38,8 @@ class TestStatistics:
         name_tokens (int): Number of NAME tokens (identifiers) that were translated
         processing_time (float): Total time spent processing files in seconds
         error_files (List[str]): List of file paths that encountered errors
+        translation_stats (TranslationStats): Identifier histograms and sizes
+            aggregated across all files
     """
 
     files_tested: int = 0
@@ -44,6 +48,7 @@ class TestStatistics:
     name_tokens: int = 0
     processing_time: float = 0.0
     error_files: List[str] = field(default_factory=list)
+    translation_stats: TranslationStats = field(default_factory=TranslationStats)
 
     @property
     def total_files_attempted(self) -> int:
@@ -87,17 +92,26 @@ class StatisticsCollector:
         if self.start_time is not None:
             self.stats.processing_time = time.time() - self.start_time
 
-    def record_file_success(self, total_tokens: int, name_tokens: int):
+    def record_file_success(
+        self,
+        total_tokens: int,
+        name_tokens: int,
+        translation_stats: Optional[TranslationStats] = None,
+    ):
         """
         Record statistics for a successfully processed file.
 
         Args:
             total_tokens (int): Total number of tokens in the file
             name_tokens (int): Number of NAME tokens in the file
+            translation_stats (Optional[TranslationStats]): Detailed statistics
+                of the file's translation, if collected
         """
         self.stats.files_tested += 1
         self.stats.total_tokens += total_tokens
         self.stats.name_tokens += name_tokens
+        if translation_stats is not None:
+            self.stats.translation_stats += translation_stats
 
     def record_file_error(self, file_path: str, error_message: str = ""):
         """
@@ -155,6 +169,21 @@ class StatisticsCollector:
             f"⏱️  Processing time:       {stats.processing_time:.1f} seconds",
         ]
 
+        translation = stats.translation_stats
+        if translation.translated_names:
+            most_common = translation.translated_names.most_common(10)
+            summary_lines.extend(
+                [
+                    "",
+                    "📦 Size:",
+                    f"   📥 Bytes in:            {format_number(translation.bytes_in)}",
+                    f"   📤 Bytes out:           {format_number(translation.bytes_out)}",
+                    "",
+                    "🏆 Most translated names:",
+                    *[f"   • {name}: {format_number(n)}" for name, n in most_common],
+                ]
+            )
+
         if stats.error_files:
             summary_lines.extend(
                 [
@@ -29,6 +29,7 @@ Integration Points:
 from pathlib import Path
 import pytest
 import tokenize
+from piyathon.keywords import PY_TO_PI
 from piyathon.piyathon_translator import PiyathonTranslator
 from tests.stats_collector import get_global_collector
 
@@ -114,8 +115,9 @@ def test_translation_consistency(py_file, test_logger):
         translator = PiyathonTranslator()
 
         # Translate .py to .pi with statistics collection
-        pi_result = translator.python_to_piyathon(original_py_code, collect_stats=True)
-        translated_pi_code, total_tokens, name_tokens = pi_result
+        translated_pi_code, translation_stats = translator.translate_with_stats(
+            original_py_code, PY_TO_PI
+        )
 
         # Create the target directory structure
         translated_dir = Path("tests") / "translated"
@@ -141,7 +143,11 @@ def test_translation_consistency(py_file, test_logger):
         )
 
         # Record successful file processing with statistics
-        stats_collector.record_file_success(total_tokens, name_tokens)
+        stats_collector.record_file_success(
+            translation_stats.total_tokens,
+            translation_stats.name_tokens,
+            translation_stats,
+        )
 
     except Exception as e:
         # Record any other errors that occur during processing